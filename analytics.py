@@ -0,0 +1,301 @@
+"""
+시세 분석 - car_prices 에서 필요한 컬럼만 청크 단위로 읽어 NumPy 배열로 모은 뒤 한 번에 계산한다
+
+그룹은 (모델, 세부등급), 셀은 (그룹, 연식) 이다. 정렬 한 번으로 셀 경계를 찾아 중앙값을 구하므로
+행마다 파이썬 루프를 돌며 계산하지 않는다 (문자열 → 정수 코드 변환만 읽을 때 한다).
+    median_price          - 셀별 시세 중앙값
+    depreciation_per_year - 그룹 안에서 연식별 중앙값에 맞춘 직선의 기울기 (1년 오래된 연식의 가격 차이)
+    week_over_week_pct    - 셀의 마지막 관측 주 중앙값과 바로 전 주 중앙값의 변화율
+    outlier               - 셀 안에서 |0.6745 * (시세 - 중앙값) / MAD| 가 ANALYTICS_OUTLIER_Z 이상인 행
+결과는 price_analytics (셀) / price_outliers (행) 테이블을 비우고 다시 쓴다.
+"""
+
+import re
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import insert, or_, select
+
+import config
+from database import CarPrice, PriceAnalytics, PriceOutlier
+
+_YEAR = re.compile(r"(?:19|20)\d{2}")
+
+# 셀 키 = 그룹 번호 * _YEAR_BASE + 연도
+_YEAR_BASE = 10000
+
+
+def _parse_year(text: Optional[str], cache: Dict[Optional[str], int]) -> int:
+    """'2020년식', '2019년 09월' 같은 연식 문자열의 연도 (없으면 0)"""
+    year = cache.get(text)
+    if year is None:
+        match = _YEAR.search(text or "")
+        year = cache[text] = int(match.group()) if match else 0
+    return year
+
+
+def load_columns(
+    session,
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    manufacturers: Sequence[str] = (),
+    chunk_size: int = config.ANALYTICS_CHUNK_SIZE,
+) -> Tuple[Dict[str, np.ndarray], List[Tuple[str, str]]]:
+    """시세가 있는 행의 id/그룹/연도/가격/날짜 배열과 그룹 번호 → (모델, 세부등급) 목록"""
+    query = select(
+        CarPrice.id,
+        CarPrice.model,
+        CarPrice.detailed_grade,
+        CarPrice.year,
+        CarPrice.price,
+        CarPrice.crawled_at,
+    ).where(CarPrice.is_price_available == True, CarPrice.price.isnot(None))
+    if since:
+        query = query.where(
+            CarPrice.crawled_at >= datetime.combine(since, datetime.min.time())
+        )
+    if until:
+        query = query.where(
+            CarPrice.crawled_at
+            < datetime.combine(until + timedelta(days=1), datetime.min.time())
+        )
+    if manufacturers:
+        query = query.where(
+            or_(
+                CarPrice.manufacturer.in_(manufacturers),
+                CarPrice.manufacturer_code.in_(manufacturers),
+            )
+        )
+
+    group_ids: Dict[Tuple[str, str], int] = {}
+    year_cache: Dict[Optional[str], int] = {}
+    parts: Dict[str, List[np.ndarray]] = {
+        name: [] for name in ("id", "group", "year", "price", "day")
+    }
+    result = session.execute(query.execution_options(yield_per=chunk_size))
+    for partition in result.partitions():
+        ids, models, grades, years, prices, crawled = zip(*partition)
+        count = len(ids)
+        parts["id"].append(np.fromiter(ids, np.int64, count))
+        parts["group"].append(
+            np.fromiter(
+                (
+                    group_ids.setdefault(key, len(group_ids))
+                    for key in zip(models, grades)
+                ),
+                np.int64,
+                count,
+            )
+        )
+        parts["year"].append(
+            np.fromiter((_parse_year(y, year_cache) for y in years), np.int64, count)
+        )
+        parts["price"].append(np.asarray(prices, dtype=np.float64))
+        parts["day"].append(
+            np.fromiter((c.toordinal() for c in crawled), np.int64, count)
+        )
+
+    columns = {
+        name: np.concatenate(arrays)
+        if arrays
+        else np.empty(0, np.float64 if name == "price" else np.int64)
+        for name, arrays in parts.items()
+    }
+    return columns, list(group_ids)
+
+
+def _segment_medians(keys: np.ndarray, values: np.ndarray):
+    """같은 키끼리 묶은 구간별 중앙값
+
+    (구간 키 - 오름차순, 중앙값, 행 수, 행별 구간 번호) 를 반환한다.
+    """
+    order = np.lexsort((values, keys))
+    sorted_keys = keys[order]
+    sorted_values = values[order]
+    starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+    counts = np.diff(np.r_[starts, len(sorted_keys)])
+    medians = (
+        sorted_values[starts + (counts - 1) // 2] + sorted_values[starts + counts // 2]
+    ) / 2
+    segment = np.empty(len(keys), np.int64)
+    segment[order] = np.repeat(np.arange(len(starts)), counts)
+    return sorted_keys[starts], medians, counts, segment
+
+
+def compute(
+    columns: Dict[str, np.ndarray], outlier_z: float = config.ANALYTICS_OUTLIER_Z
+):
+    """배열로 셀별 지표와 이상치 행 계산 (연식을 알 수 없는 행은 제외)"""
+    known = columns["year"] > 0
+    ids = columns["id"][known]
+    price = columns["price"][known]
+    day = columns["day"][known]
+    group = columns["group"][known]
+    cell_key = group * _YEAR_BASE + columns["year"][known]
+
+    # 셀별 중앙값
+    cells, median, count, cell = _segment_medians(cell_key, price)
+    cell_group = cells // _YEAR_BASE
+    cell_year = cells % _YEAR_BASE
+
+    # 그룹별 감가 기울기: 셀 중앙값 ~ 연식 최소제곱 직선
+    groups = int(cell_group.max()) + 1
+    x = cell_year.astype(np.float64)
+    n = np.bincount(cell_group, minlength=groups).astype(np.float64)
+    sx = np.bincount(cell_group, x, groups)
+    sy = np.bincount(cell_group, median, groups)
+    sxx = np.bincount(cell_group, x * x, groups)
+    sxy = np.bincount(cell_group, x * median, groups)
+    denom = n * sxx - sx * sx
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = np.where(denom > 0, (n * sxy - sx * sy) / denom, np.nan)
+        slope_pct = slope / (sy / n) * 100
+
+    # 셀별 주간 중앙값 → 마지막 주와 바로 전 주 비교
+    week = (day - 1) // 7  # 월요일 시작 주 번호
+    first_week = week.min()
+    span = int(week.max() - first_week) + 1
+    week_keys, week_median, _, _ = _segment_medians(
+        cell * span + (week - first_week), price
+    )
+    week_cell = week_keys // span
+    week_no = week_keys % span
+    last = np.flatnonzero(np.r_[week_cell[1:] != week_cell[:-1], True])
+    prev = last - 1
+    has_prev = (prev >= 0) & (week_cell[prev] == week_cell[last])
+    has_prev &= week_no[prev] == week_no[last] - 1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        wow = np.where(
+            has_prev,
+            (week_median[last] - week_median[prev]) / week_median[prev] * 100,
+            np.nan,
+        )
+    latest_week = (week_no[last] + first_week) * 7 + 1
+
+    # 셀 안의 robust z-score (MAD 가 0 이면 평균 절대 편차로 대신)
+    deviation = price - median[cell]
+    _, mad, _, _ = _segment_medians(cell, np.abs(deviation))
+    mean_ad = np.bincount(cell, np.abs(deviation), len(cells)) / count
+    scale = np.where(mad > 0, mad / 0.6745, mean_ad * 1.253314)[cell]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = np.where(scale > 0, deviation / scale, 0.0)
+    outlier = np.abs(z) >= outlier_z
+
+    return {
+        "cells": {
+            "group": cell_group,
+            "year": cell_year,
+            "count": count,
+            "median": median,
+            "slope": slope[cell_group],
+            "slope_pct": slope_pct[cell_group],
+            "latest_week": latest_week,
+            "wow": wow,
+            "outliers": np.bincount(cell, outlier, len(cells)).astype(np.int64),
+        },
+        "outliers": {
+            "id": ids[outlier],
+            "group": group[outlier],
+            "year": cell_year[cell[outlier]],
+            "price": price[outlier],
+            "median": median[cell[outlier]],
+            "z": z[outlier],
+        },
+    }
+
+
+def _number(value) -> Optional[float]:
+    value = float(value)
+    return None if np.isnan(value) else value
+
+
+def save_results(session, results: Dict, keys: List[Tuple[str, str]]) -> datetime:
+    """price_analytics / price_outliers 를 이번 결과로 교체"""
+    computed_at = datetime.now()
+    cells = results["cells"]
+    outliers = results["outliers"]
+    session.query(PriceAnalytics).delete(synchronize_session=False)
+    session.query(PriceOutlier).delete(synchronize_session=False)
+    rows = [
+        {
+            "computed_at": computed_at,
+            "model": keys[group][0],
+            "detailed_grade": keys[group][1],
+            "year": int(year),
+            "sample_count": int(count),
+            "median_price": float(median),
+            "depreciation_per_year": _number(slope),
+            "depreciation_pct": _number(slope_pct),
+            "latest_week": date.fromordinal(int(week)),
+            "week_over_week_pct": _number(wow),
+            "outlier_count": int(outlier_count),
+        }
+        for group, year, count, median, slope, slope_pct, week, wow, outlier_count in zip(
+            cells["group"],
+            cells["year"],
+            cells["count"],
+            cells["median"],
+            cells["slope"],
+            cells["slope_pct"],
+            cells["latest_week"],
+            cells["wow"],
+            cells["outliers"],
+        )
+    ]
+    if rows:
+        session.execute(insert(PriceAnalytics), rows)
+    rows = [
+        {
+            "computed_at": computed_at,
+            "car_price_id": int(row_id),
+            "model": keys[group][0],
+            "detailed_grade": keys[group][1],
+            "year": int(year),
+            "price": float(price),
+            "median_price": float(median),
+            "robust_z": float(z),
+        }
+        for row_id, group, year, price, median, z in zip(
+            outliers["id"],
+            outliers["group"],
+            outliers["year"],
+            outliers["price"],
+            outliers["median"],
+            outliers["z"],
+        )
+    ]
+    if rows:
+        session.execute(insert(PriceOutlier), rows)
+    session.commit()
+    return computed_at
+
+
+def run_analytics(
+    session,
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    manufacturers: Sequence[str] = (),
+) -> Dict:
+    """읽기 → 계산 → 저장 후 요약 (행/그룹/셀/이상치 수, 단계별 시간) 반환"""
+    if since is None and until is None:
+        since = date.today() - timedelta(days=config.ANALYTICS_WINDOW_DAYS)
+    started = time.perf_counter()
+    columns, keys = load_columns(session, since, until, manufacturers)
+    loaded = time.perf_counter()
+    summary = {"rows": len(columns["id"]), "groups": len(keys), "since": since}
+    if not (columns["year"] > 0).any():
+        return dict(summary, cells=0, outliers=0)
+
+    results = compute(columns)
+    computed = time.perf_counter()
+    save_results(session, results, keys)
+    return dict(
+        summary,
+        cells=len(results["cells"]["median"]),
+        outliers=len(results["outliers"]["id"]),
+        load_seconds=loaded - started,
+        compute_seconds=computed - loaded,
+        save_seconds=time.perf_counter() - computed,
+    )
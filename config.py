@@ -15,13 +15,90 @@ TIMEOUT = 30000  # 30초
 RETRY_COUNT = 3
 WAIT_BETWEEN_ACTIONS = 1500  # 밀리초
 
+# 프론티어 스케줄러 설정 (--prioritize / --budget)
+FRONTIER_WEIGHT_STALENESS = 1.0  # 마지막 크롤링 이후 경과 시간
+FRONTIER_WEIGHT_VOLATILITY = 0.5  # 과거 시세 변동성(변동계수)
+FRONTIER_WEIGHT_AVAILABILITY = 0.5  # 직전 크롤링 시 시세 제공 여부
+FRONTIER_STALENESS_HORIZON_DAYS = 7  # 이 기간 이상 지나면 최대로 오래된 것으로 본다
+
+# 증분 크롤링 설정 (--incremental)
+INCREMENTAL_SAMPLE_RATE = 0.05  # 변경 없는 노드 중 재방문할 비율
+
+# 옵션 트리 캐시 설정 - 캐시된 목록의 .rt 시세 텍스트는 TTL 동안 갱신되지 않으므로 기본은 사용 안 함
+OPTION_CACHE_ENABLED = os.getenv("OPTION_CACHE_ENABLED", "0") == "1"
+OPTION_CACHE_PATH = os.getenv("OPTION_CACHE_PATH", "option_tree.cache")
+OPTION_CACHE_TTL_HOURS = float(os.getenv("OPTION_CACHE_TTL_HOURS", 24))
+
+# 세부등급 리프 선택 정책 (all, first:N, stratified:N, random:N[:SEED])
+LEAF_SAMPLING = os.getenv("LEAF_SAMPLING", "first:3")
+# 제조사별 정책 - "현대=all,기아=stratified:4" 형식
+LEAF_SAMPLING_BY_MANUFACTURER = [
+    item
+    for item in os.getenv("LEAF_SAMPLING_BY_MANUFACTURER", "").split(",")
+    if item.strip()
+]
+
+# 분산 작업 임대 설정 (--coordinator / --worker)
+LEASE_SECONDS = 600  # 하트비트 없이 이 시간이 지나면 작업이 풀로 돌아간다
+LEASE_HEARTBEAT_SECONDS = 60
+LEASE_MAX_ATTEMPTS = 3
+LEASE_POLL_SECONDS = 30  # 다른 워커의 임대가 만료되기를 기다리는 간격
+# 작업 나누기: 큐가 비면 워커가 아직 방문하지 않은 형제 서브트리를 작업으로 내놓는다
+STEAL_MAX_DEPTH = 4  # 이 레벨 인덱스보다 얕은 옵션만 (0=제조사 ... 3=연식)
+STEAL_BATCH = 8  # 하트비트 한 번에 내놓는 최대 작업 수
+
+# 파싱 모드: browser(페이지 내 evaluate) 또는 pool(HTML 스냅샷을 프로세스 풀에서 파싱)
+PARSE_MODE = os.getenv("PARSE_MODE", "browser")
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", os.cpu_count() or 2))
+
+# 딥링크 이동 (--recheck) - '{op_dep1}'~'{op_dep6}', '{fuel}' 자리표시자에 옵션 값을 채운 URL
+# 비어 있으면 prForm 제출, 그다음 클릭 순으로 이동한다
+DEEPLINK_URL_TEMPLATE = os.getenv("DEEPLINK_URL_TEMPLATE", "")
+
 # 데이터베이스 설정
+WRITE_BATCH_SIZE = int(os.getenv("WRITE_BATCH_SIZE", 500))  # 시세 행을 한 번에 저장하는 단위
+STORAGE_MODE = os.getenv(
+    "STORAGE_MODE", "wide"
+)  # wide(car_prices), normalized(차원+팩트), history(바뀐 시세만 구간으로)
+DB_BACKEND = os.getenv("DB_BACKEND", "sqlite")  # sqlite 또는 mysql (DB_* 설정으로 연결)
+DATABASE_URL = os.getenv("DATABASE_URL", "")  # SQLAlchemy URL - 지정하면 DB_BACKEND 보다 우선
+SQLITE_PATH = os.getenv("SQLITE_PATH", "encar_prices.db")
 DB_HOST = os.getenv("DB_HOST", "localhost")
 DB_PORT = int(os.getenv("DB_PORT", 3306))
 DB_USER = os.getenv("DB_USER", "root")
 DB_PASSWORD = os.getenv("DB_PASSWORD", "")
 DB_NAME = os.getenv("DB_NAME", "encar_prices")
+MYSQL_INSERT_BATCH = int(
+    os.getenv("MYSQL_INSERT_BATCH", 1000)
+)  # executemany 한 번에 보내는 행 수 (다중 VALUES INSERT 로 합쳐짐)
+MYSQL_LOADER = os.getenv(
+    "MYSQL_LOADER", "executemany"
+)  # executemany 또는 infile (LOAD DATA LOCAL INFILE, 서버 local_infile 필요)
+
+# SQLite 성능 설정 (연결마다 PRAGMA 로 적용) - WAL 이라 크롤링 중에도 --stats 같은 조회가 가능
+SQLITE_CACHE_MB = int(os.getenv("SQLITE_CACHE_MB", 64))  # 연결별 페이지 캐시
+SQLITE_MMAP_MB = int(os.getenv("SQLITE_MMAP_MB", 256))  # 메모리 맵 크기 (0=사용 안 함)
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))  # 잠금 대기 시간
+SQLITE_BULK_LOAD = (
+    os.getenv("SQLITE_BULK_LOAD", "false").lower() == "true"
+)  # 대량 적재 모드 (synchronous=OFF, 전원 장애 시 마지막 커밋 유실 가능)
+
+# 시세 분석 (--analytics)
+ANALYTICS_WINDOW_DAYS = int(
+    os.getenv("ANALYTICS_WINDOW_DAYS", 28)
+)  # --since 가 없을 때 분석할 최근 기간
+ANALYTICS_CHUNK_SIZE = int(os.getenv("ANALYTICS_CHUNK_SIZE", 50000))  # 한 번에 읽는 행 수
+ANALYTICS_OUTLIER_Z = float(
+    os.getenv("ANALYTICS_OUTLIER_Z", 3.5)
+)  # |robust z| 이상이면 이상치
+
+# 크롤링이 성공하면 같은 범위의 이전 성공 실행과 시세를 비교 (price_changes)
+DIFF_AFTER_CRAWL = os.getenv("DIFF_AFTER_CRAWL", "true").lower() == "true"
 
 # 로깅 설정
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
-LOG_FILE = "encar_crawler.log"
+LOG_FILE = os.getenv("LOG_FILE", "encar_crawler.log")  # JSON 줄 형식, 비우면 파일 로그 안 남김
+LOG_FORMAT = os.getenv("LOG_FORMAT", "rich")  # rich 또는 json (콘솔 출력 형식)
+RESPONSE_LOG_SAMPLE_RATE = float(
+    os.getenv("RESPONSE_LOG_SAMPLE_RATE", 0.01)
+)  # DEBUG 에서 정상 응답 로그 비율
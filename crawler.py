@@ -5,29 +5,79 @@
 
 import asyncio
 import hashlib
-import time
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from typing import Dict, List, Optional, Set, Tuple
 
 from playwright.async_api import Page, async_playwright
-from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn
 
 import config
-from database import CarPrice, CrawlingLog, get_session
+from database import CrawlingLog, get_session
+from deeplink import build_deeplink_url
+from lease_queue import LeaseQueue
+from levels import LEVELS, LevelPolicy
+from option_cache import OptionCache
+from option_tree import OptionTreeDiff, OptionTreeRecorder, node_key, path_key
+from sampling import LeafSampler, SamplingPolicy
+from scheduler import CrawlBudget, FrontierScheduler
+from sharding import CrawlFilter
+from snapshot_parser import parse_option_html, parse_price_html
+from storage import HistorySink, make_writer
+from telemetry import NetworkTelemetry
+
+log = logging.getLogger("encar.crawler")
+
+# 옵션 계층 순서 (current_path 인덱스와 동일)
+LEVEL_ORDER = [level.dep_class for level in LEVELS]
+
+
+# _get_price_info 가 읽는 것과 같은 순서로 찾은 시세 문구 - 리프 선택 후 이 값이 바뀌어야 새 시세
+_PRICE_SIGNATURE_JS = """
+() => {
+    const text = document.body.textContent;
+    const match = text.match(/시세 미제공|거래량이 적어/) ||
+        text.match(/금주 시세[\\s\\S]*?[0-9,]+\\s*~\\s*[0-9,]+\\s*만원/) ||
+        text.match(/[0-9,]+\\s*~\\s*[0-9,]+\\s*만원/) ||
+        text.match(/[0-9,]+\\s*만원/);
+    return match ? match[0] : '';
+}
+"""
+
 
-console = Console()
+def dep_selector(dep_class: str) -> str:
+    """옵션 영역의 기준 셀렉터 (연료는 data-name 으로 찾는다)"""
+    if dep_class == "fuel":
+        return 'li .select.ui_select[data-name="fuel"]'
+    return f"li.{dep_class}"
 
 
 class EncarCrawler:
-    def __init__(self, headless: bool = config.HEADLESS):
+    def __init__(
+        self,
+        headless: bool = config.HEADLESS,
+        prioritize: bool = False,
+        budget_seconds: Optional[float] = None,
+        incremental: bool = False,
+        sample_unchanged: float = config.INCREMENTAL_SAMPLE_RATE,
+        use_option_cache: bool = config.OPTION_CACHE_ENABLED,
+        sampling: Optional[SamplingPolicy] = None,
+        crawl_filter: Optional[CrawlFilter] = None,
+        parse_mode: str = config.PARSE_MODE,
+        pipeline: bool = False,
+        storage_mode: str = config.STORAGE_MODE,
+        session=None,
+    ):
         self.headless = headless
         self.page: Optional[Page] = None
         self.dom = None  # 현재 DOM 컨텍스트(page 또는 frame)를 가리킨다
         self.browser = None
         self.context = None
         self.playwright = None
-        self.session = get_session()
+        self.session = session or get_session()
+        self.storage_mode = storage_mode  # wide 또는 normalized (storage.make_writer)
         self.crawling_log = None
 
         # 크롤링 상태 관리
@@ -35,8 +85,68 @@ class EncarCrawler:
         self.current_path: List[Dict] = []  # 현재 선택된 옵션 경로
         self.crawled_data: List[Dict] = []  # 크롤링된 데이터 임시 저장
 
+        # 우선순위/시간 예산 (예산이 있으면 우선순위 정렬도 켠다)
+        self.prioritize = prioritize or budget_seconds is not None
+        self.budget = CrawlBudget(budget_seconds)
+        self.budget_exhausted = False
+        self.scheduler: Optional[FrontierScheduler] = None
+
+        # 옵션 트리 스냅샷 기록 및 증분 크롤링 (이전 트리와 다른 노드만 방문)
+        self.incremental = incremental
+        self.sample_unchanged = sample_unchanged
+        self.tree_recorder: Optional[OptionTreeRecorder] = None
+        self.tree_diff: Optional[OptionTreeDiff] = None
+
+        # 옵션 트리 캐시 (드롭다운을 열지 않고 옵션 목록 재사용)
+        # 증분 모드는 새로 열거한 목록(.rt 시세 텍스트 포함)을 이전 트리와 비교해야 하므로 캐시를 쓰지 않는다
+        self.option_cache: Optional[OptionCache] = None
+        if use_option_cache and incremental:
+            log.info("증분 크롤링에서는 옵션 트리 캐시를 사용하지 않습니다")
+        elif use_option_cache:
+            self.option_cache = OptionCache()
+            self.option_cache.load()
+        self.enumerate_only = False  # 캐시 warm 시 리프 가격 조회 생략
+
+        # 세부등급 리프 선택 정책 (실행 기본값 + 제조사별)
+        self.sampling = sampling or SamplingPolicy.from_assignments(
+            config.LEAF_SAMPLING, config.LEAF_SAMPLING_BY_MANUFACTURER
+        )
+
+        # 제조사/모델 필터 및 샤딩
+        self.crawl_filter = crawl_filter
+
+        # 파싱 모드: browser(evaluate) 또는 pool(HTML 스냅샷을 프로세스 풀에서 파싱)
+        self.parse_mode = parse_mode
+        self.parse_pool: Optional[ProcessPoolExecutor] = None
+
+        # 파이프라인 모드: 두 번째 탭이 같은 경로를 재현해 세부등급을 번갈아 처리
+        self.pipeline = pipeline
+        self.lane: Optional["EncarCrawler"] = None
+
+        # 레벨 순회 상태: 명시적 스택 [(레벨 인덱스, 남은 옵션 목록)] 과 레벨별 추가 정책
+        self.level_policies: Dict[str, List[LevelPolicy]] = {}
+        self.stack: List[Tuple[int, List[Dict]]] = []
+        self.skip_keys: Set[str] = set()  # 다른 워커에게 넘겨 이 실행에서는 건너뛸 경로 키
+        self.stop_requested = False
+        self.skipped_interactions = 0  # 이미 선택되어 있어 드롭다운 조작을 생략한 횟수
+        # 레벨별로 마지막에 직접 선택했을 때의 상위 경로 키 - hidden input 값이 같아도
+        # 상위 선택이 바뀐 뒤 남은 값이면 선택을 생략하지 않는다
+        self.selected_under: Dict[str, str] = {}
+        self.navigation_guard = True  # 시세 페이지를 벗어나면 되돌린다 (goto_path 중에는 끔)
+        self.deeplink_url: Optional[str] = None  # goto_path 가 마지막으로 도착한 주소
+
+        # 네트워크 요청 집계 (URL 패턴별/레벨별)
+        self.telemetry = NetworkTelemetry()
+
     async def initialize(self):
         """브라우저 초기화"""
+        if self.parse_mode == "pool":
+            # 브라우저 프로세스를 물려받지 않도록 spawn 으로 워커를 띄운다
+            self.parse_pool = ProcessPoolExecutor(
+                max_workers=config.PARSE_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+
         self.playwright = await async_playwright().start()
 
         # 기존 브라우저 선택은 유지하되, 탐지 우회를 위한 컨텍스트 옵션을 강화한다.
@@ -74,15 +184,46 @@ class EncarCrawler:
 
         self.page = await self.context.new_page()
         self.dom = self.page
+        self._attach_page_handlers()
 
-        # 네트워크/리다이렉트 로깅
-        self.page.on(
-            "response", lambda resp: asyncio.create_task(self._log_response(resp))
-        )
+        log.info("브라우저/컨텍스트 초기화 완료")
+
+    def _attach_page_handlers(self):
+        # 네트워크 요청 집계 (오류 응답은 경고 로그)
+        self.telemetry.attach(self.page)
         self.page.on("console", lambda msg: None)  # 필요 시 콘솔 로그 수집
         self.page.on("framenavigated", self._handle_navigation)
 
-        console.print("[cyan]브라우저/컨텍스트 초기화 완료[/cyan]")
+    async def _get_lane(self) -> "EncarCrawler":
+        """파이프라인용 두 번째 탭 - 같은 컨텍스트/세션을 공유하는 크롤러"""
+        if self.lane is None:
+            lane = EncarCrawler(
+                headless=self.headless, use_option_cache=False, session=self.session
+            )
+            lane.context = self.context
+            lane.parse_pool = self.parse_pool
+            lane.telemetry = self.telemetry
+            lane.page = await self.context.new_page()
+            lane.dom = lane.page
+            lane._attach_page_handlers()
+            await lane.navigate_to_price_page()
+            self.lane = lane
+            log.info("파이프라인 탭 준비 완료")
+        return self.lane
+
+    async def _sync_lane(self, lane: "EncarCrawler", path: List[Dict]):
+        """두 번째 탭의 선택 경로를 path 와 맞춘다 (달라진 레벨부터만 다시 선택)"""
+        same = 0
+        limit = min(len(lane.current_path), len(path))
+        while same < limit and node_key(lane.current_path[same]) == node_key(
+            path[same]
+        ):
+            same += 1
+        lane.current_path = lane.current_path[:same]
+        for dep_class, option in zip(LEVEL_ORDER[same:], path[same:]):
+            if not await lane._select_and_settle(dep_class, option):
+                raise Exception(f"파이프라인 탭 경로 재현 실패: {option.get('text')}")
+            lane.current_path = lane.current_path + [option]
 
     async def _close_price_guide_if_present(self):
         """시세 페이지 진입 시 노출되는 가이드 레이어가 있으면 '다시보지않기'를 클릭해 닫는다."""
@@ -155,7 +296,7 @@ class EncarCrawler:
                         )
                         if el:
                             self.dom = fr
-                            console.print("[cyan]iframe 컨텍스트로 전환됨[/cyan]")
+                            log.info("iframe 컨텍스트로 전환됨")
                             return True
                 except Exception:
                     continue
@@ -165,21 +306,16 @@ class EncarCrawler:
         self.dom = self.page
         return False
 
-    async def _log_response(self, resp):
-        try:
-            req = resp.request
-            from_url = getattr(req, "redirected_from", None)
-            redir = " (redirected)" if from_url else ""
-            console.print(f"[dim]{resp.status} {resp.url}{redir}[/dim]")
-        except Exception:
-            pass
-
     async def _handle_navigation(self, frame):
-        """페이지 이동 감지 및 방지"""
+        """페이지 이동 감지 및 방지 (goto_path 로 경로를 이동하는 동안은 건너뛴다)"""
+        if not self.navigation_guard:
+            return
         if frame == self.page.main_frame:
             current_url = frame.url
+            if current_url == self.deeplink_url:
+                return  # goto_path 중에 발생했지만 늦게 처리되는 이동 이벤트
             if not current_url.startswith("https://www.encar.com/pr/pr_index.do"):
-                console.print(f"[red]예상치 못한 페이지 이동 감지: {current_url}[/red]")
+                log.error(f"예상치 못한 페이지 이동 감지: {current_url}")
                 # 시세 페이지로 다시 이동
                 try:
                     await self.page.goto(
@@ -187,9 +323,9 @@ class EncarCrawler:
                         wait_until="domcontentloaded",
                         timeout=10000,
                     )
-                    console.print("[green]시세 페이지로 복구 완료[/green]")
+                    log.info("시세 페이지로 복구 완료")
                 except Exception as e:
-                    console.print(f"[red]페이지 복구 실패: {e}[/red]")
+                    log.error(f"페이지 복구 실패: {e}")
                     raise
 
     async def wait_for_element_change(
@@ -199,22 +335,54 @@ class EncarCrawler:
         old_value: Optional[str] = None,
         timeout: int = 10000,
     ) -> bool:
-        """요소의 텍스트/속성이 변경될 때까지 대기"""
-        deadline = time.time() + timeout / 1000.0
-        while time.time() < deadline:
-            try:
-                el = await self.dom.query_selector(selector)
-                if el:
-                    if attribute in ("innerText", "textContent"):
-                        current = await el.inner_text()
-                    else:
-                        current = await el.get_attribute(attribute)
-                    if current != old_value:
-                        return True
-            except Exception:
-                pass
-            await asyncio.sleep(0.1)
-        return False
+        """요소의 텍스트/속성이 old_value 와 달라질 때까지 대기
+
+        페이지 안에 MutationObserver 를 걸고 Promise 로 기다리므로 파이썬 쪽 폴링이 없다.
+        요소가 없으면 나타날 때까지 기다리며, timeout 안에 바뀌지 않으면 False.
+        """
+        try:
+            return await self.dom.evaluate(
+                """
+                ([selector, attribute, oldValue, timeout]) => new Promise(resolve => {
+                    const read = () => {
+                        const el = document.querySelector(selector);
+                        if (!el) return undefined;
+                        if (attribute === 'innerText' || attribute === 'textContent') {
+                            return el[attribute];
+                        }
+                        return el.getAttribute(attribute);
+                    };
+                    const changed = () => {
+                        const current = read();
+                        return current !== undefined && current !== oldValue;
+                    };
+                    if (changed()) return resolve(true);
+
+                    let timer = null;
+                    const observer = new MutationObserver(() => {
+                        if (changed()) {
+                            observer.disconnect();
+                            clearTimeout(timer);
+                            resolve(true);
+                        }
+                    });
+                    observer.observe(document.body, {
+                        subtree: true,
+                        childList: true,
+                        characterData: true,
+                        attributes: true,
+                    });
+                    timer = setTimeout(() => {
+                        observer.disconnect();
+                        resolve(changed());
+                    }, timeout);
+                })
+            """,
+                [selector, attribute, old_value, timeout],
+            )
+        except Exception:
+            # 대기 중 페이지가 바뀌면 evaluate 컨텍스트가 사라진다
+            return False
 
     async def _find_ui_dep(self, dep_class: str):
         """li.op_dep* 영역에서 메뉴/컨테이너/히든인풋을 찾는다."""
@@ -337,7 +505,8 @@ class EncarCrawler:
 
     async def navigate_to_price_page(self):
         """엔카 시세 페이지로 이동 및 팝업 처리"""
-        console.print("[cyan]엔카 시세 페이지로 이동 중...[/cyan]")
+        log.info("엔카 시세 페이지로 이동 중...")
+        self.selected_under = {}
 
         # 직접 시세 페이지로 이동 (지연 제거)
         await self.page.goto(
@@ -351,30 +520,7 @@ class EncarCrawler:
 
         # 페이지 로딩 대기 및 검증
         await self.dom.wait_for_selector("li.op_dep1", timeout=10000)
-        console.print("[green]시세 페이지 로딩 완료[/green]")
-
-    async def wait_for_element_change(
-        self,
-        selector: str,
-        attribute: str = "innerText",
-        old_value: str = None,
-        timeout: int = 10000,
-    ) -> bool:
-        """요소의 속성이 변경될 때까지 대기"""
-        start_time = time.time()
-
-        while (time.time() - start_time) * 1000 < timeout:
-            try:
-                element = await self.dom.query_selector(selector)
-                if element:
-                    current_value = await element.get_attribute(attribute)
-                    if current_value != old_value:
-                        return True
-            except:
-                pass
-            await asyncio.sleep(0.1)
-
-        return False
+        log.info("시세 페이지 로딩 완료")
 
     async def get_select_options(self, select_id: str) -> List[Dict[str, str]]:
         """옵션 리스트를 가져온다.
@@ -389,7 +535,7 @@ class EncarCrawler:
                     select_id if select_id != "op_fuel" else "fuel"
                 )
             except Exception as e:
-                console.print(f"[red]신 UI 옵션 파싱 실패 ({select_id}): {e}[/red]")
+                log.error(f"신 UI 옵션 파싱 실패 ({select_id}): {e}")
                 return []
 
         # 2) 구형 select fallback
@@ -414,7 +560,7 @@ class EncarCrawler:
             )
             return options
         except Exception as e:
-            console.print(f"[red]옵션 가져오기 실패 ({select_id}): {e}[/red]")
+            log.error(f"옵션 가져오기 실패 ({select_id}): {e}")
             return []
 
     async def select_option_with_retry(
@@ -433,7 +579,7 @@ class EncarCrawler:
                     select_id if select_id != "op_fuel" else "fuel", code_or_text
                 )
             except Exception as e:
-                console.print(f"[red]신 UI 선택 실패 ({select_id}/{text}): {e}[/red]")
+                log.error(f"신 UI 선택 실패 ({select_id}/{text}): {e}")
                 return False
 
         # 구형 select 요소 경로 (fallback)
@@ -460,13 +606,13 @@ class EncarCrawler:
                 if success:
                     await self.page.wait_for_timeout(200)
                     return True
-                console.print(
-                    f"[yellow]옵션 미선택, 재시도 {attempt + 1}/{max_retries}: {select_id} - {text}({value})[/yellow]"
+                log.warning(
+                    f"옵션 미선택, 재시도 {attempt + 1}/{max_retries}: {select_id} - {text}({value})"
                 )
                 await self.page.wait_for_timeout(300)
             except Exception as e:
-                console.print(
-                    f"[yellow]옵션 선택 재시도 {attempt + 1}/{max_retries}: {select_id} - {text}({value}) => {e}[/yellow]"
+                log.warning(
+                    f"옵션 선택 재시도 {attempt + 1}/{max_retries}: {select_id} - {text}({value}) => {e}"
                 )
                 await self.page.wait_for_timeout(300)
         return False
@@ -477,7 +623,7 @@ class EncarCrawler:
             # 신 UI: li[data-name="fuel"] 내부 옵션
             return await self._ui_list_options("fuel")
         except Exception as e:
-            console.print(f"[yellow]연료 옵션(UI) 파싱 실패, 구형 방식 시도: {e}[/yellow]")
+            log.warning(f"연료 옵션(UI) 파싱 실패, 구형 방식 시도: {e}")
         # 구형 대비 fallback
         try:
             fuel_options = await self.dom.evaluate(
@@ -499,7 +645,7 @@ class EncarCrawler:
             )
             return fuel_options or []
         except Exception as e2:
-            console.print(f"[red]연료 옵션 파싱 실패: {e2}[/red]")
+            log.error(f"연료 옵션 파싱 실패: {e2}")
             return []
 
     async def select_fuel_option(self, value: str) -> bool:
@@ -527,7 +673,7 @@ class EncarCrawler:
                 """
                 )
             except Exception as e:
-                console.print(f"[red]연료 선택 실패: {e}[/red]")
+                log.error(f"연료 선택 실패: {e}")
                 return False
 
     async def get_price_info(self) -> Tuple[Optional[float], bool, str]:
@@ -591,22 +737,25 @@ class EncarCrawler:
             )
 
         except Exception as e:
-            console.print(f"[red]가격 정보 가져오기 실패: {e}[/red]")
+            log.error(f"가격 정보 가져오기 실패: {e}")
             return None, False, str(e)
 
     async def crawl_all_combinations(self):
         """요구사항에 맞는 모든 옵션 조합 크롤링 - 1가지씩 선택하는 방식"""
         start_time = datetime.now()
-        total_combinations = 0
         success_count = 0
         failed_count = 0
 
         # 크롤링 로그 시작
-        self.crawling_log = CrawlingLog(started_at=start_time, status="RUNNING")
-        self.session.add(self.crawling_log)
-        self.session.commit()
+        self._start_crawling_log(
+            start_time,
+            self.crawl_filter.shard_id if self.crawl_filter else None,
+            self.crawl_scope(),
+        )
 
         try:
+            self._prepare_planners()
+
             await self.navigate_to_price_page()
 
             # 1단계: op_dep1 (제조사)부터 시작
@@ -616,303 +765,824 @@ class EncarCrawler:
             success_count, failed_count = await self._save_crawled_data()
 
         except Exception as e:
-            console.print(f"[red]크롤링 중 오류 발생: {e}[/red]")
+            log.error(f"크롤링 중 오류 발생: {e}")
             import traceback
 
-            console.print(f"[red]{traceback.format_exc()}[/red]")
+            log.error(f"{traceback.format_exc()}")
 
         finally:
-            # 크롤링 로그 업데이트
-            self.crawling_log.ended_at = datetime.now()
-            self.crawling_log.total_combinations = len(self.crawled_data)
-            self.crawling_log.success_count = success_count
-            self.crawling_log.failed_count = failed_count
-            self.crawling_log.status = "SUCCESS" if failed_count == 0 else "PARTIAL"
-            self.session.commit()
-
-            console.print("\n[bold cyan]크롤링 완료![/bold cyan]")
-            console.print(f"총 조합: {len(self.crawled_data)}")
-            console.print(f"성공: {success_count}")
-            console.print(f"실패: {failed_count}")
-            console.print(f"소요 시간: {datetime.now() - start_time}")
+            self._finish_crawling_log(
+                start_time, len(self.crawled_data), success_count, failed_count
+            )
 
-    async def _crawl_from_level(self, start_level: int):
-        """특정 레벨부터 크롤링 시작"""
-        console.print(f"[cyan]레벨 {start_level}부터 크롤링 시작[/cyan]")
+    async def crawl_leased_tasks(self, queue: LeaseQueue):
+        """워커 모드 - 임대 큐에서 서브트리 작업을 가져와 끝날 때까지 크롤링"""
+        start_time = datetime.now()
+        total_count = 0
+        success_count = 0
+        failed_count = 0
 
-        # op_dep1부터 시작
-        if start_level == 1:
-            await self._crawl_manufacturers()
+        self._start_crawling_log(start_time, f"lease:{queue.owner}")
 
-    async def _crawl_manufacturers(self):
-        """제조사(op_dep1) 크롤링 - 모든 제조사 크롤링"""
-        console.print("[cyan]제조사 크롤링 시작[/cyan]")
+        try:
+            self._prepare_planners()
+
+            while not self._budget_exceeded():
+                lease = queue.claim()
+                if lease is None:
+                    if not queue.has_active():
+                        break
+                    # 다른 워커가 임대 중인 작업이 만료되면 가져간다
+                    await asyncio.sleep(config.LEASE_POLL_SECONDS)
+                    continue
 
-        # 제조사 옵션 가져오기
-        manufacturers = await self._get_options("op_dep1")
-        console.print(f"[green]제조사 {len(manufacturers)}개 발견[/green]")
+                path = queue.path_of(lease)
+                label = " ".join(item["text"] for item in path)
+                log.info(f"작업 임대: {label} (시도 {lease.attempts})")
+                heartbeat = asyncio.create_task(self._heartbeat_lease(queue, lease))
+                try:
+                    # 이전 시도에서 다른 워커에게 넘긴 하위 경로는 그쪽 작업으로 크롤링된다
+                    self.skip_keys = queue.donated_keys(lease)
+                    await self._crawl_subtree(path)
+                    saved, failed = await self._save_crawled_data()
+                    total_count += len(self.crawled_data)
+                    success_count += saved
+                    failed_count += failed
+                    self.crawled_data = []
+                    if self._budget_exceeded():
+                        # 예산 소진/중단 요청으로 멈춘 서브트리는 시도 횟수를 쓰지 않고 반납해
+                        # 다른 워커가 이어서 하도록 한다
+                        queue.release(lease)
+                    elif not queue.complete(lease):
+                        log.warning(f"임대가 만료되어 다른 워커에게 넘어감: {label}")
+                except Exception as e:
+                    log.error(f"작업 실패: {label} - {e}")
+                    self.crawled_data = []
+                    queue.fail(lease, str(e))
+                finally:
+                    heartbeat.cancel()
+                    self.skip_keys = set()
 
-        # 모든 제조사 크롤링
-        for i, manufacturer in enumerate(manufacturers):
-            if i == 0:  # 첫 번째는 "제조사" 플레이스홀더
-                continue
+        except Exception as e:
+            log.error(f"워커 실행 중 오류 발생: {e}")
+            import traceback
 
-            # 시세 미제공인 경우 건너뛰기
-            if "시세 미제공" in manufacturer.get("price_text", ""):
-                console.print(f"[yellow]건너뛰기: {manufacturer['text']} - 시세 미제공[/yellow]")
-                continue
+            log.error(f"{traceback.format_exc()}")
 
-            console.print(f"[cyan]제조사 선택 시도: {manufacturer['text']}[/cyan]")
-            # 제조사 선택
-            if await self._select_option("op_dep1", manufacturer):
-                self.current_path = [manufacturer]
-                console.print(f"[green]제조사 선택 완료: {manufacturer['text']}[/green]")
-                await self.dom.wait_for_timeout(2000)  # 2초 대기
-                await self._crawl_models()
-            else:
-                console.print(f"[red]제조사 선택 실패: {manufacturer['text']}[/red]")
-                continue  # 실패해도 다음 제조사로 계속
+        finally:
+            self._finish_crawling_log(
+                start_time, total_count, success_count, failed_count
+            )
+            log.info(f"작업 현황: {queue.counts()}")
 
-    async def _crawl_models(self):
-        """모델(op_dep2) 크롤링 - 모든 모델 크롤링"""
-        console.print("[cyan]모델 크롤링 시작[/cyan]")
+    async def _heartbeat_lease(self, queue: LeaseQueue, lease):
+        """작업하는 동안 주기적으로 임대를 연장하고, 기다리는 워커가 있으면 남은 작업을 나눠 준다"""
+        while True:
+            await asyncio.sleep(config.LEASE_HEARTBEAT_SECONDS)
+            try:
+                if not queue.heartbeat(lease):
+                    log.warning("임대 연장 실패 - 다른 워커가 가져갔습니다")
+                    return
+                # 대기 작업이 없고 빈손으로 기다리는 워커가 있을 때만 남은 형제 서브트리를 내놓는다
+                # (단일 워커이거나 모두 바쁠 때 쪼개면 작업만 잘게 흩어진다)
+                if queue.counts().get("PENDING", 0) == 0 and queue.has_waiting():
+                    paths = self.donate_work(config.STEAL_MAX_DEPTH, config.STEAL_BATCH)
+                    if paths:
+                        # 기록을 먼저 남겨야 이 임대가 풀로 돌아가도 넘긴 경로를 다시 크롤링하지 않는다
+                        queue.record_donation(lease, paths)
+                        added = queue.seed(paths)
+                        log.info("남은 서브트리 %s개를 다른 워커에게 넘김", added)
+            except Exception as e:
+                log.error(f"하트비트 실패: {e}")
 
-        models = await self._get_options("op_dep2")
-        console.print(f"[green]모델 {len(models)}개 발견[/green]")
+    async def plan_lease_tasks(self, depth: int) -> List[List[Dict]]:
+        """코디네이터 - 제조사(depth=1) 또는 제조사/모델(depth=2) 경로 작업 목록 생성
 
-        # 모든 모델 크롤링
-        for model in models:
-            if "시세 미제공" in model.get("price_text", ""):
-                console.print(f"[yellow]건너뛰기: {model['text']} - 시세 미제공[/yellow]")
-                continue
+        옵션 트리 캐시에 있으면 브라우저 없이 만들고, 없는 부분만 페이지에서 열거한다.
+        """
+        page_ready = False
 
-            if await self._select_option("op_dep2", model):
-                self.current_path = self.current_path[:1] + [model]
-                console.print(f"[green]모델 선택 완료: {model['text']}[/green]")
-                await self.dom.wait_for_timeout(2000)  # 2초 대기
-                await self._crawl_detailed_models()
-            else:
-                console.print(f"[red]모델 선택 실패: {model['text']}[/red]")
-                continue  # 실패해도 다음 모델로 계속
+        async def ensure_page():
+            nonlocal page_ready
+            if not page_ready:
+                await self.navigate_to_price_page()
+                page_ready = True
 
-    async def _crawl_detailed_models(self):
-        """세부모델(op_dep3) 크롤링 - 모든 세부모델 크롤링"""
-        console.print("[cyan]세부모델 크롤링 시작[/cyan]")
+        self.current_path = []
+        manufacturers = (
+            self.option_cache.get("op_dep1", []) if self.option_cache else None
+        )
+        if manufacturers is None:
+            await ensure_page()
+            manufacturers = await self._get_options("op_dep1")
+        manufacturers = [
+            m
+            for m in self._plan_level("op_dep1", manufacturers[1:])
+            if "시세 미제공" not in m.get("price_text", "")
+        ]
+        if depth <= 1:
+            return [[m] for m in manufacturers]
+
+        paths = []
+        for manufacturer in manufacturers:
+            self.current_path = [manufacturer]
+            models = (
+                self.option_cache.get("op_dep2", self.current_path)
+                if self.option_cache
+                else None
+            )
+            if models is None:
+                await ensure_page()
+                if not await self._select_option("op_dep1", manufacturer):
+                    log.error(f"제조사 선택 실패: {manufacturer['text']}")
+                    continue
+                await self.dom.wait_for_timeout(2000)
+                models = await self._get_options("op_dep2")
+            for model in self._plan_level("op_dep2", models):
+                if "시세 미제공" not in model.get("price_text", ""):
+                    paths.append([manufacturer, model])
+        self._save_option_cache()
+        return paths
+
+    async def _crawl_subtree(self, path: List[Dict]):
+        """경로를 처음부터 다시 선택한 뒤 그 아래 서브트리를 크롤링"""
+        await self.navigate_to_price_page()
+        self.current_path = []
+        for dep_class, option in zip(LEVEL_ORDER, path):
+            if not await self._select_and_settle(dep_class, option):
+                raise Exception(f"경로 재현 실패: {dep_class} {option.get('text')}")
+            self.current_path = self.current_path + [option]
+
+        await self._traverse(path)
+
+    async def goto_path(self, path: List[Dict], mode: str = "auto") -> str:
+        """저장된 경로로 바로 이동한 뒤 레벨별 선택 상태를 확인. 성공한 이동 방식 반환
+
+        auto 는 url(템플릿이 있을 때) -> form -> click 순으로 시도한다.
+        """
+        if mode == "auto":
+            modes = ["url"] if config.DEEPLINK_URL_TEMPLATE else []
+            modes += ["form", "click"]
+        else:
+            modes = [mode]
+
+        # 딥링크/폼 제출은 메인 프레임을 시세 첫 페이지가 아닌 주소로 옮기므로, 이동하는 동안은
+        # 페이지 이탈 복구(_handle_navigation)가 시세 첫 페이지로 되돌리지 않게 한다
+        self.navigation_guard = False
+        try:
+            for candidate in modes:
+                try:
+                    if candidate == "url":
+                        await self._goto_path_url(path)
+                    elif candidate == "form":
+                        await self._submit_path_form(path)
+                    else:
+                        await self._click_path(path)
+                except Exception as e:
+                    log.warning(f"경로 이동 실패 ({candidate}): {e}")
+                    continue
+
+                mismatched = await self._path_mismatches(path)
+                if not mismatched:
+                    self.current_path = list(path)
+                    for i, dep_class in enumerate(LEVEL_ORDER[: len(path)]):
+                        self.selected_under[dep_class] = path_key(path[:i])
+                    return candidate
+                log.warning(f"경로 이동 후 선택 상태 불일치 ({candidate}): {', '.join(mismatched)}")
+            raise Exception(f"경로로 이동 실패: {' '.join(item['text'] for item in path)}")
+        finally:
+            self.deeplink_url = self.page.url
+            self.navigation_guard = True
+
+    async def _goto_path_url(self, path: List[Dict]):
+        if not config.DEEPLINK_URL_TEMPLATE:
+            raise Exception("DEEPLINK_URL_TEMPLATE 이 설정되지 않았습니다")
+        url = build_deeplink_url(config.DEEPLINK_URL_TEMPLATE, LEVEL_ORDER, path)
+        await self.page.goto(url, wait_until="domcontentloaded", timeout=30000)
+        await self.dismiss_price_guide()
+        await self._switch_to_price_frame_if_exists()
+        await self.dom.wait_for_selector("li.op_dep1", timeout=10000)
 
-        detailed_models = await self._get_options("op_dep3")
-        console.print(f"[green]세부모델 {len(detailed_models)}개 발견[/green]")
+    async def _submit_path_form(self, path: List[Dict]):
+        """prForm 의 레벨별 hidden input 에 경로 값을 채워 제출"""
+        if not (self.page.url or "").startswith(config.ENCAR_URL):
+            await self.navigate_to_price_page()
+
+        async with self.dom.expect_navigation(
+            wait_until="domcontentloaded", timeout=10000
+        ):
+            submitted = await self.dom.evaluate(
+                """
+                ([selectors, values]) => {
+                    const form = document.querySelector('form[name="prForm"]');
+                    if (!form) return false;
+                    selectors.forEach((selector, i) => {
+                        const el = document.querySelector(selector);
+                        const li = el ? el.closest('li') : null;
+                        const input = li ? li.querySelector('input.ui_inpt') : null;
+                        if (input) input.value = values[i] || '';
+                    });
+                    form.submit();
+                    return true;
+                }
+            """,
+                [
+                    [dep_selector(dep_class) for dep_class in LEVEL_ORDER],
+                    [option.get("value", "") for option in path],
+                ],
+            )
+            if not submitted:
+                raise Exception("prForm 을 찾을 수 없습니다")
 
-        # 모든 세부모델 크롤링
-        for detailed_model in detailed_models:
-            if "시세 미제공" in detailed_model.get("price_text", ""):
-                console.print(
-                    f"[yellow]건너뛰기: {detailed_model['text']} - 시세 미제공[/yellow]"
+        await self.dismiss_price_guide()
+        await self._switch_to_price_frame_if_exists()
+        await self.dom.wait_for_selector("li.op_dep1", timeout=10000)
+
+    async def _click_path(self, path: List[Dict]):
+        """레벨마다 현재 옵션 목록에서 저장된 값을 찾아 선택 (코드가 없는 저장 경로용)"""
+        await self.navigate_to_price_page()
+        self.current_path = []
+        for dep_class, stored in zip(LEVEL_ORDER, path):
+            options = (
+                await self._get_fuel_options()
+                if dep_class == "fuel"
+                else await self._get_options(dep_class)
+            )
+            option = next(
+                (o for o in options if o.get("value") == stored.get("value")),
+                None,
+            ) or next((o for o in options if o.get("text") == stored.get("text")), None)
+            if not option:
+                raise Exception(f"옵션이 더 이상 없습니다: {dep_class} {stored.get('text')}")
+            if not await self._select_and_settle(dep_class, option):
+                raise Exception(f"옵션 선택 실패: {dep_class} {option.get('text')}")
+            self.current_path = self.current_path + [option]
+
+    async def _path_mismatches(self, path: List[Dict]) -> List[str]:
+        """레벨별 드롭다운 표시값이 경로와 다른 레벨 목록"""
+        labels = await self.dom.evaluate(
+            """
+            (selectors) => selectors.map(selector => {
+                const el = document.querySelector(selector);
+                const li = el ? el.closest('li') : null;
+                const menu = li ? li.querySelector('a.select_menu.ui_menu') : null;
+                if (!menu) return '';
+                const label = menu.querySelector('.ui_menu_txt') || menu;
+                return label.textContent.trim();
+            })
+        """,
+            [dep_selector(dep_class) for dep_class in LEVEL_ORDER[: len(path)]],
+        )
+        return [
+            dep_class
+            for dep_class, option, label in zip(LEVEL_ORDER, path, labels)
+            if not label or option["text"] not in label
+        ]
+
+    async def recheck_leaves(
+        self, leaves: List[Tuple[List[Dict], Optional[float]]], mode: str = "auto"
+    ) -> List[Dict]:
+        """알려진 리프 몇 개로 바로 이동해 시세를 다시 읽고 저장된 시세와 비교"""
+        start_time = datetime.now()
+        success_count = 0
+        failed_count = 0
+        results = []
+
+        self._start_crawling_log(start_time, "recheck")
+        try:
+            for path, expected in leaves:
+                if self._budget_exceeded():
+                    break
+                label = " ".join(item["text"] for item in path)
+                try:
+                    used = await self.goto_path(path, mode)
+                except Exception as e:
+                    log.error(f"{e}")
+                    results.append(
+                        {
+                            "label": label,
+                            "expected": expected,
+                            "price": None,
+                            "mode": None,
+                        }
+                    )
+                    continue
+
+                price, is_available, message = await self._get_price_info()
+                self._record_leaf(self.current_path, price, is_available, message)
+                results.append(
+                    {
+                        "label": label,
+                        "expected": expected,
+                        "price": price if is_available else None,
+                        "mode": used,
+                    }
                 )
-                continue
 
-            if await self._select_option("op_dep3", detailed_model):
-                self.current_path = self.current_path[:2] + [detailed_model]
-                console.print(f"[green]세부모델 선택 완료: {detailed_model['text']}[/green]")
-                await self.dom.wait_for_timeout(2000)  # 2초 대기
-                await self._crawl_years()
-            else:
-                console.print(f"[red]세부모델 선택 실패: {detailed_model['text']}[/red]")
-                continue  # 실패해도 다음 세부모델로 계속
+            success_count, failed_count = await self._save_crawled_data()
+        finally:
+            self._finish_crawling_log(
+                start_time, len(self.crawled_data), success_count, failed_count
+            )
+        return results
 
-    async def _crawl_years(self):
-        """연식(op_dep4) 크롤링 - 모든 연식 크롤링"""
-        console.print("[cyan]연식 크롤링 시작[/cyan]")
+    def crawl_scope(self) -> Optional[str]:
+        """제조사/모델 필터, 리프 샘플링, 증분 방문으로 일부만 보는 실행의 범위 (전체면 None)"""
+        parts = [
+            self.crawl_filter.describe() if self.crawl_filter else None,
+            f"sampling={self.sampling.describe()}"
+            if self.sampling.describe()
+            else None,
+            "incremental" if self.incremental else None,
+        ]
+        return " ".join(part for part in parts if part) or None
+
+    def _start_crawling_log(
+        self, start_time: datetime, shard: Optional[str], scope: Optional[str] = None
+    ):
+        """크롤링 로그 행과 옵션 트리 기록기 생성 (이전 실행의 중단 상태는 초기화)"""
+        self.stop_requested = False
+        self.budget_exhausted = False
+        self.crawling_log = CrawlingLog(
+            started_at=start_time, status="RUNNING", shard=shard, scope=scope
+        )
+        self.session.add(self.crawling_log)
+        self.session.commit()
 
-        years = await self._get_options("op_dep4")
-        console.print(f"[green]연식 {len(years)}개 발견[/green]")
+        self.tree_recorder = OptionTreeRecorder(self.session, self.crawling_log.id)
 
-        # 모든 연식 크롤링
-        for year in years:
-            if "시세 미제공" in year.get("price_text", ""):
-                console.print(f"[yellow]건너뛰기: {year['text']} - 시세 미제공[/yellow]")
-                continue
+    def _prepare_planners(self):
+        """증분 비교/프론티어 스케줄러 로드 및 시간 예산 시작"""
+        if self.incremental:
+            self.tree_diff = OptionTreeDiff(
+                self.session,
+                sample_rate=self.sample_unchanged,
+                exclude_crawl_log_id=self.crawling_log.id,
+            )
+            node_count = self.tree_diff.load()
+            log.info(f"증분 크롤링: 이전 옵션 트리 노드 {node_count}개 로드")
 
-            if await self._select_option("op_dep4", year):
-                self.current_path = self.current_path[:3] + [year]
-                console.print(f"[green]연식 선택 완료: {year['text']}[/green]")
-                await self.dom.wait_for_timeout(2000)  # 2초 대기
-                await self._crawl_fuel_options()
-            else:
-                console.print(f"[red]연식 선택 실패: {year['text']}[/red]")
-                continue  # 실패해도 다음 연식으로 계속
-
-    async def _crawl_fuel_options(self):
-        """연료 옵션 크롤링 - 모든 연료 크롤링"""
-        console.print("[cyan]연료 옵션 크롤링 시작[/cyan]")
-
-        fuel_options = await self._get_fuel_options()
-        console.print(f"[green]연료 옵션 {len(fuel_options)}개 발견[/green]")
-
-        # 모든 연료 크롤링
-        for fuel in fuel_options:
-            if await self._select_fuel_option(fuel):
-                self.current_path = self.current_path[:4] + [fuel]
-                console.print(f"[green]연료 선택 완료: {fuel['text']}[/green]")
-                await self.dom.wait_for_timeout(2000)  # 2초 대기
-                await self._crawl_grades()
-            else:
-                console.print(f"[red]연료 선택 실패: {fuel['text']}[/red]")
-                continue  # 실패해도 다음 연료로 계속
+        if self.prioritize:
+            self.scheduler = FrontierScheduler(self.session)
+            leaf_count = self.scheduler.load()
+            log.info(f"프론티어 스케줄러: 기존 리프 {leaf_count}개 로드")
+        self.budget = CrawlBudget(self.budget.seconds)
 
-    async def _crawl_grades(self):
-        """등급(op_dep5) 크롤링 - 모든 등급 크롤링"""
-        console.print("[cyan]등급 크롤링 시작[/cyan]")
+    def _finish_crawling_log(
+        self,
+        start_time: datetime,
+        total_count: int,
+        success_count: int,
+        failed_count: int,
+    ):
+        """옵션 캐시/트리 저장 후 크롤링 로그 마무리 및 요약 출력"""
+        self._save_option_cache()
+        self.telemetry.flush("run", LEVEL_ORDER)
+
+        # 이번 실행의 옵션 트리 저장
+        try:
+            self.tree_recorder.flush()
+        except Exception as e:
+            log.error(f"옵션 트리 저장 실패: {e}")
+            self.session.rollback()
+
+        # 크롤링 로그 업데이트
+        self.crawling_log.ended_at = datetime.now()
+        self.crawling_log.total_combinations = total_count
+        self.crawling_log.success_count = success_count
+        self.crawling_log.failed_count = failed_count
+        self.crawling_log.status = (
+            "SUCCESS"
+            if failed_count == 0
+            and not self.budget_exhausted
+            and not self.stop_requested
+            else "PARTIAL"
+        )
+        self.session.commit()
 
-        grades = await self._get_options("op_dep5")
-        console.print(f"[green]등급 {len(grades)}개 발견[/green]")
+        log.info("크롤링 완료!")
+        log.info(f"총 조합: {total_count}")
+        log.info(f"성공: {success_count}")
+        log.info(f"실패: {failed_count}")
+        log.info(f"소요 시간: {datetime.now() - start_time}")
+        skipped = self.skipped_interactions + (
+            self.lane.skipped_interactions if self.lane else 0
+        )
+        if skipped:
+            log.info(f"생략한 선택 조작 (이미 선택된 레벨): {skipped}")
+        if self.tree_diff:
+            stats = self.tree_diff.stats
+            log.info(
+                f"옵션 트리 비교: 신규 {stats['new']}, 변경 {stats['changed']}, "
+                f"삭제 {stats['removed']}, 미변경 {stats['unchanged']} "
+                f"(샘플 방문 {stats['sampled']})"
+            )
 
-        # 모든 등급 크롤링
-        for grade in grades:
-            if "시세 미제공" in grade.get("price_text", ""):
-                console.print(f"[yellow]건너뛰기: {grade['text']} - 시세 미제공[/yellow]")
-                continue
+    async def warm_option_cache(self):
+        """옵션 트리 전체를 열거해 캐시를 채운다 (가격 조회/DB 저장 없음)"""
+        if not self.option_cache:
+            self.option_cache = OptionCache()
+        self.option_cache.refresh = True
+        self.enumerate_only = True
+        try:
+            await self.navigate_to_price_page()
+            await self._crawl_from_level(1)
+        finally:
+            self.enumerate_only = False
+            self.option_cache.refresh = False
+            self._save_option_cache()
+            log.info(f"옵션 캐시 warm 완료: {len(self.option_cache.entries)}개 항목")
+
+    def _save_option_cache(self):
+        if not self.option_cache:
+            return
+        try:
+            self.option_cache.save()
+        except Exception as e:
+            log.error(f"옵션 캐시 저장 실패: {e}")
 
-            if await self._select_option("op_dep5", grade):
-                self.current_path = self.current_path[:5] + [grade]
-                console.print(f"[green]등급 선택 완료: {grade['text']}[/green]")
-                await self.dom.wait_for_timeout(2000)  # 2초 대기
-                await self._crawl_detailed_grades()
-            else:
-                console.print(f"[red]등급 선택 실패: {grade['text']}[/red]")
-                continue  # 실패해도 다음 등급으로 계속
+    async def _crawl_from_level(self, start_level: int):
+        """특정 레벨부터 크롤링 시작 (그 위 레벨은 current_path 에 선택되어 있어야 한다)"""
+        log.info(f"레벨 {start_level}부터 크롤링 시작")
+        await self._traverse(self.current_path[: start_level - 1])
+
+    def _budget_exceeded(self) -> bool:
+        """시간 예산이 소진되었거나 중단이 요청되었는지 확인 (최초 1회만 알림)"""
+        if not self.budget_exhausted and self.budget.exhausted():
+            self.budget_exhausted = True
+            log.warning("시간 예산 소진 - 남은 서브트리는 다음 실행으로 미룹니다")
+        return self.budget_exhausted or self.stop_requested
+
+    def request_stop(self):
+        """진행 중인 옵션 하나를 마치고 순회를 끝낸다"""
+        self.stop_requested = True
+
+    def add_level_policy(self, dep_class: str, policy: LevelPolicy):
+        """레벨별 방문 대상 정책 추가 - 필터/샘플링 뒤, 증분 비교/스케줄러 앞에 적용"""
+        self.level_policies.setdefault(dep_class, []).append(policy)
+
+    def _plan_level(
+        self,
+        dep_class: str,
+        options: List[Dict],
+        sampler: Optional[LeafSampler] = None,
+    ) -> List[Dict]:
+        """레벨별 방문 대상/순서 결정
+
+        옵션 목록을 스냅샷으로 기록한 뒤, 필터/샤드와 샘플링 정책으로 대상을 고르고,
+        증분 모드면 이전 트리와 달라진 노드만 남기고 스케줄러가 있으면 점수 순으로 정렬한다.
+        """
+        depth = LEVEL_ORDER.index(dep_class)
+        parent_path = self.current_path[:depth]
+        if self.tree_recorder:
+            self.tree_recorder.record(dep_class, parent_path, options)
+        if self.crawl_filter:
+            options = self.crawl_filter.apply(dep_class, parent_path, options)
+        for policy in self.level_policies.get(dep_class, []):
+            options = policy(parent_path, options)
+        if sampler is not None:
+            options = sampler.select(options, parent_path)
+        if self.tree_diff:
+            options = self.tree_diff.select(parent_path, options)
+        if self.scheduler:
+            options = self.scheduler.order(parent_path, options)
+        return options
+
+    async def _traverse(self, root_path: List[Dict]):
+        """root_path 아래 서브트리를 LEVELS 설명대로 순회 (재귀 대신 명시적 스택)
+
+        스택 프레임은 (레벨 인덱스, 아직 방문하지 않은 옵션 목록) 이다. 프레임을 밖에서
+        들여다볼 수 있어 남은 작업을 다른 워커에게 넘기거나(donate_work) 중간에 멈출 수 있다.
+        """
+        self.current_path = list(root_path)
+        if LEVELS[len(root_path)].leaf:
+            await self._crawl_detailed_grades()
+            return
 
-    async def _crawl_detailed_grades(self):
-        """세부등급(op_dep6) 크롤링 - 요구사항의 핵심"""
-        console.print("[cyan]세부등급 크롤링 시작[/cyan]")
+        self.stack = [(len(root_path), await self._expand_level(len(root_path)))]
+        try:
+            while self.stack and not self._budget_exceeded():
+                depth, remaining = self.stack[-1]
+                if not remaining:
+                    self.stack.pop()
+                    if depth == len(root_path) + 1:
+                        # 최상위 옵션 하나의 서브트리가 끝날 때마다 레벨별 네트워크 요약을 남긴다
+                        top = self.current_path[depth - 1]
+                        self.telemetry.flush(
+                            f"{LEVELS[depth - 1].label} {top['text']}", LEVEL_ORDER
+                        )
+                    continue
 
-        detailed_grades = await self._get_options("op_dep6")
-        console.print(f"[green]세부등급 {len(detailed_grades)}개 발견[/green]")
+                option = remaining.pop(0)
+                level = LEVELS[depth]
+                if not await self._select_and_settle(level.dep_class, option):
+                    log.error(f"{level.label} 선택 실패: {option['text']}")
+                    continue  # 실패해도 다음 옵션으로 계속
+                self.current_path = self.current_path[:depth] + [option]
+                log.info("%s 선택 완료: %s", level.label, option["text"])
 
-        # op_dep6의 모든 옵션을 크롤링하되 3개까지만 가져오기
-        max_grades = min(3, len(detailed_grades))
-        console.print(f"[yellow]세부등급 {max_grades}개만 크롤링 (요구사항에 따라)[/yellow]")
+                if LEVELS[depth + 1].leaf:
+                    await self._crawl_detailed_grades()
+                else:
+                    self.stack.append((depth + 1, await self._expand_level(depth + 1)))
+        finally:
+            self.stack = []
+
+    async def _expand_level(self, depth: int) -> List[Dict]:
+        """현재 경로 아래 레벨의 옵션 목록을 읽고 방문할 옵션을 정한다"""
+        level = LEVELS[depth]
+        log.debug("%s 크롤링 시작", level.label)
+        if level.dep_class == "fuel":
+            options = await self._get_fuel_options()
+        else:
+            options = await self._get_options(level.dep_class)
+        log.debug("%s %s개 발견", level.label, len(options))
+
+        if level.skip_placeholder:
+            options = options[1:]
+        planned = []
+        for option in self._plan_level(level.dep_class, options):
+            if (
+                self.skip_keys
+                and path_key(self.current_path[:depth] + [option]) in self.skip_keys
+            ):
+                log.debug("건너뛰기: %s - 다른 워커에게 넘긴 작업", option["text"])
+                continue
+            if level.skip_unpriced and "시세 미제공" in option.get("price_text", ""):
+                log.info("건너뛰기: %s - 시세 미제공", option["text"])
+                continue
+            planned.append(option)
+        return planned
 
-        for i, detailed_grade in enumerate(detailed_grades[:max_grades]):
-            console.print(
-                f"[cyan]세부등급 {i+1}/{max_grades} 선택: {detailed_grade['text']}[/cyan]"
-            )
+    def donate_work(self, max_depth: int, limit: int) -> List[List[Dict]]:
+        """아직 방문하지 않은 형제 옵션을 다른 워커용 경로로 떼어 준다
 
-            # 세부등급 선택
-            if await self._select_option("op_dep6", detailed_grade):
-                # 현재까지의 경로 + 세부등급으로 최종 데이터 생성
-                final_path = self.current_path + [detailed_grade]
+        가장 얕은 프레임(가장 큰 서브트리)부터, 프레임마다 남은 옵션의 뒤쪽 절반(올림)을 가져간다.
+        """
+        donated = []
+        for depth, remaining in self.stack:
+            if depth >= max_depth or len(donated) >= limit:
+                break
+            take = min((len(remaining) + 1) // 2, limit - len(donated))
+            if take <= 0:
+                continue
+            prefix = self.current_path[:depth]
+            for option in remaining[-take:]:
+                donated.append(prefix + [option])
+            del remaining[-take:]
+        return donated
 
-                # 가격 정보 가져오기
-                price, is_available, message = await self._get_price_info()
+    async def _crawl_detailed_grades(self):
+        """세부등급(op_dep6) 크롤링 - 요구사항의 핵심"""
+        log.debug("%s 크롤링 시작", LEVELS[-1].label)
 
-                # 데이터 저장
-                car_data = self._create_car_data(
-                    final_path, price, is_available, message
+        detailed_grades = await self._get_options("op_dep6")
+        log.debug("세부등급 %s개 발견", len(detailed_grades))
+        if self.enumerate_only:
+            return
+
+        # 리프 선택 정책에 따라 크롤링할 세부등급 결정
+        sampler = self.sampling.for_path(self.current_path)
+        planned = self._plan_level("op_dep6", detailed_grades, sampler=sampler)
+        log.info("세부등급 %s개 크롤링 (정책: %s)", len(planned), sampler.spec)
+
+        pending = []  # pool 모드: (경로, 가격 파싱 future)
+        remaining = planned
+        if self.pipeline and len(planned) > 1:
+            remaining = await self._crawl_leaves_pipelined(planned, pending)
+
+        for i, detailed_grade in enumerate(remaining):
+            if self._budget_exceeded():
+                break
+            log.info("세부등급 %s/%s 선택: %s", i + 1, len(remaining), detailed_grade["text"])
+            await self._crawl_leaf(self, self.current_path, detailed_grade, pending)
+
+        for final_path, future in pending:
+            try:
+                info = await future
+                price, is_available, message = (
+                    info.get("price"),
+                    info.get("available", False),
+                    info.get("message", ""),
                 )
-                self.crawled_data.append(car_data)
+            except Exception as e:
+                log.error(f"가격 파싱 실패: {e}")
+                price, is_available, message = None, False, str(e)
+            self._record_leaf(final_path, price, is_available, message)
 
-                # 로그 출력
-                status_text = f"✓ {' '.join([item['text'] for item in final_path])}"
-                if price:
-                    console.print(f"[green]{status_text} - {price:,.0f}만원[/green]")
-                else:
-                    console.print(f"[yellow]{status_text} - 시세 미제공[/yellow]")
+        log.info("세부등급 크롤링 완료: %s개 처리됨", len(planned))
 
-                await self.dom.wait_for_timeout(2000)  # 2초 대기
-            else:
-                console.print(f"[red]세부등급 선택 실패: {detailed_grade['text']}[/red]")
-                continue  # 실패해도 다음 세부등급으로 계속
+    async def _crawl_leaf(
+        self,
+        worker: "EncarCrawler",
+        parent_path: List[Dict],
+        detailed_grade: Dict,
+        pending: List,
+    ) -> bool:
+        """worker 탭에서 세부등급 하나를 선택하고 가격을 읽는다"""
+        # 세부등급 선택 (이미 선택되어 있으면 생략)
+        if await worker._already_selected("op_dep6", detailed_grade):
+            worker.skipped_interactions += 1
+            worker._mark_selected("op_dep6")
+        else:
+            before = await worker._price_signature()
+            if not await worker._select_option("op_dep6", detailed_grade):
+                log.error(f"세부등급 선택 실패: {detailed_grade['text']}")
+                return False
+            worker._mark_selected("op_dep6")
+            # 표시값이 바뀐 뒤에도 시세 XHR 이 남아 있을 수 있으니 시세 문구가 바뀔 때까지 대기
+            await worker._wait_for_price_change(before)
+
+        # 현재까지의 경로 + 세부등급으로 최종 데이터 생성
+        final_path = parent_path + [detailed_grade]
+
+        if worker.parse_pool:
+            # 가격 파싱은 풀에서 진행하고 브라우저는 다음 세부등급으로 넘어간다
+            pending.append((final_path, await worker._submit_price_parse()))
+        else:
+            # 가격 정보 가져오기
+            price, is_available, message = await worker._get_price_info()
+            self._record_leaf(final_path, price, is_available, message)
+
+        await worker.dom.wait_for_timeout(2000)  # 2초 대기
+        self.telemetry.mark("op_dep6")
+        return True
+
+    async def _crawl_leaves_pipelined(
+        self, planned: List[Dict], pending: List
+    ) -> List[Dict]:
+        """두 탭이 세부등급을 번갈아 맡아, 한 탭이 가격을 기다리는 동안 다른 탭이 선택한다
+
+        두 번째 탭이 경로를 재현하지 못하면 그 몫은 남은 목록으로 돌려준다.
+        """
+        parent_path = list(self.current_path)
+        leftovers: List[Dict] = []
 
-        console.print(f"[green]세부등급 크롤링 완료: {max_grades}개 처리됨[/green]")
+        async def run(worker: "EncarCrawler", leaves: List[Dict], sync: bool):
+            if sync:
+                try:
+                    await self._sync_lane(worker, parent_path)
+                except Exception as e:
+                    log.warning("파이프라인 탭 사용 불가: %s", e)
+                    leftovers.extend(leaves)
+                    return
+            for leaf in leaves:
+                if self._budget_exceeded():
+                    return
+                log.info("세부등급 선택 (탭 %s): %s", 1 if sync else 0, leaf["text"])
+                await self._crawl_leaf(worker, parent_path, leaf, pending)
+
+        lane = await self._get_lane()
+        await asyncio.gather(
+            run(self, planned[0::2], False),
+            run(lane, planned[1::2], True),
+        )
+        return leftovers
 
     async def _check_unvisited_options(self, level: int):
         """특정 레벨에서 방문하지 않은 옵션들 체크"""
-        console.print(f"[cyan]레벨 {level}에서 방문하지 않은 옵션 체크[/cyan]")
+        log.info("레벨 %s에서 방문하지 않은 옵션 체크", level)
         # 구현 예정
 
+    def _cache_parent(self, dep_class: str) -> Optional[List[Dict]]:
+        """현재 경로가 해당 레벨의 상위 경로와 정확히 일치할 때만 캐시 키로 사용"""
+        if not self.option_cache:
+            return None
+        depth = LEVEL_ORDER.index(dep_class)
+        if len(self.current_path) != depth:
+            return None
+        return self.current_path
+
     async def _get_options(self, dep_class: str) -> List[Dict]:
         """op_dep* 옵션들을 가져오기"""
+        parent_path = self._cache_parent(dep_class)
+        if parent_path is not None:
+            cached = self.option_cache.get(dep_class, parent_path)
+            if cached is not None:
+                return cached
+
         try:
             # 드롭다운 열기
             await self._open_dropdown(dep_class)
 
-            # 옵션들 파싱
-            options = await self.dom.evaluate(
-                f"""
-                () => {{
-                    const li = document.querySelector('li.{dep_class}');
-                    if (!li) return [];
-
-                    const anchors = li.querySelectorAll('ul.list_option a.select_opt.ui_opt:not([data-init="true"])');
-                    return Array.from(anchors).map(a => {{
-                        const code = a.getAttribute('data-code') || '';
-                        const value = a.getAttribute('data-value') || '';
-                        const textEl = a.querySelector('.lt, .ui_opt_txt');
-                        const text = textEl ? textEl.textContent.trim() : a.textContent.trim();
-                        const priceEl = a.querySelector('.rt');
-                        const price_text = priceEl ? priceEl.textContent.trim() : '';
-
-                        return {{
-                            code: code,
-                            value: value,
-                            text: text,
-                            price_text: price_text
-                        }};
-                    }});
-                }}
-            """
-            )
+            if self.parse_pool:
+                options = await self._parse_options_in_pool(f"li.{dep_class}")
+            else:
+                # 옵션들 파싱
+                options = await self.dom.evaluate(
+                    f"""
+                    () => {{
+                        const li = document.querySelector('li.{dep_class}');
+                        if (!li) return [];
+
+                        const anchors = li.querySelectorAll('ul.list_option a.select_opt.ui_opt:not([data-init="true"])');
+                        return Array.from(anchors).map(a => {{
+                            const code = a.getAttribute('data-code') || '';
+                            const value = a.getAttribute('data-value') || '';
+                            const textEl = a.querySelector('.lt, .ui_opt_txt');
+                            const text = textEl ? textEl.textContent.trim() : a.textContent.trim();
+                            const priceEl = a.querySelector('.rt');
+                            const price_text = priceEl ? priceEl.textContent.trim() : '';
+
+                            return {{
+                                code: code,
+                                value: value,
+                                text: text,
+                                price_text: price_text
+                            }};
+                        }});
+                    }}
+                """
+                )
 
+            if parent_path is not None:
+                self.option_cache.put(dep_class, parent_path, options or [])
             return options or []
         except Exception as e:
-            console.print(f"[red]옵션 가져오기 실패 ({dep_class}): {e}[/red]")
+            log.error(f"옵션 가져오기 실패 ({dep_class}): {e}")
             return []
 
     async def _get_fuel_options(self) -> List[Dict]:
         """연료 옵션들 가져오기"""
+        parent_path = self._cache_parent("fuel")
+        if parent_path is not None:
+            cached = self.option_cache.get("fuel", parent_path)
+            if cached is not None:
+                return cached
+
         try:
             # 연료 드롭다운 열기
             await self._open_dropdown("fuel")
 
-            # 연료 옵션들 파싱
-            options = await self.dom.evaluate(
+            if self.parse_pool:
+                options = await self._parse_options_in_pool(
+                    'li .select.ui_select[data-name="fuel"]'
+                )
+            else:
+                # 연료 옵션들 파싱
+                options = await self.dom.evaluate(
+                    """
+                    () => {
+                        const fuelLi = document.querySelector('li .select.ui_select[data-name="fuel"]');
+                        if (!fuelLi) return [];
+
+                        const li = fuelLi.closest('li');
+                        if (!li) return [];
+
+                        const anchors = li.querySelectorAll('ul.list_option a.select_opt.ui_opt:not([data-init="true"])');
+                        return Array.from(anchors).map(a => {
+                            const code = a.getAttribute('data-code') || '';
+                            const value = a.getAttribute('data-value') || '';
+                            const textEl = a.querySelector('.lt, .ui_opt_txt');
+                            const text = textEl ? textEl.textContent.trim() : a.textContent.trim();
+                            const priceEl = a.querySelector('.rt');
+                            const price_text = priceEl ? priceEl.textContent.trim() : '';
+
+                            return {
+                                code: code,
+                                value: value,
+                                text: text,
+                                price_text: price_text
+                            };
+                        });
+                    }
                 """
-                () => {
-                    const fuelLi = document.querySelector('li .select.ui_select[data-name="fuel"]');
-                    if (!fuelLi) return [];
-
-                    const li = fuelLi.closest('li');
-                    if (!li) return [];
-
-                    const anchors = li.querySelectorAll('ul.list_option a.select_opt.ui_opt:not([data-init="true"])');
-                    return Array.from(anchors).map(a => {
-                        const code = a.getAttribute('data-code') || '';
-                        const value = a.getAttribute('data-value') || '';
-                        const textEl = a.querySelector('.lt, .ui_opt_txt');
-                        const text = textEl ? textEl.textContent.trim() : a.textContent.trim();
-                        const priceEl = a.querySelector('.rt');
-                        const price_text = priceEl ? priceEl.textContent.trim() : '';
-
-                        return {
-                            code: code,
-                            value: value,
-                            text: text,
-                            price_text: price_text
-                        };
-                    });
-                }
-            """
-            )
+                )
 
+            if parent_path is not None:
+                self.option_cache.put("fuel", parent_path, options or [])
             return options or []
         except Exception as e:
-            console.print(f"[red]연료 옵션 가져오기 실패: {e}[/red]")
+            log.error(f"연료 옵션 가져오기 실패: {e}")
             return []
 
+    async def _parse_options_in_pool(self, selector: str) -> List[Dict]:
+        """옵션 영역 li 의 HTML 만 받아와 프로세스 풀에서 파싱"""
+        html = await self.dom.evaluate(
+            """
+            (selector) => {
+                const el = document.querySelector(selector);
+                const li = el ? el.closest('li') : null;
+                return li ? li.outerHTML : '';
+            }
+        """,
+            selector,
+        )
+        if not html:
+            return []
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.parse_pool, parse_option_html, html)
+
+    async def _submit_price_parse(self) -> asyncio.Future:
+        """현재 페이지 HTML 을 한 번 받아 가격 파싱을 풀에 넘기고 바로 반환"""
+        html = await self.dom.content()
+        loop = asyncio.get_running_loop()
+        return loop.run_in_executor(self.parse_pool, parse_price_html, html)
+
     async def _open_dropdown(self, dep_class: str):
         """드롭다운 열기 - Playwright 액션 사용"""
         try:
-            console.print(f"[blue]드롭다운 열기 시도: {dep_class}[/blue]")
+            log.debug("드롭다운 열기 시도: %s", dep_class)
 
             if dep_class == "fuel":
                 # 연료 드롭다운 열기
@@ -928,14 +1598,14 @@ class EncarCrawler:
                 await self.dom.wait_for_selector(menu_selector, timeout=5000)
                 await self.dom.click(menu_selector)
                 await self.dom.wait_for_timeout(500)  # 옵션들이 로드될 때까지 대기
-                console.print(f"[green]드롭다운 열기 완료: {dep_class}[/green]")
+                log.debug("드롭다운 열기 완료: %s", dep_class)
             except Exception as e:
-                console.print(f"[red]Playwright 드롭다운 열기 실패: {e}[/red]")
+                log.error(f"Playwright 드롭다운 열기 실패: {e}")
                 # 대안: JavaScript로 시도
                 await self._open_dropdown_fallback(dep_class)
 
         except Exception as e:
-            console.print(f"[red]드롭다운 열기 실패 ({dep_class}): {e}[/red]")
+            log.error(f"드롭다운 열기 실패 ({dep_class}): {e}")
             await self._open_dropdown_fallback(dep_class)
 
     async def _open_dropdown_fallback(self, dep_class: str):
@@ -966,9 +1636,9 @@ class EncarCrawler:
             if menu:
                 await menu.click(force=True)
                 await asyncio.sleep(0.5)
-                console.print(f"[yellow]대안 방식으로 드롭다운 열기 완료: {dep_class}[/yellow]")
+                log.warning("대안 방식으로 드롭다운 열기 완료: %s", dep_class)
         except Exception as e:
-            console.print(f"[red]대안 방식도 실패 ({dep_class}): {e}[/red]")
+            log.error(f"대안 방식도 실패 ({dep_class}): {e}")
             try:
                 if dep_class == "fuel":
                     # 연료 최종 시도: JavaScript로 직접 클릭
@@ -980,7 +1650,7 @@ class EncarCrawler:
                         }
                     """
                     )
-                    console.print(f"[yellow]연료 JavaScript 최종 시도 완료[/yellow]")
+                    log.warning("연료 JavaScript 최종 시도 완료")
                 else:
                     await self.dom.click(
                         f"li.{dep_class} a.select_menu.ui_menu", force=True
@@ -988,7 +1658,7 @@ class EncarCrawler:
                 # 드롭다운이 완전히 열릴 때까지 잠시 대기
                 await asyncio.sleep(0.3)
             except Exception as e2:
-                console.print(f"[red]대안 클릭도 실패 ({dep_class}): {e2}[/red]")
+                log.error(f"대안 클릭도 실패 ({dep_class}): {e2}")
                 raise Exception(f"드롭다운 열기 실패: {e2}")
 
     async def _close_dropdown(self, dep_class: str):
@@ -1007,17 +1677,243 @@ class EncarCrawler:
                 pass
 
         except Exception as e:
-            console.print(f"[red]드롭다운 닫기 오류 ({dep_class}): {e}[/red]")
+            log.error(f"드롭다운 닫기 오류 ({dep_class}): {e}")
+
+    async def _level_signature(self, dep_class: str) -> str:
+        """옵션 목록의 현재 상태 (코드+텍스트) - 목록이 새로 그려졌는지 비교용"""
+        try:
+            return await self.dom.evaluate(
+                """
+                (selector) => {
+                    const el = document.querySelector(selector);
+                    const li = el ? el.closest('li') : null;
+                    if (!li) return '';
+                    const anchors = li.querySelectorAll('ul.list_option a.select_opt.ui_opt:not([data-init="true"])');
+                    return Array.from(anchors)
+                        .map(a => (a.getAttribute('data-code') || '') + ':' + a.textContent.trim())
+                        .join('|');
+                }
+            """,
+                dep_selector(dep_class),
+            )
+        except Exception:
+            return ""
+
+    def _parent_key(self, dep_class: str) -> str:
+        """dep_class 레벨의 상위 경로 키 (current_path 는 그 레벨 앞까지 맞춰져 있다)"""
+        return path_key(self.current_path[: LEVEL_ORDER.index(dep_class)])
+
+    def _mark_selected(self, dep_class: str):
+        """dep_class 를 직접 선택했음을 기록하고, 그보다 깊은 레벨의 기록은 지운다"""
+        index = LEVEL_ORDER.index(dep_class)
+        for deeper in LEVEL_ORDER[index + 1 :]:
+            self.selected_under.pop(deeper, None)
+        self.selected_under[dep_class] = self._parent_key(dep_class)
+
+    async def _already_selected(self, dep_class: str, option: Dict) -> bool:
+        """레벨의 현재 선택값(hidden input 또는 드롭다운 표시)이 option 인지 확인
+
+        연료/연식 코드처럼 값이 여러 상위 옵션에 걸쳐 반복되면, 상위 선택이 바뀐 뒤에도
+        이전 값이 hidden input 에 남아 있을 수 있다. 그래서 옵션이 하나뿐이라 사이트가
+        자동 선택한 경우나, 지금 상위 경로 아래에서 직접 선택한 값일 때만 선택된 것으로 본다.
+        목록을 읽느라 드롭다운이 열려 있으면 닫아 둔다.
+        """
+        try:
+            state = await self.dom.evaluate(
+                """
+                ([selector, value, text]) => {
+                    const el = document.querySelector(selector);
+                    const li = el ? el.closest('li') : null;
+                    if (!li) return {selected: false, open: false};
+                    const input = li.querySelector('input.ui_inpt');
+                    const menu = li.querySelector('a.select_menu.ui_menu');
+                    const label = menu ? (menu.querySelector('.ui_menu_txt') || menu).textContent.trim() : '';
+                    const container = li.querySelector('.select_container.ui_container');
+                    return {
+                        // value 를 알면 hidden input 값으로만 판단하고, 표시 텍스트는 값이 없을 때만 쓴다
+                        selected: value && input && input.value
+                            ? input.value === value
+                            : !!text && label === text,
+                        options: li.querySelectorAll('ul.list_option a.select_opt.ui_opt:not([data-init="true"])').length,
+                        open: !!container && container.offsetParent !== null,
+                    };
+                }
+            """,
+                [
+                    dep_selector(dep_class),
+                    option.get("value", ""),
+                    option.get("text", ""),
+                ],
+            )
+        except Exception:
+            return False
+        selected = state["selected"] and (
+            state["options"] == 1
+            or self.selected_under.get(dep_class) == self._parent_key(dep_class)
+        )
+        if selected and state["open"]:
+            await self.dom.click("body", position={"x": 50, "y": 50})
+        return selected
+
+    async def _select_and_settle(self, dep_class: str, option: Dict) -> bool:
+        """옵션 선택 후 다음 레벨이 준비될 때까지 대기
+
+        기본은 2초 고정 대기. 파이프라인 모드에서는 다음 레벨 옵션 목록이 새로 렌더되는
+        즉시 진행한다 (최대 2초). 레벨이 이미 그 옵션으로 선택되어 있으면(옵션이 하나뿐이라
+        사이트가 자동 선택한 경우 등) 클릭/대기 없이 바로 넘어간다.
+        """
+        if await self._already_selected(dep_class, option):
+            self.skipped_interactions += 1
+            self._mark_selected(dep_class)
+            log.debug("이미 선택됨: %s - 선택 생략", option["text"])
+            return True
+
+        index = LEVEL_ORDER.index(dep_class)
+        next_dep = LEVEL_ORDER[index + 1] if index + 1 < len(LEVEL_ORDER) else None
+        before = (
+            await self._level_signature(next_dep)
+            if self.pipeline and next_dep
+            else None
+        )
+
+        if not await self._select_option(dep_class, option):
+            return False
+        self._mark_selected(dep_class)
+
+        if before is None:
+            await self.dom.wait_for_timeout(2000)  # 2초 대기
+            self.telemetry.mark(dep_class)
+            return True
+        try:
+            await self.dom.wait_for_function(
+                """
+                ([selector, before]) => {
+                    const el = document.querySelector(selector);
+                    const li = el ? el.closest('li') : null;
+                    if (!li) return false;
+                    const anchors = li.querySelectorAll('ul.list_option a.select_opt.ui_opt:not([data-init="true"])');
+                    const now = Array.from(anchors)
+                        .map(a => (a.getAttribute('data-code') || '') + ':' + a.textContent.trim())
+                        .join('|');
+                    return now !== '' && now !== before;
+                }
+            """,
+                arg=[dep_selector(next_dep), before],
+                timeout=2000,
+            )
+        except Exception:
+            pass  # 목록이 같거나 늦게 그려지면 기존 대기 시간만큼만 기다린 셈
+        self.telemetry.mark(dep_class)
+        return True
 
     async def _select_option(self, dep_class: str, option: Dict) -> bool:
-        """옵션 선택 - Playwright 액션 사용"""
+        """옵션 선택 - 페이지 안에서 한 번에 옵션을 찾아 클릭하고 드롭다운 표시값까지 확인
+
+        옵션을 못 찾으면(목록이 열어야 그려지는 경우) 드롭다운을 열고 한 번 더 시도하고,
+        클릭 후 표시값이 맞지 않으면 그때만 기존 Playwright 클릭 방식으로 넘어간다.
+        """
+        log.debug("옵션 선택 시도: %s (코드: %s)", option["text"], option.get("code", ""))
+        result = await self._select_in_page(dep_class, option)
+        if result["reason"] == "not-found":
+            await self._open_dropdown(dep_class)
+            result = await self._select_in_page(dep_class, option)
+
+        if not result["ok"]:
+            log.warning(
+                "빠른 선택 실패 (%s): %s - 기존 방식으로 재시도",
+                result["reason"],
+                option["text"],
+            )
+            return await self._select_option_fallback(dep_class, option)
+
+        if result["open"]:
+            await self.dom.click("body", position={"x": 50, "y": 50})
+        try:
+            await self.dom.wait_for_load_state("networkidle", timeout=5000)
+        except Exception:
+            pass  # 타임아웃이어도 계속 진행
+        return True
+
+    async def _select_in_page(self, dep_class: str, option: Dict) -> Dict:
+        """code -> value -> 텍스트 순으로 옵션을 찾아 클릭하고 표시값이 바뀔 때까지 대기 (1회 호출)
+
+        반환: ok, reason(no-level / not-found / label-mismatch / error), open(목록이 열려 있는지)
+        """
+        try:
+            return await self.dom.evaluate(
+                """
+                async ([selector, code, value, text]) => {
+                    const scope = document.querySelector(selector);
+                    if (!scope) return {ok: false, reason: 'no-level', open: false};
+                    const optText = a => {
+                        const t = a.querySelector('.lt, .ui_opt_txt');
+                        return (t || a).textContent.trim();
+                    };
+                    const anchors = Array.from(
+                        scope.querySelectorAll('ul.list_option a.select_opt.ui_opt:not([data-init="true"])')
+                    );
+                    const target =
+                        (code && anchors.find(a => a.getAttribute('data-code') === code)) ||
+                        (value && anchors.find(a => a.getAttribute('data-value') === value)) ||
+                        anchors.find(a => optText(a) === text);
+                    if (!target) return {ok: false, reason: 'not-found', open: false};
+
+                    const menu = scope.querySelector('a.select_menu.ui_menu');
+                    const input = scope.querySelector('input.ui_inpt');
+                    const container = scope.querySelector('.select_container.ui_container');
+                    const expected = optText(target);
+                    const targetValue = target.getAttribute('data-value') || '';
+                    const selected = () => {
+                        const label = menu ? (menu.querySelector('.ui_menu_txt') || menu).textContent.trim() : '';
+                        return (!!expected && label.includes(expected)) ||
+                            (!!targetValue && !!input && input.value === targetValue);
+                    };
+
+                    target.click();
+                    if (!selected()) {
+                        await new Promise(resolve => {
+                            let timer = null;
+                            const observer = new MutationObserver(() => {
+                                if (selected()) {
+                                    observer.disconnect();
+                                    clearTimeout(timer);
+                                    resolve();
+                                }
+                            });
+                            observer.observe(scope, {
+                                subtree: true,
+                                childList: true,
+                                characterData: true,
+                                attributes: true,
+                            });
+                            timer = setTimeout(() => { observer.disconnect(); resolve(); }, 1000);
+                        });
+                    }
+                    const ok = selected();
+                    return {
+                        ok: ok,
+                        reason: ok ? '' : 'label-mismatch',
+                        open: !!container && container.offsetParent !== null,
+                    };
+                }
+            """,
+                [
+                    dep_selector(dep_class),
+                    option.get("code", ""),
+                    option.get("value", ""),
+                    option.get("text", ""),
+                ],
+            )
+        except Exception as e:
+            return {"ok": False, "reason": f"error: {e}", "open": False}
+
+    async def _select_option_fallback(self, dep_class: str, option: Dict) -> bool:
+        """옵션 선택 - Playwright 액션 사용 (빠른 선택이 실패했을 때)"""
         try:
             if dep_class == "fuel":
                 return await self._select_fuel_option(option)
 
-            console.print(
-                f"[blue]옵션 선택 시도: {option['text']} (코드: {option['code']})[/blue]"
-            )
+            log.debug("옵션 선택 시도: %s (코드: %s)", option["text"], option["code"])
 
             # 드롭다운 열기
             await self._open_dropdown(dep_class)
@@ -1031,16 +1927,14 @@ class EncarCrawler:
                 element = await self.dom.wait_for_selector(selector, timeout=3000)
                 if element:
                     await element.click()
-                    console.print(f"[green]data-code 클릭 성공: {option['text']}[/green]")
+                    log.debug("data-code 클릭 성공: %s", option["text"])
                 else:
                     # 2단계: data-value로 시도
                     selector = f'li.{dep_class} a.select_opt.ui_opt[data-value="{option["value"]}"]'
                     element = await self.dom.wait_for_selector(selector, timeout=3000)
                     if element:
                         await element.click()
-                        console.print(
-                            f"[green]data-value 클릭 성공: {option['text']}[/green]"
-                        )
+                        log.debug("data-value 클릭 성공: %s", option["text"])
                     else:
                         # 3단계: 텍스트로 시도
                         selector = f'li.{dep_class} a.select_opt.ui_opt:has-text("{option["text"]}")'
@@ -1049,12 +1943,12 @@ class EncarCrawler:
                         )
                         if element:
                             await element.click()
-                            console.print(f"[green]텍스트 클릭 성공: {option['text']}[/green]")
+                            log.debug("텍스트 클릭 성공: %s", option["text"])
                         else:
                             raise Exception("옵션을 찾을 수 없음")
 
             except Exception as e:
-                console.print(f"[red]Playwright 옵션 선택 실패: {e}[/red]")
+                log.error(f"Playwright 옵션 선택 실패: {e}")
                 # 대안: JavaScript로 시도
                 await self.dom.evaluate(
                     f"""
@@ -1068,7 +1962,7 @@ class EncarCrawler:
                     }}
                 """
                 )
-                console.print(f"[yellow]JavaScript 대안 시도 완료: {option['text']}[/yellow]")
+                log.warning("JavaScript 대안 시도 완료: %s", option["text"])
 
             # 옵션 선택 후 드롭다운 닫기
             await self.dom.click("body", position={"x": 50, "y": 50})
@@ -1082,15 +1976,13 @@ class EncarCrawler:
 
             return True
         except Exception as e:
-            console.print(f"[red]옵션 선택 실패 ({dep_class}): {e}[/red]")
+            log.error(f"옵션 선택 실패 ({dep_class}): {e}")
             return False
 
     async def _select_fuel_option(self, option: Dict) -> bool:
         """연료 옵션 선택 - Playwright 액션 사용"""
         try:
-            console.print(
-                f"[blue]연료 옵션 선택 시도: {option['text']} (코드: {option['code']})[/blue]"
-            )
+            log.debug("연료 옵션 선택 시도: %s (코드: %s)", option["text"], option["code"])
 
             await self._open_dropdown("fuel")
 
@@ -1101,18 +1993,14 @@ class EncarCrawler:
                 element = await self.dom.wait_for_selector(selector, timeout=5000)
                 if element:
                     await element.click()
-                    console.print(
-                        f"[green]연료 옵션 선택 성공 (data-code): {option['text']}[/green]"
-                    )
+                    log.debug("연료 옵션 선택 성공 (data-code): %s", option["text"])
                 else:
                     # 2단계: data-value로 시도
                     selector = f'li .select.ui_select[data-name="fuel"] a.select_opt.ui_opt[data-value="{option["value"]}"]'
                     element = await self.dom.wait_for_selector(selector, timeout=5000)
                     if element:
                         await element.click()
-                        console.print(
-                            f"[green]연료 옵션 선택 성공 (data-value): {option['text']}[/green]"
-                        )
+                        log.debug("연료 옵션 선택 성공 (data-value): %s", option["text"])
                     else:
                         # 3단계: 텍스트로 시도
                         selector = f'li .select.ui_select[data-name="fuel"] a.select_opt.ui_opt:has-text("{option["text"]}")'
@@ -1121,14 +2009,12 @@ class EncarCrawler:
                         )
                         if element:
                             await element.click()
-                            console.print(
-                                f"[green]연료 옵션 선택 성공 (텍스트): {option['text']}[/green]"
-                            )
+                            log.debug("연료 옵션 선택 성공 (텍스트): %s", option["text"])
                         else:
                             raise Exception("연료 옵션을 찾을 수 없음")
 
             except Exception as e:
-                console.print(f"[red]Playwright 연료 옵션 선택 실패: {e}[/red]")
+                log.error(f"Playwright 연료 옵션 선택 실패: {e}")
                 # 대안: JavaScript로 시도
                 await self.dom.evaluate(
                     f"""
@@ -1142,7 +2028,7 @@ class EncarCrawler:
                     }}
                 """
                 )
-                console.print(f"[yellow]JavaScript 대안 시도 완료: {option['text']}[/yellow]")
+                log.warning("JavaScript 대안 시도 완료: %s", option["text"])
 
             # 옵션 선택 후 드롭다운 닫기
             await self.dom.click("body", position={"x": 50, "y": 50})
@@ -1156,9 +2042,30 @@ class EncarCrawler:
 
             return True
         except Exception as e:
-            console.print(f"[red]연료 옵션 선택 실패: {e}[/red]")
+            log.error(f"연료 옵션 선택 실패: {e}")
             return False
 
+    async def _price_signature(self) -> str:
+        """현재 페이지의 시세 문구 (없으면 빈 문자열)"""
+        try:
+            return await self.dom.evaluate(_PRICE_SIGNATURE_JS)
+        except Exception:
+            return ""
+
+    async def _wait_for_price_change(self, before: str, timeout: int = 2000):
+        """시세 문구가 before 와 달라질 때까지 대기
+
+        이전 리프와 시세가 같으면 바뀌지 않으므로 timeout(기존 선택 후 대기 시간)까지만 기다린다.
+        """
+        try:
+            await self.dom.wait_for_function(
+                f"(before) => ({_PRICE_SIGNATURE_JS})() !== before",
+                arg=before,
+                timeout=timeout,
+            )
+        except Exception:
+            pass
+
     async def _get_price_info(self) -> Tuple[Optional[float], bool, str]:
         """현재 선택된 옵션의 가격 정보 가져오기"""
         try:
@@ -1263,9 +2170,28 @@ class EncarCrawler:
                 price_info.get("message", ""),
             )
         except Exception as e:
-            console.print(f"[red]가격 정보 가져오기 실패: {e}[/red]")
+            log.error(f"가격 정보 가져오기 실패: {e}")
             return None, False, str(e)
 
+    def _record_leaf(
+        self, path: List[Dict], price: Optional[float], is_available: bool, message: str
+    ):
+        """리프 결과를 크롤링 데이터에 추가하고 로그 출력"""
+        car_data = self._create_car_data(path, price, is_available, message)
+        self.crawled_data.append(car_data)
+
+        if not log.isEnabledFor(logging.INFO):
+            return
+        status_text = f"✓ {' '.join([item['text'] for item in path])}"
+        log.info(
+            f"{status_text} - {price:,.0f}만원" if price else f"{status_text} - 시세 미제공",
+            extra={
+                "options_hash": car_data["options_hash"],
+                "price": price,
+                "available": is_available,
+            },
+        )
+
     def _create_car_data(
         self, path: List[Dict], price: Optional[float], is_available: bool, message: str
     ) -> Dict:
@@ -1299,22 +2225,19 @@ class EncarCrawler:
         }
 
     async def _save_crawled_data(self) -> Tuple[int, int]:
-        """크롤링된 데이터를 DB에 저장"""
-        success_count = 0
-        failed_count = 0
-
-        for data in self.crawled_data:
-            try:
-                car_price = CarPrice(**data)
-                self.session.add(car_price)
-                self.session.commit()
-                success_count += 1
-            except Exception as e:
-                failed_count += 1
-                console.print(f"[red]DB 저장 실패: {e}[/red]")
-                self.session.rollback()
-
-        return success_count, failed_count
+        """크롤링된 데이터를 DB에 일괄 저장하고 실행 요약(crawl_summary)을 함께 갱신"""
+        crawl_log_id = self.crawling_log.id if self.crawling_log else None
+        writer = make_writer(self.session, crawl_log_id, self.storage_mode)
+        result = writer.write(
+            [dict(data, crawl_log_id=crawl_log_id) for data in self.crawled_data]
+        )
+        for sink in writer.sinks:
+            if isinstance(sink, HistorySink):
+                log.info(
+                    f"시세 이력: 변경 {sink.changed_count}건 기록, "
+                    f"동일 {sink.unchanged_count}건 확인만 갱신"
+                )
+        return result
 
     async def test_single_combination(self):
         """단일 조합 테스트 (디버깅용) - 1순회만 확인"""
@@ -1322,41 +2245,41 @@ class EncarCrawler:
             await self.navigate_to_price_page()
 
             # 페이지 구조 분석
-            console.print("[cyan]페이지 구조 분석 중...[/cyan]")
+            log.info("페이지 구조 분석 중...")
 
             # op_dep1~6 요소들 확인
             for i in range(1, 7):
                 dep_class = f"op_dep{i}"
                 element = await self.dom.query_selector(f"li.{dep_class}")
                 if element:
-                    console.print(f"[green]존재: {dep_class}[/green]")
+                    log.info(f"존재: {dep_class}")
 
                     # 옵션 개수 확인
                     options = await self._get_options(dep_class)
-                    console.print(f"  - 옵션 {len(options)}개")
+                    log.info(f"  - 옵션 {len(options)}개")
 
                     # 처음 3개 옵션 표시
                     for opt in options[:3]:
                         price_text = opt.get("price_text", "")
-                        console.print(f"    • {opt['text']} - {price_text}")
+                        log.info(f"    • {opt['text']} - {price_text}")
                 else:
-                    console.print(f"[yellow]없음: {dep_class}[/yellow]")
+                    log.warning(f"없음: {dep_class}")
 
             # 연료 옵션 확인
             fuel_options = await self._get_fuel_options()
-            console.print(f"[green]연료 옵션 {len(fuel_options)}개 발견[/green]")
+            log.info(f"연료 옵션 {len(fuel_options)}개 발견")
             for opt in fuel_options[:3]:
                 price_text = opt.get("price_text", "")
-                console.print(f"  • {opt['text']} - {price_text}")
+                log.info(f"  • {opt['text']} - {price_text}")
 
             # 1순회 크롤링 테스트 (op_dep6까지)
-            console.print("\n[cyan]1순회 크롤링 테스트 시작...[/cyan]")
+            log.info("1순회 크롤링 테스트 시작...")
 
             # 제조사 선택
             manufacturers = await self._get_options("op_dep1")
             if manufacturers and len(manufacturers) > 1:
                 manufacturer = manufacturers[1]  # 첫 번째는 플레이스홀더
-                console.print(f"[cyan]제조사 선택: {manufacturer['text']}[/cyan]")
+                log.info(f"제조사 선택: {manufacturer['text']}")
 
                 if await self._select_option("op_dep1", manufacturer):
                     self.current_path = [manufacturer]
@@ -1366,7 +2289,7 @@ class EncarCrawler:
                     models = await self._get_options("op_dep2")
                     if models:
                         model = models[0]
-                        console.print(f"[cyan]모델 선택: {model['text']}[/cyan]")
+                        log.info(f"모델 선택: {model['text']}")
 
                         if await self._select_option("op_dep2", model):
                             self.current_path = self.current_path[:1] + [model]
@@ -1376,9 +2299,7 @@ class EncarCrawler:
                             detailed_models = await self._get_options("op_dep3")
                             if detailed_models:
                                 detailed_model = detailed_models[0]
-                                console.print(
-                                    f"[cyan]세부모델 선택: {detailed_model['text']}[/cyan]"
-                                )
+                                log.info(f"세부모델 선택: {detailed_model['text']}")
 
                                 if await self._select_option("op_dep3", detailed_model):
                                     self.current_path = self.current_path[:2] + [
@@ -1390,9 +2311,7 @@ class EncarCrawler:
                                     years = await self._get_options("op_dep4")
                                     if years:
                                         year = years[0]
-                                        console.print(
-                                            f"[cyan]연식 선택: {year['text']}[/cyan]"
-                                        )
+                                        log.info(f"연식 선택: {year['text']}")
 
                                         if await self._select_option("op_dep4", year):
                                             self.current_path = self.current_path[
@@ -1408,11 +2327,11 @@ class EncarCrawler:
                                             )
                                             if fuel_options:
                                                 fuel = fuel_options[0]
-                                                console.print(
-                                                    f"[cyan]연료 선택: {fuel['text']}[/cyan]"
-                                                )
+                                                log.info(f"연료 선택: {fuel['text']}")
 
-                                                if await self._select_fuel_option(fuel):
+                                                if await self._select_option(
+                                                    "fuel", fuel
+                                                ):
                                                     self.current_path = (
                                                         self.current_path[:4] + [fuel]
                                                     )
@@ -1426,8 +2345,8 @@ class EncarCrawler:
                                                     )
                                                     if grades:
                                                         grade = grades[0]
-                                                        console.print(
-                                                            f"[cyan]등급 선택: {grade['text']}[/cyan]"
+                                                        log.info(
+                                                            f"등급 선택: {grade['text']}"
                                                         )
 
                                                         if await self._select_option(
@@ -1447,15 +2366,15 @@ class EncarCrawler:
                                                                     "op_dep6"
                                                                 )
                                                             )
-                                                            console.print(
-                                                                f"[green]세부등급 {len(detailed_grades)}개 발견[/green]"
+                                                            log.info(
+                                                                f"세부등급 {len(detailed_grades)}개 발견"
                                                             )
 
                                                             max_grades = min(
                                                                 3, len(detailed_grades)
                                                             )
-                                                            console.print(
-                                                                f"[yellow]세부등급 {max_grades}개만 테스트[/yellow]"
+                                                            log.warning(
+                                                                f"세부등급 {max_grades}개만 테스트"
                                                             )
 
                                                             for (
@@ -1466,8 +2385,8 @@ class EncarCrawler:
                                                                     :max_grades
                                                                 ]
                                                             ):
-                                                                console.print(
-                                                                    f"[cyan]세부등급 {i+1}/{max_grades} 선택: {detailed_grade['text']}[/cyan]"
+                                                                log.info(
+                                                                    f"세부등급 {i+1}/{max_grades} 선택: {detailed_grade['text']}"
                                                                 )
 
                                                                 if await self._select_option(
@@ -1504,66 +2423,67 @@ class EncarCrawler:
                                                                     # 로그 출력
                                                                     status_text = f"✓ {' '.join([item['text'] for item in final_path])}"
                                                                     if price:
-                                                                        console.print(
-                                                                            f"[green]{status_text} - {price:,.0f}만원[/green]"
+                                                                        log.info(
+                                                                            f"{status_text} - {price:,.0f}만원"
                                                                         )
                                                                     else:
-                                                                        console.print(
-                                                                            f"[yellow]{status_text} - 시세 미제공[/yellow]"
+                                                                        log.warning(
+                                                                            f"{status_text} - 시세 미제공"
                                                                         )
                                                                 else:
-                                                                    console.print(
-                                                                        f"[red]세부등급 선택 실패: {detailed_grade['text']}[/red]"
+                                                                    log.error(
+                                                                        f"세부등급 선택 실패: {detailed_grade['text']}"
                                                                     )
 
-                                                            console.print(
-                                                                f"[green]1순회 테스트 완료: {max_grades}개 세부등급 처리됨[/green]"
+                                                            log.info(
+                                                                f"1순회 테스트 완료: {max_grades}개 세부등급 처리됨"
                                                             )
                                                         else:
-                                                            console.print(
-                                                                f"[red]등급 선택 실패: {grade['text']}[/red]"
+                                                            log.error(
+                                                                f"등급 선택 실패: {grade['text']}"
                                                             )
                                                     else:
-                                                        console.print(
-                                                            "[red]등급 옵션을 찾을 수 없음[/red]"
-                                                        )
+                                                        log.error("등급 옵션을 찾을 수 없음")
                                                 else:
-                                                    console.print(
-                                                        f"[red]연료 선택 실패: {fuel['text']}[/red]"
+                                                    log.error(
+                                                        f"연료 선택 실패: {fuel['text']}"
                                                     )
                                             else:
-                                                console.print(
-                                                    "[red]연료 옵션을 찾을 수 없음[/red]"
-                                                )
+                                                log.error("연료 옵션을 찾을 수 없음")
                                         else:
-                                            console.print(
-                                                f"[red]연식 선택 실패: {year['text']}[/red]"
-                                            )
+                                            log.error(f"연식 선택 실패: {year['text']}")
                                     else:
-                                        console.print("[red]연식 옵션을 찾을 수 없음[/red]")
+                                        log.error("연식 옵션을 찾을 수 없음")
                                 else:
-                                    console.print(
-                                        f"[red]세부모델 선택 실패: {detailed_model['text']}[/red]"
-                                    )
+                                    log.error(f"세부모델 선택 실패: {detailed_model['text']}")
                             else:
-                                console.print("[red]세부모델 옵션을 찾을 수 없음[/red]")
+                                log.error("세부모델 옵션을 찾을 수 없음")
                         else:
-                            console.print(f"[red]모델 선택 실패: {model['text']}[/red]")
+                            log.error(f"모델 선택 실패: {model['text']}")
                     else:
-                        console.print("[red]모델 옵션을 찾을 수 없음[/red]")
+                        log.error("모델 옵션을 찾을 수 없음")
                 else:
-                    console.print(f"[red]제조사 선택 실패: {manufacturer['text']}[/red]")
+                    log.error(f"제조사 선택 실패: {manufacturer['text']}")
             else:
-                console.print("[red]제조사 옵션을 찾을 수 없음[/red]")
+                log.error("제조사 옵션을 찾을 수 없음")
 
         except Exception as e:
-            console.print(f"[red]테스트 실패: {e}[/red]")
+            log.error(f"테스트 실패: {e}")
             import traceback
 
-            console.print(f"[red]{traceback.format_exc()}[/red]")
+            log.error(f"{traceback.format_exc()}")
 
     async def close(self):
         """브라우저/세션 자원 정리"""
+        if self.lane:
+            try:
+                await self.lane.page.close()
+            except Exception:
+                pass
+            self.lane = None
+        if self.parse_pool:
+            self.parse_pool.shutdown(wait=False, cancel_futures=True)
+            self.parse_pool = None
         try:
             if self.session:
                 self.session.close()
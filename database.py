@@ -2,21 +2,42 @@
 데이터베이스 모델 및 연결 관리
 """
 
+import os
+import tempfile
 from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import quote_plus
 
 from sqlalchemy import (
     Boolean,
     Column,
+    Date,
     DateTime,
     Float,
+    ForeignKey,
+    Index,
     Integer,
     String,
     Text,
+    UniqueConstraint,
+    bindparam,
     create_engine,
+    delete,
+    event,
+    func,
+    inspect,
+    select,
+    text,
+    update,
 )
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
+import config
+
 Base = declarative_base()
 
 
@@ -24,9 +45,15 @@ class CarPrice(Base):
     """차량 시세 정보 테이블"""
 
     __tablename__ = "car_prices"
+    __table_args__ = (
+        # 같은 조합은 하루에 한 행 - 같은 날 다시 크롤링하면 upsert 로 덮어쓴다
+        Index("uq_car_prices_hash_date", "options_hash", "crawl_date", unique=True),
+        # 실행 하나의 행을 조합 순서로 읽기 (실행 간 비교의 정렬 병합)
+        Index("ix_car_prices_log_hash", "crawl_log_id", "options_hash"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    manufacturer = Column(String(100), nullable=False, comment="제조사")
+    manufacturer = Column(String(100), nullable=False, index=True, comment="제조사")
     model = Column(String(100), nullable=False, comment="모델")
     detailed_model = Column(String(200), comment="세부모델")
     year = Column(String(50), comment="연식")
@@ -36,12 +63,14 @@ class CarPrice(Base):
 
     # 가격 정보
     price = Column(Float, comment="시세 (만원)")
-    is_price_available = Column(Boolean, default=True, comment="시세 제공 여부")
+    is_price_available = Column(Boolean, default=True, index=True, comment="시세 제공 여부")
     price_message = Column(Text, comment="시세 미제공시 메시지")
 
     # 메타데이터
-    crawled_at = Column(DateTime, default=datetime.now, comment="크롤링 시간")
+    crawled_at = Column(DateTime, default=datetime.now, index=True, comment="크롤링 시간")
     options_hash = Column(String(255), comment="옵션 조합 해시값")
+    crawl_date = Column(Date, comment="크롤링 날짜 (조합별 하루 한 행)")
+    crawl_log_id = Column(Integer, index=True, comment="크롤링 로그 ID")
 
     # 추가 정보
     manufacturer_code = Column(String(50), comment="제조사 코드")
@@ -71,34 +100,616 @@ class CrawlingLog(Base):
     success_count = Column(Integer)
     failed_count = Column(Integer)
     error_message = Column(Text)
+    shard = Column(String(50), comment="샤드 ID (i/n:기준)")
+    scope = Column(String(255), comment="전체 카탈로그가 아닌 실행의 범위 (필터/샘플링/증분, 전체면 NULL)")
 
 
-def get_db_engine():
-    """데이터베이스 엔진 생성"""
-    # SQLite 사용 (바로 실행 가능)
-    connection_string = "sqlite:///encar_prices.db"
+class OptionTreeNode(Base):
+    """옵션 트리 스냅샷 테이블 (실행별 op_dep1~6 옵션 목록)"""
+
+    __tablename__ = "option_tree_nodes"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    crawl_log_id = Column(Integer, index=True, comment="크롤링 로그 ID")
+    level = Column(Integer, comment="계층 깊이 (0=제조사)")
+    dep_class = Column(String(20), comment="옵션 영역 (op_dep*, fuel)")
+    parent_key = Column(String(500), index=True, comment="상위 경로 키")
+    code = Column(String(50), comment="옵션 코드")
+    value = Column(String(50), comment="옵션 값")
+    text = Column(String(200), comment="옵션 표시 텍스트")
+    price_text = Column(String(100), comment="옵션 우측 시세 텍스트(.rt)")
+    recorded_at = Column(DateTime, default=datetime.now, comment="기록 시간")
+
 
-    # MySQL 사용시 아래 주석 해제
-    # connection_string = f"mysql+pymysql://{config.DB_USER}:{config.DB_PASSWORD}@{config.DB_HOST}:{config.DB_PORT}/{config.DB_NAME}?charset=utf8mb4"
+class CrawlSummary(Base):
+    """실행별 제조사/모델 요약 테이블 - 시세 행을 저장할 때 함께 갱신 (storage.SummarySink)"""
 
-    engine = create_engine(
-        connection_string,
-        echo=False,
-        pool_pre_ping=True if "mysql" in connection_string else False,
-        pool_recycle=3600 if "mysql" in connection_string else -1,
+    __tablename__ = "crawl_summary"
+    __table_args__ = (
+        UniqueConstraint(
+            "crawl_log_id", "manufacturer", "model", name="uq_crawl_summary"
+        ),
     )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    crawl_log_id = Column(Integer, index=True, comment="크롤링 로그 ID (이전 데이터는 NULL)")
+    manufacturer = Column(String(100), nullable=False, comment="제조사")
+    model = Column(String(100), nullable=False, comment="모델")
+    row_count = Column(Integer, default=0, comment="시세 행 수")
+    available_count = Column(Integer, default=0, comment="시세 제공 행 수")
+    price_count = Column(Integer, default=0, comment="가격이 있는 행 수")
+    price_sum = Column(Float, default=0.0, comment="가격 합계 (평균 계산용)")
+    price_min = Column(Float, comment="최저 시세 (만원)")
+    price_max = Column(Float, comment="최고 시세 (만원)")
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+
+    @property
+    def price_avg(self):
+        return self.price_sum / self.price_count if self.price_count else None
+
+
+class OptionDim(Base):
+    """옵션 계층 차원 테이블 - 상위 노드 아래의 옵션 하나 (0=제조사 ... 6=세부등급)"""
+
+    __tablename__ = "option_dims"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    parent_id = Column(Integer, ForeignKey("option_dims.id"), index=True)
+    level = Column(Integer, nullable=False, comment="계층 깊이 (0=제조사)")
+    code = Column(String(50), nullable=False, default="", comment="옵션 값")
+    text = Column(String(200), nullable=False, default="", comment="옵션 표시 텍스트")
+
+
+# 노드 유일 키 - 최상위 노드(parent_id NULL)는 NULL 끼리 다른 값으로 취급되므로 0 으로 바꿔 비교한다
+Index(
+    "uq_option_dims_node",
+    func.coalesce(OptionDim.parent_id, 0),
+    OptionDim.level,
+    OptionDim.code,
+    OptionDim.text,
+    unique=True,
+)
+
+
+class PriceFact(Base):
+    """정규화 저장 모드의 시세 팩트 테이블 - 경로는 세부등급 차원 노드 하나로 표현"""
+
+    __tablename__ = "price_facts"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    crawl_log_id = Column(Integer, index=True, comment="크롤링 로그 ID")
+    leaf_id = Column(Integer, ForeignKey("option_dims.id"), nullable=False, index=True)
+    price = Column(Float, comment="시세 (만원)")
+    is_price_available = Column(Boolean, default=True, comment="시세 제공 여부")
+    price_message = Column(Text, comment="시세 미제공시 메시지")
+    options_hash = Column(String(255), comment="옵션 조합 해시값")
+    crawled_at = Column(DateTime, default=datetime.now, comment="크롤링 시간")
+
+
+class PriceHistory(Base):
+    """옵션 조합별 시세 이력 - 가격/제공 여부가 바뀔 때만 새 구간을 추가한다
+
+    한 행은 [valid_from, valid_to) 동안 같은 시세였던 구간이며, 아직 유효한 구간은
+    valid_to 가 NULL 이다. 값이 그대로면 last_seen_at 만 갱신한다 (storage.HistorySink).
+    """
+
+    __tablename__ = "price_history"
+    __table_args__ = (Index("ix_price_history_hash_to", "options_hash", "valid_to"),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    options_hash = Column(String(255), nullable=False, comment="옵션 조합 해시값")
+    leaf_id = Column(Integer, ForeignKey("option_dims.id"), comment="세부등급 차원 노드")
+    price = Column(Float, comment="시세 (만원)")
+    is_price_available = Column(Boolean, default=True, comment="시세 제공 여부")
+    price_message = Column(Text, comment="시세 미제공시 메시지")
+    valid_from = Column(DateTime, nullable=False, comment="이 시세가 처음 관측된 시간")
+    valid_to = Column(DateTime, comment="다음 시세로 바뀐 시간 (현재 구간은 NULL)")
+    last_seen_at = Column(DateTime, nullable=False, comment="이 시세가 마지막으로 관측된 시간")
+    first_crawl_log_id = Column(Integer, comment="처음 관측한 크롤링 로그 ID")
+    last_crawl_log_id = Column(Integer, comment="마지막으로 관측한 크롤링 로그 ID")
+
+
+class PriceAnalytics(Base):
+    """시세 분석 결과 - 모델/세부등급/연식별 중앙값과 변화율 (analytics.run_analytics 가 매번 다시 씀)"""
+
+    __tablename__ = "price_analytics"
+    __table_args__ = (
+        Index("ix_price_analytics_group", "model", "detailed_grade", "year"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    computed_at = Column(DateTime, default=datetime.now, comment="계산 시간")
+    model = Column(String(100), nullable=False, comment="모델")
+    detailed_grade = Column(String(200), comment="세부등급")
+    year = Column(Integer, comment="연식 (연도)")
+    sample_count = Column(Integer, comment="분석한 시세 행 수")
+    median_price = Column(Float, comment="시세 중앙값 (만원)")
+    depreciation_per_year = Column(Float, comment="연식 1년당 중앙값 차이 (모델/세부등급 단위, 만원)")
+    depreciation_pct = Column(Float, comment="연식 1년당 감가율 (%)")
+    latest_week = Column(Date, comment="마지막 관측 주의 시작일")
+    week_over_week_pct = Column(Float, comment="마지막 주 중앙값의 전주 대비 변화율 (%)")
+    outlier_count = Column(Integer, comment="이상치로 표시된 행 수")
+
+
+class PriceOutlier(Base):
+    """시세 분석에서 이상치로 표시된 행 (같은 모델/세부등급/연식 안의 robust z-score 기준)"""
+
+    __tablename__ = "price_outliers"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    computed_at = Column(DateTime, default=datetime.now, comment="계산 시간")
+    car_price_id = Column(Integer, index=True, comment="car_prices.id")
+    model = Column(String(100), nullable=False, comment="모델")
+    detailed_grade = Column(String(200), comment="세부등급")
+    year = Column(Integer, comment="연식 (연도)")
+    price = Column(Float, comment="시세 (만원)")
+    median_price = Column(Float, comment="같은 그룹의 시세 중앙값 (만원)")
+    robust_z = Column(Float, comment="0.6745 * (시세 - 중앙값) / MAD")
+
+
+class PriceChange(Base):
+    """두 크롤링 실행 사이의 조합별 시세 변화 (price_diff.diff_runs 가 실행 쌍마다 다시 씀)"""
+
+    __tablename__ = "price_changes"
+    __table_args__ = (
+        Index("ix_price_changes_runs", "from_log_id", "to_log_id", "change"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    from_log_id = Column(Integer, nullable=False, comment="이전 실행 (crawling_logs.id)")
+    to_log_id = Column(Integer, nullable=False, comment="비교 실행 (crawling_logs.id)")
+    options_hash = Column(String(255), nullable=False, comment="옵션 조합 해시값")
+    change = Column(
+        String(20),
+        nullable=False,
+        comment="new, removed, up, down, unavailable, available",
+    )
+    manufacturer = Column(String(100), comment="제조사")
+    model = Column(String(100), comment="모델")
+    detailed_model = Column(String(200), comment="세부모델")
+    year = Column(String(50), comment="연식")
+    detailed_grade = Column(String(200), comment="세부등급")
+    old_price = Column(Float, comment="이전 시세 (만원)")
+    new_price = Column(Float, comment="현재 시세 (만원)")
+    delta = Column(Float, comment="시세 차이 (만원)")
+    delta_pct = Column(Float, comment="시세 변화율 (%)")
+    computed_at = Column(DateTime, default=datetime.now, comment="계산 시간")
+
+
+# car_prices 와 같은 컬럼 구성으로 두 저장 방식을 합쳐 보여 주는 호환 뷰
+# (id 는 저장 방식마다 따로 매겨지므로 source 로 구분)
+COMPAT_VIEW = "v_car_prices"
+_PRICE_COLUMNS = (
+    "manufacturer, model, detailed_model, year, fuel_type, grade, detailed_grade, "
+    "price, is_price_available, price_message, crawled_at, options_hash, "
+    "manufacturer_code, model_code, detailed_model_code, year_code, fuel_code, "
+    "grade_code, detailed_grade_code, crawl_log_id"
+)
+_COMPAT_VIEW_SQL = f"""
+CREATE VIEW {COMPAT_VIEW} AS
+SELECT id, {_PRICE_COLUMNS}, 'wide' AS source FROM car_prices
+UNION ALL
+SELECT f.id,
+       d0.text, d1.text, d2.text, d3.text, d4.text, d5.text, d6.text,
+       f.price, f.is_price_available, f.price_message, f.crawled_at, f.options_hash,
+       d0.code, d1.code, d2.code, d3.code, d4.code, d5.code, d6.code,
+       f.crawl_log_id, 'normalized'
+FROM price_facts f
+JOIN option_dims d6 ON d6.id = f.leaf_id
+JOIN option_dims d5 ON d5.id = d6.parent_id
+JOIN option_dims d4 ON d4.id = d5.parent_id
+JOIN option_dims d3 ON d3.id = d4.parent_id
+JOIN option_dims d2 ON d2.id = d3.parent_id
+JOIN option_dims d1 ON d1.id = d2.parent_id
+JOIN option_dims d0 ON d0.id = d1.parent_id
+"""
+
+
+# upsert 충돌 시 새 값으로 덮어쓰는 컬럼 (키 컬럼과 id 제외)
+_UPSERT_KEYS = ("options_hash", "crawl_date")
+_UPSERT_COLUMNS = [
+    column.name
+    for column in CarPrice.__table__.columns
+    if column.name not in _UPSERT_KEYS and column.name != "id"
+]
+
+
+def _upsert_params(rows: List[Dict]) -> List[Dict]:
+    """행마다 같은 키 구성으로 맞추고 crawl_date 를 채운 파라미터 목록"""
+    now = datetime.now()
+    params = []
+    for row in rows:
+        crawled_at = row.get("crawled_at") or now
+        params.append(
+            {
+                **{name: row.get(name) for name in _UPSERT_COLUMNS},
+                "options_hash": row.get("options_hash"),
+                "crawled_at": crawled_at,
+                "crawl_date": crawled_at.date(),
+            }
+        )
+    return params
+
+
+def upsert_car_prices(session, rows: List[Dict]):
+    """시세 행을 (options_hash, crawl_date) 기준으로 저장 - 이미 있으면 새 값으로 갱신
+
+    SQLite 는 ON CONFLICT DO UPDATE, MySQL 은 ON DUPLICATE KEY UPDATE 를 세션의 연결에서 Core
+    executemany 로 실행한다 (ORM 실행 경로는 행마다 문장을 따로 컴파일한다). MySQL 은
+    MYSQL_INSERT_BATCH 행씩 다중 VALUES INSERT 로 합쳐져 전송되고, MYSQL_LOADER=infile 이면
+    LOAD DATA LOCAL INFILE 을 쓴다. 그 외 DB 는 일반 bulk insert (유니크 인덱스에 걸리면 예외).
+    """
+    if not rows:
+        return
+    params = _upsert_params(rows)
+
+    dialect = session.get_bind().dialect.name
+    if dialect == "sqlite":
+        stmt = sqlite_insert(CarPrice)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(_UPSERT_KEYS),
+            set_={name: stmt.excluded[name] for name in _UPSERT_COLUMNS},
+        )
+        session.connection().execute(stmt, params)
+    elif dialect == "mysql" and config.MYSQL_LOADER == "infile":
+        load_car_prices_infile(session, params)
+    elif dialect == "mysql":
+        stmt = mysql_insert(CarPrice)
+        stmt = stmt.on_duplicate_key_update(
+            {name: stmt.inserted[name] for name in _UPSERT_COLUMNS}
+        )
+        for start in range(0, len(params), config.MYSQL_INSERT_BATCH):
+            session.connection().execute(
+                stmt, params[start : start + config.MYSQL_INSERT_BATCH]
+            )
+    else:
+        session.bulk_insert_mappings(CarPrice, params)
+
+
+# LOAD DATA 기본 형식(탭 구분, 역슬래시 이스케이프)에 맞춘 값 변환
+_INFILE_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def _infile_value(value) -> str:
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    return str(value).translate(_INFILE_ESCAPES)
+
+
+def load_car_prices_infile(session, rows: List[Dict]):
+    """LOAD DATA LOCAL INFILE 로 대량 적재 (MySQL 전용, 같은 조합/날짜 행은 REPLACE)
+
+    행을 임시 탭 구분 파일로 쓴 뒤 서버가 한 번에 읽게 하므로 수십만 행 이상에서
+    INSERT 보다 빠르다. 클라이언트(local_infile=True 로 연결)와 서버의 local_infile 설정이 필요하다.
+    """
+    columns = list(rows[0])
+    with tempfile.NamedTemporaryFile(
+        "w", encoding="utf-8", suffix=".tsv", delete=False
+    ) as handle:
+        for row in rows:
+            handle.write("\t".join(_infile_value(row[name]) for name in columns))
+            handle.write("\n")
+    try:
+        session.execute(
+            text(
+                f"LOAD DATA LOCAL INFILE :path REPLACE INTO TABLE {CarPrice.__tablename__} "
+                f"CHARACTER SET utf8mb4 ({', '.join(columns)})"
+            ),
+            {"path": handle.name},
+        )
+    finally:
+        os.unlink(handle.name)
+
+
+def dedupe_car_prices(session, chunk_size: int = 1000) -> Tuple[int, int]:
+    """기존 car_prices 를 조합/날짜별 한 행으로 정리하고 crawl_date 를 채운다 (마이그레이션)
+
+    options_hash 를 chunk_size 개씩 끊어 처리하고 청크마다 커밋하므로 큰 테이블도 긴 잠금 없이
+    돌릴 수 있고, 중간에 멈춰도 다시 실행하면 이어서 정리된다. 같은 날 여러 행이면 가장 나중에
+    크롤링된 행을 남긴다. (삭제 행 수, crawl_date 를 채운 행 수) 반환.
+    """
+    deleted = updated = 0
+    last_hash = ""
+    while True:
+        hashes = list(
+            session.scalars(
+                select(CarPrice.options_hash)
+                .where(CarPrice.options_hash > last_hash)
+                .distinct()
+                .order_by(CarPrice.options_hash)
+                .limit(chunk_size)
+            )
+        )
+        if not hashes:
+            break
+        last_hash = hashes[-1]
+
+        keep: Dict[Tuple, Tuple[int, object, object]] = {}
+        drop: List[int] = []
+        rows = session.execute(
+            select(
+                CarPrice.id,
+                CarPrice.options_hash,
+                CarPrice.crawled_at,
+                CarPrice.crawl_date,
+            )
+            .where(CarPrice.options_hash.in_(hashes))
+            .order_by(CarPrice.options_hash, CarPrice.crawled_at, CarPrice.id)
+        )
+        for row_id, options_hash, crawled_at, crawl_date in rows:
+            day = crawl_date or (crawled_at.date() if crawled_at else None)
+            if day is None:
+                continue
+            previous = keep.get((options_hash, day))
+            if previous:
+                drop.append(previous[0])
+            keep[(options_hash, day)] = (row_id, crawl_date, day)
+
+        for start in range(0, len(drop), chunk_size):
+            session.query(CarPrice).filter(
+                CarPrice.id.in_(drop[start : start + chunk_size])
+            ).delete(synchronize_session=False)
+        missing = [
+            {"id": row_id, "crawl_date": day}
+            for row_id, crawl_date, day in keep.values()
+            if crawl_date is None
+        ]
+        session.bulk_update_mappings(CarPrice, missing)
+        session.commit()
+        deleted += len(drop)
+        updated += len(missing)
+    return deleted, updated
+
+
+# 프로세스 안에서 엔진(연결 풀)을 재사용 - 모드별로 하나씩
+_engines: Dict[bool, object] = {}
+
+
+def _sqlite_pragmas(bulk_load: bool) -> List[str]:
+    """연결마다 적용할 PRAGMA 목록
+
+    WAL 은 읽기와 쓰기가 서로 막지 않고, synchronous=NORMAL 은 WAL 에서 커밋마다 fsync 하지
+    않아도 DB 가 깨지지 않는다. 대량 적재 모드는 fsync 를 끄고 체크포인트를 덜 자주 한다.
+    """
+    cache_kb = config.SQLITE_CACHE_MB * 1024 * (4 if bulk_load else 1)
+    pragmas = [
+        "journal_mode=WAL",
+        f"synchronous={'OFF' if bulk_load else 'NORMAL'}",
+        f"cache_size=-{cache_kb}",
+        "temp_store=MEMORY",
+        f"mmap_size={config.SQLITE_MMAP_MB * 1024 * 1024}",
+        f"busy_timeout={config.SQLITE_BUSY_TIMEOUT_MS}",
+    ]
+    if bulk_load:
+        pragmas.append("wal_autocheckpoint=10000")
+    return pragmas
+
+
+def get_database_url() -> str:
+    """DATABASE_URL 이 있으면 그대로, 없으면 DB_BACKEND 와 DB_* 설정으로 연결 문자열 구성"""
+    if config.DATABASE_URL:
+        return config.DATABASE_URL
+    if config.DB_BACKEND == "mysql":
+        return (
+            f"mysql+pymysql://{quote_plus(config.DB_USER)}:{quote_plus(config.DB_PASSWORD)}"
+            f"@{config.DB_HOST}:{config.DB_PORT}/{config.DB_NAME}?charset=utf8mb4"
+        )
+    if config.DB_BACKEND == "sqlite":
+        return f"sqlite:///{config.SQLITE_PATH}"
+    raise ValueError(f"지원하지 않는 DB_BACKEND: {config.DB_BACKEND}")
+
+
+def get_db_engine(bulk_load: bool = config.SQLITE_BULK_LOAD):
+    """데이터베이스 엔진 (처음 호출할 때 만들고 이후에는 재사용)"""
+    engine = _engines.get(bulk_load)
+    if engine is not None:
+        return engine
+
+    url = make_url(get_database_url())
+    if url.get_backend_name() == "mysql":
+        engine = create_engine(
+            url,
+            echo=False,
+            pool_pre_ping=True,
+            pool_recycle=3600,
+            connect_args={"local_infile": config.MYSQL_LOADER == "infile"},
+        )
+    else:
+        engine = create_engine(url, echo=False)
+    if engine.dialect.name == "sqlite":
+        pragmas = _sqlite_pragmas(bulk_load)
+
+        @event.listens_for(engine, "connect")
+        def _apply_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for pragma in pragmas:
+                cursor.execute(f"PRAGMA {pragma}")
+            cursor.close()
+
+    _engines[bulk_load] = engine
     return engine
 
 
+class CrawlLease(Base):
+    """분산 크롤링 작업 임대 테이블 (제조사/모델 경로 단위)"""
+
+    __tablename__ = "crawl_leases"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    task_key = Column(String(255), unique=True, nullable=False, comment="경로 키")
+    path_json = Column(Text, nullable=False, comment="옵션 경로 (JSON)")
+    depth = Column(Integer, comment="경로 깊이")
+    status = Column(
+        String(20), default="PENDING", index=True
+    )  # PENDING, LEASED, DONE, FAILED
+    owner = Column(String(100), comment="작업 중인 워커 ID")
+    lease_expires_at = Column(DateTime, comment="임대 만료 시간")
+    heartbeat_at = Column(DateTime, comment="마지막 하트비트")
+    attempts = Column(Integer, default=0, comment="시도 횟수")
+    created_at = Column(DateTime, default=datetime.now)
+    finished_at = Column(DateTime)
+    error_message = Column(Text)
+    donated_json = Column(Text, comment="다른 워커에게 넘긴 하위 경로 키 (JSON)")
+
+
+class CrawlWorker(Base):
+    """임대 큐 워커 상태 (작업을 못 받고 기다리는 워커가 있는지 알리는 용도)"""
+
+    __tablename__ = "crawl_workers"
+
+    owner = Column(String(100), primary_key=True, comment="워커 ID")
+    waiting_since = Column(DateTime, comment="대기 작업이 없어 기다리기 시작한 시간")
+    seen_at = Column(DateTime, comment="마지막 임대 시도 시간")
+
+
+def _add_missing_columns(engine):
+    """기존 테이블에 모델에 새로 추가된 컬럼이 없으면 ALTER TABLE 로 추가"""
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {col["name"] for col in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                col_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(
+                    text(
+                        f"ALTER TABLE {table.name} ADD COLUMN {column.name} {col_type}"
+                    )
+                )
+
+
+def _index_names(engine, table_name: str) -> Set[str]:
+    """테이블의 인덱스 이름 (식 기반 인덱스 포함 - inspector 는 식 인덱스를 건너뛴다)"""
+    dialect = engine.dialect.name
+    if dialect == "sqlite":
+        query = text(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :name"
+        )
+    elif dialect == "mysql":
+        query = text(
+            "SELECT DISTINCT index_name FROM information_schema.statistics "
+            "WHERE table_schema = DATABASE() AND table_name = :name"
+        )
+    else:
+        return {index["name"] for index in inspect(engine).get_indexes(table_name)}
+    with engine.connect() as conn:
+        return {name for (name,) in conn.execute(query, {"name": table_name})}
+
+
+def _add_missing_indexes(engine):
+    """기존 테이블에 모델에 새로 추가된 인덱스가 없으면 생성"""
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = _index_names(engine, table.name)
+            for index in table.indexes:
+                if index.name not in existing:
+                    index.create(conn)
+
+
+def _create_views(engine):
+    """호환 뷰를 현재 컬럼 구성으로 다시 만든다"""
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP VIEW IF EXISTS {COMPAT_VIEW}"))
+        conn.execute(text(_COMPAT_VIEW_SQL))
+
+
+def _merge_duplicate_dims(engine):
+    """uq_option_dims_node 를 만들기 전에 같은 (상위, 레벨, 코드, 텍스트) 로 중복 저장된 노드를 합친다
+
+    최상위 레벨부터 (합친 상위 노드, 코드, 텍스트) 가 같은 노드를 하나로 정하고 (상위가 이미
+    합친 노드인 것 우선, 없으면 가장 작은 id), 팩트/이력의 leaf_id 를 그 노드로 옮긴 뒤 나머지를
+    가장 깊은 레벨부터 지운다. 남길 노드의 상위가 지워질 노드면 합친 상위 노드로 바꾼다.
+    """
+    inspector = inspect(engine)
+    if not inspector.has_table(OptionDim.__tablename__):
+        return
+    if "uq_option_dims_node" in _index_names(engine, OptionDim.__tablename__):
+        return
+    with engine.begin() as conn:
+        query = select(
+            OptionDim.id,
+            OptionDim.parent_id,
+            OptionDim.level,
+            OptionDim.code,
+            OptionDim.text,
+        ).order_by(OptionDim.level, OptionDim.id)
+        canonical: Dict[int, int] = {}  # 노드 id -> 남길 노드 id
+        levels: Dict[int, int] = {}
+        rows = conn.execute(query).all()
+        for level in sorted({row.level for row in rows}):
+            groups: Dict[Tuple, List[Tuple[int, Optional[int]]]] = {}
+            for row in rows:
+                if row.level != level:
+                    continue
+                parent = canonical.get(row.parent_id, row.parent_id) or 0
+                groups.setdefault((parent, row.code, row.text), []).append(
+                    (row.id, row.parent_id)
+                )
+                levels[row.id] = level
+            for (parent, _, _), members in groups.items():
+                keep = next(
+                    (dim_id for dim_id, raw in members if (raw or 0) == parent),
+                    members[0][0],
+                )
+                for dim_id, _ in members:
+                    canonical[dim_id] = keep
+        moved = [
+            {"old_id": dim_id, "new_id": keep}
+            for dim_id, keep in canonical.items()
+            if dim_id != keep
+        ]
+        if not moved:
+            return
+        # 남길 노드 중 상위가 지워질 노드인 것은 합친 상위로 옮긴다
+        reparent = [
+            {"old_id": row.id, "new_id": canonical[row.parent_id]}
+            for row in rows
+            if canonical[row.id] == row.id
+            and row.parent_id is not None
+            and canonical[row.parent_id] != row.parent_id
+        ]
+        if reparent:
+            conn.execute(
+                update(OptionDim)
+                .where(OptionDim.id == bindparam("old_id"))
+                .values(parent_id=bindparam("new_id")),
+                reparent,
+            )
+        for model in (PriceFact, PriceHistory):
+            conn.execute(
+                update(model)
+                .where(model.leaf_id == bindparam("old_id"))
+                .values(leaf_id=bindparam("new_id")),
+                moved,
+            )
+        moved.sort(key=lambda item: levels[item["old_id"]], reverse=True)
+        conn.execute(
+            delete(OptionDim).where(OptionDim.id == bindparam("old_id")),
+            [{"old_id": item["old_id"]} for item in moved],
+        )
+
+
 def init_database():
     """데이터베이스 초기화"""
     engine = get_db_engine()
     Base.metadata.create_all(engine)
+    _add_missing_columns(engine)
+    _merge_duplicate_dims(engine)
+    _add_missing_indexes(engine)
+    _create_views(engine)
     return engine
 
 
-def get_session():
-    """데이터베이스 세션 생성"""
-    engine = get_db_engine()
-    Session = sessionmaker(bind=engine)
-    return Session()
+def get_session(bulk_load: bool = config.SQLITE_BULK_LOAD):
+    """데이터베이스 세션 생성 (bulk_load=True 면 SQLite 대량 적재 설정의 연결 사용)"""
+    return sessionmaker(bind=get_db_engine(bulk_load))()
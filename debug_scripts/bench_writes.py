@@ -0,0 +1,135 @@
+"""
+시세 저장 방식 벤치마크
+
+가짜 시세 행을 car_prices 에 저장하는 여러 방법의 속도를 비교한다. 방법마다 테이블을 비우고
+같은 행을 batch 단위로 나눠 저장/커밋한다.
+    orm      - 행마다 CarPrice 객체 (session.add_all)
+    bulk     - bulk_insert_mappings (유니크 충돌 처리 없음)
+    upsert   - upsert_car_prices (SQLite ON CONFLICT / MySQL ON DUPLICATE KEY executemany)
+    rerun    - 같은 행을 한 번 더 upsert (같은 날 재크롤링 - 모두 갱신 경로)
+    infile   - LOAD DATA LOCAL INFILE (MySQL 전용)
+
+    python debug_scripts/bench_writes.py --rows 20000
+    python debug_scripts/bench_writes.py --url "mysql+pymysql://user:pw@host/bench" --batch 500 1000 5000
+
+--url 을 주지 않으면 임시 디렉터리의 SQLite 파일을 쓴다. 운영 DB 를 가리키지 않도록 주의.
+"""
+
+import argparse
+import hashlib
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def fake_rows(count: int):
+    crawled_at = datetime.now()
+    rows = []
+    for i in range(count):
+        path = [f"제조사{i % 20}", f"모델{i % 200}", f"세부{i % 1000}", str(2010 + i % 15)]
+        rows.append(
+            {
+                "manufacturer": path[0],
+                "model": path[1],
+                "detailed_model": path[2],
+                "year": path[3],
+                "fuel_type": "가솔린",
+                "grade": f"등급{i % 7}",
+                "detailed_grade": f"세부등급{i}",
+                "price": float(1000 + i % 3000),
+                "is_price_available": i % 10 != 0,
+                "price_message": None if i % 10 else "시세 정보 없음",
+                "crawled_at": crawled_at,
+                "options_hash": hashlib.md5(str(i).encode()).hexdigest(),
+                "manufacturer_code": str(i % 20),
+                "model_code": str(i % 200),
+                "detailed_model_code": str(i % 1000),
+                "year_code": path[3],
+                "fuel_code": "G",
+                "grade_code": str(i % 7),
+                "detailed_grade_code": str(i),
+            }
+        )
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="시세 저장 방식 벤치마크")
+    parser.add_argument("--url", help="SQLAlchemy URL (기본: 임시 SQLite)")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--batch", type=int, nargs="+", default=[500, 1000, 5000])
+    parser.add_argument(
+        "--strategies",
+        nargs="+",
+        default=["orm", "bulk", "upsert", "rerun", "infile"],
+    )
+    args = parser.parse_args()
+
+    if args.url:
+        os.environ["DATABASE_URL"] = args.url
+    else:
+        workdir = tempfile.mkdtemp(prefix="bench_writes_")
+        os.environ["DATABASE_URL"] = f"sqlite:///{workdir}/bench.db"
+    if args.url and args.url.startswith("mysql"):
+        # infile 방식을 위해 local_infile 을 허용한 연결로 만든다
+        os.environ["MYSQL_LOADER"] = "infile"
+
+    import config
+    from database import (
+        CarPrice,
+        get_session,
+        init_database,
+        load_car_prices_infile,
+        upsert_car_prices,
+    )
+
+    engine = init_database()
+    dialect = engine.dialect.name
+    print(f"DB: {engine.url.render_as_string(hide_password=True)} ({dialect})")
+    rows = fake_rows(args.rows)
+    session = get_session()
+
+    def run(strategy: str, batch: int):
+        for start in range(0, len(rows), batch):
+            chunk = rows[start : start + batch]
+            if strategy == "orm":
+                session.add_all(CarPrice(**row) for row in chunk)
+            elif strategy == "bulk":
+                session.bulk_insert_mappings(CarPrice, chunk)
+            elif strategy == "infile":
+                load_car_prices_infile(session, chunk)
+            else:
+                upsert_car_prices(session, chunk)
+            session.commit()
+
+    for strategy in args.strategies:
+        if strategy == "infile" and dialect != "mysql":
+            continue
+        config.MYSQL_LOADER = "executemany"
+        config.MYSQL_INSERT_BATCH = max(args.batch)
+        for batch in args.batch:
+            if strategy == "upsert":
+                config.MYSQL_INSERT_BATCH = batch
+            session.query(CarPrice).delete()
+            session.commit()
+            if strategy == "rerun":
+                run("upsert", batch)
+            started = time.perf_counter()
+            run(strategy, batch)
+            elapsed = time.perf_counter() - started
+            print(
+                f"{strategy:8s} batch={batch:<6d} {elapsed:7.2f}초  "
+                f"{len(rows) / elapsed:10,.0f}행/초  (저장 {session.query(CarPrice).count():,}행)"
+            )
+
+    session.query(CarPrice).delete()
+    session.commit()
+    session.close()
+
+
+if __name__ == "__main__":
+    main()
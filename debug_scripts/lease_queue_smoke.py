@@ -0,0 +1,86 @@
+"""
+작업 임대 큐 로컬 검증 스크립트
+
+임시 디렉터리의 SQLite 파일 하나에 가짜 작업을 등록하고 여러 프로세스를 워커로 띄운다.
+일부 워커는 작업 도중 하트비트 없이 죽는 것처럼 동작하며, 그 작업이 임대 만료 후
+다른 워커에게 넘어가 모든 작업이 DONE 이 되는지 확인한다.
+
+    python debug_scripts/lease_queue_smoke.py --workers 4 --tasks 20
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def worker(workdir: str, worker_no: int, lease_seconds: float, crash_rate: float):
+    os.chdir(workdir)
+    from lease_queue import LeaseQueue
+
+    queue = LeaseQueue(owner=f"worker-{worker_no}", lease_seconds=lease_seconds)
+    rng = random.Random(worker_no)
+    done = 0
+    while True:
+        lease = queue.claim()
+        if lease is None:
+            if not queue.has_active():
+                break
+            time.sleep(lease_seconds / 4)
+            continue
+        time.sleep(rng.uniform(0.05, 0.2))
+        if rng.random() < crash_rate:
+            # 하트비트/완료 없이 사라진 워커 흉내 - 임대가 만료될 때까지 방치
+            print(f"worker-{worker_no}: {lease.task_key} 포기 (죽은 노드 흉내)")
+            continue
+        queue.heartbeat(lease)
+        if queue.complete(lease):
+            done += 1
+    print(f"worker-{worker_no}: {done}개 완료")
+    queue.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="작업 임대 큐 로컬 검증")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--tasks", type=int, default=20)
+    parser.add_argument("--lease-seconds", type=float, default=1.0)
+    parser.add_argument("--crash-rate", type=float, default=0.2)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="lease_smoke_")
+    os.chdir(workdir)
+    from database import init_database
+    from lease_queue import LeaseQueue
+
+    init_database()
+    queue = LeaseQueue(owner="coordinator")
+    paths = [[{"value": f"M{i:03d}", "text": f"제조사{i}"}] for i in range(args.tasks)]
+    print(f"작업 {queue.seed(paths)}개 등록 ({workdir})")
+
+    processes = [
+        multiprocessing.Process(
+            target=worker, args=(workdir, n, args.lease_seconds, args.crash_rate)
+        )
+        for n in range(args.workers)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    counts = queue.counts()
+    print(f"최종 현황: {counts}")
+    queue.close()
+    ok = counts.get("DONE", 0) + counts.get("FAILED", 0) == args.tasks
+    print("OK" if ok else "FAIL - 처리되지 않은 작업이 있습니다")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
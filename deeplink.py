@@ -0,0 +1,77 @@
+"""
+저장된 경로로 바로 이동 (딥링크) - 드롭다운을 일곱 번 거치지 않고 특정 조합의 시세를 다시 확인한다
+
+경로는 car_prices 행의 코드/이름 컬럼으로 복원한다. 이동 방식:
+    url   - config.DEEPLINK_URL_TEMPLATE 에 레벨별 값을 채운 URL 로 이동
+    form  - prForm 의 레벨별 hidden input(input.ui_inpt) 을 채워 제출
+    click - 기존처럼 레벨마다 옵션 선택 (항상 동작하는 대안)
+"""
+
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+from database import CarPrice
+from sharding import CrawlFilter
+
+DEEPLINK_MODES = ("auto", "url", "form", "click")
+
+# LEVEL_ORDER 순서의 (이름 컬럼, 코드 컬럼)
+PATH_COLUMNS = (
+    ("manufacturer", "manufacturer_code"),
+    ("model", "model_code"),
+    ("detailed_model", "detailed_model_code"),
+    ("year", "year_code"),
+    ("fuel_type", "fuel_code"),
+    ("grade", "grade_code"),
+    ("detailed_grade", "detailed_grade_code"),
+)
+
+
+def path_from_row(row: CarPrice) -> List[Dict]:
+    """car_prices 행에서 옵션 경로 복원 (code 컬럼에는 옵션의 value 가 저장되어 있다)"""
+    path = []
+    for text_column, code_column in PATH_COLUMNS:
+        value = getattr(row, code_column) or ""
+        text = getattr(row, text_column) or ""
+        if not value and not text:
+            break
+        path.append({"code": "", "value": value, "text": text})
+    return path
+
+
+def build_deeplink_url(template: str, levels: List[str], path: List[Dict]) -> str:
+    """'{op_dep1}' 처럼 레벨 이름을 자리표시자로 쓰는 템플릿에 경로 값을 채운다"""
+    values = {level: "" for level in levels}
+    for level, option in zip(levels, path):
+        values[level] = quote(option.get("value") or option.get("code") or "")
+    return template.format(**values)
+
+
+def known_leaves(
+    session, limit: int, crawl_filter: Optional[CrawlFilter] = None
+) -> List[Tuple[List[Dict], Optional[float]]]:
+    """최근 크롤링된 리프부터 조합별 최신 시세와 함께 limit 개 반환"""
+    seen = set()
+    leaves = []
+    query = (
+        session.query(CarPrice)
+        .filter(CarPrice.options_hash.isnot(None))
+        .order_by(CarPrice.crawled_at.desc())
+        .yield_per(500)
+    )
+    for row in query:
+        if row.options_hash in seen:
+            continue
+        seen.add(row.options_hash)
+        path = path_from_row(row)
+        if len(path) < 6:
+            continue
+        if crawl_filter and not (
+            crawl_filter.allows("op_dep1", [], path[0])
+            and crawl_filter.allows("op_dep2", path[:1], path[1])
+        ):
+            continue
+        leaves.append((path, row.price if row.is_price_available else None))
+        if len(leaves) >= limit:
+            break
+    return leaves
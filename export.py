@@ -0,0 +1,165 @@
+"""
+시세 데이터 내보내기 - car_prices 를 스트리밍으로 읽어 CSV / JSONL / Parquet 파일로 쓴다
+
+행은 yield_per 로 나눠 읽으므로 (MySQL 은 서버 측 커서) 행 수와 관계없이 메모리 사용량이 일정하다.
+    csv     - 헤더 + 쉼표 구분 (gzip 이면 .csv.gz)
+    jsonl   - 한 줄에 행 하나 (gzip 이면 .jsonl.gz)
+    parquet - 열 단위 압축 파일, pyarrow 필요 (gzip 이면 파일 대신 열 압축 코덱으로 적용)
+"""
+
+import csv
+import gzip
+import json
+from datetime import date, datetime, timedelta
+from typing import Iterator, List, Optional, Sequence
+
+from sqlalchemy import or_, select
+
+from database import CarPrice
+
+EXPORT_FORMATS = ("csv", "jsonl", "parquet")
+
+# 내보내는 컬럼 (car_prices 컬럼 순서)
+EXPORT_COLUMNS = [column.name for column in CarPrice.__table__.columns]
+
+_ARROW_TYPES = {
+    "Integer": "int64",
+    "Float": "float64",
+    "Boolean": "bool_",
+    "DateTime": "timestamp",
+    "Date": "date32",
+}
+
+
+def guess_format(path: str) -> str:
+    """파일 확장자로 형식 추정 (.gz 는 무시)"""
+    name = path[:-3] if path.endswith(".gz") else path
+    for fmt in EXPORT_FORMATS:
+        if name.endswith(f".{fmt}"):
+            return fmt
+    raise ValueError(f"확장자로 형식을 알 수 없습니다: {path} (--export-format 지정)")
+
+
+def iter_rows(
+    session,
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    manufacturers: Sequence[str] = (),
+    batch_size: int = 5000,
+) -> Iterator[List[tuple]]:
+    """조건에 맞는 car_prices 행을 batch_size 개씩 튜플 목록으로 반환 (until 날짜 포함)"""
+    query = select(*(CarPrice.__table__.c[name] for name in EXPORT_COLUMNS))
+    if since:
+        query = query.where(
+            CarPrice.crawled_at >= datetime.combine(since, datetime.min.time())
+        )
+    if until:
+        query = query.where(
+            CarPrice.crawled_at
+            < datetime.combine(until + timedelta(days=1), datetime.min.time())
+        )
+    if manufacturers:
+        query = query.where(
+            or_(
+                CarPrice.manufacturer.in_(manufacturers),
+                CarPrice.manufacturer_code.in_(manufacturers),
+            )
+        )
+    query = query.order_by(CarPrice.id).execution_options(yield_per=batch_size)
+    for partition in session.execute(query).partitions():
+        yield [tuple(row) for row in partition]
+
+
+def _open_text(path: str, compress: bool):
+    if compress:
+        return gzip.open(path, "wt", encoding="utf-8", newline="")
+    return open(path, "w", encoding="utf-8", newline="")
+
+
+def _write_csv(batches: Iterator[List[tuple]], path: str, compress: bool) -> int:
+    count = 0
+    with _open_text(path, compress) as handle:
+        writer = csv.writer(handle)
+        writer.writerow(EXPORT_COLUMNS)
+        for batch in batches:
+            writer.writerows(batch)
+            count += len(batch)
+    return count
+
+
+def _json_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _write_jsonl(batches: Iterator[List[tuple]], path: str, compress: bool) -> int:
+    count = 0
+    with _open_text(path, compress) as handle:
+        for batch in batches:
+            handle.writelines(
+                json.dumps(
+                    dict(zip(EXPORT_COLUMNS, map(_json_value, row))), ensure_ascii=False
+                )
+                + "\n"
+                for row in batch
+            )
+            count += len(batch)
+    return count
+
+
+def _arrow_schema(pa):
+    fields = []
+    for name in EXPORT_COLUMNS:
+        type_name = _ARROW_TYPES.get(type(CarPrice.__table__.c[name].type).__name__)
+        if type_name == "timestamp":
+            arrow_type = pa.timestamp("us")
+        elif type_name:
+            arrow_type = getattr(pa, type_name)()
+        else:
+            arrow_type = pa.string()
+        fields.append(pa.field(name, arrow_type))
+    return pa.schema(fields)
+
+
+def _write_parquet(batches: Iterator[List[tuple]], path: str, compress: bool) -> int:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet 내보내기에는 pyarrow 가 필요합니다: pip install pyarrow")
+
+    schema = _arrow_schema(pa)
+    count = 0
+    with pq.ParquetWriter(
+        path, schema, compression="gzip" if compress else "snappy"
+    ) as writer:
+        for batch in batches:
+            # 배치 하나를 열 단위로 바꿔 row group 하나로 쓴다
+            columns = dict(zip(EXPORT_COLUMNS, map(list, zip(*batch))))
+            writer.write_batch(pa.RecordBatch.from_pydict(columns, schema=schema))
+            count += len(batch)
+    return count
+
+
+def export_prices(
+    session,
+    path: str,
+    fmt: Optional[str] = None,
+    compress: Optional[bool] = None,
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    manufacturers: Sequence[str] = (),
+    batch_size: int = 5000,
+) -> int:
+    """car_prices 를 path 로 내보내고 행 수 반환 (형식/압축을 생략하면 확장자로 판단)"""
+    fmt = fmt or guess_format(path)
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"잘못된 내보내기 형식: {fmt}")
+    if fmt == "parquet" and path.endswith(".gz"):
+        raise ValueError(f"Parquet 파일에는 .gz 를 붙이지 않습니다: {path} (--gzip 은 열 압축 코덱으로 적용)")
+    if compress is None:
+        compress = path.endswith(".gz")
+    batches = iter_rows(session, since, until, manufacturers, batch_size)
+    writers = {"csv": _write_csv, "jsonl": _write_jsonl, "parquet": _write_parquet}
+    return writers[fmt](batches, path, compress)
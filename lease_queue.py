@@ -0,0 +1,225 @@
+"""
+분산 크롤링 작업 임대 큐 - 공유 DB 의 crawl_leases 테이블로 여러 노드가 작업을 나눈다
+
+작업(제조사/모델 경로)은 시간 제한 임대로 가져가며, 워커는 작업 중 하트비트로 임대를 연장한다.
+하트비트가 끊긴 임대는 만료 후 다른 워커가 다시 가져간다.
+"""
+
+import json
+import os
+import socket
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy import and_, func, or_, update
+
+import config
+from database import CrawlLease, CrawlWorker, get_session
+from option_tree import path_key
+
+
+def default_owner() -> str:
+    """호스트명:PID 형식의 워커 ID"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class LeaseQueue:
+    def __init__(
+        self,
+        owner: Optional[str] = None,
+        lease_seconds: float = config.LEASE_SECONDS,
+        max_attempts: int = config.LEASE_MAX_ATTEMPTS,
+        session=None,
+    ):
+        self.owner = owner or default_owner()
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        # 크롤러 세션과 커밋이 섞이지 않도록 별도 세션을 쓴다
+        self.session = session or get_session()
+
+    def seed(self, paths: List[List[Dict]]) -> int:
+        """경로 목록을 작업으로 등록 (이미 있는 작업은 건너뛴다)"""
+        existing = {key for (key,) in self.session.query(CrawlLease.task_key)}
+        added = 0
+        for path in paths:
+            key = path_key(path)
+            if key in existing:
+                continue
+            existing.add(key)
+            self.session.add(
+                CrawlLease(
+                    task_key=key,
+                    path_json=json.dumps(path, ensure_ascii=False),
+                    depth=len(path),
+                    status="PENDING",
+                    attempts=0,
+                )
+            )
+            added += 1
+        self.session.commit()
+        return added
+
+    def _claimable(self, now: datetime):
+        return and_(
+            CrawlLease.attempts < self.max_attempts,
+            or_(
+                CrawlLease.status == "PENDING",
+                and_(CrawlLease.status == "LEASED", CrawlLease.lease_expires_at < now),
+            ),
+        )
+
+    def reap(self) -> int:
+        """재시도 한도를 넘긴 만료 임대를 FAILED 로 정리"""
+        now = datetime.now()
+        result = self.session.execute(
+            update(CrawlLease)
+            .where(CrawlLease.status == "LEASED")
+            .where(CrawlLease.lease_expires_at < now)
+            .where(CrawlLease.attempts >= self.max_attempts)
+            .values(status="FAILED", finished_at=now, error_message="임대 만료")
+        )
+        self.session.commit()
+        return result.rowcount
+
+    def claim(self) -> Optional[CrawlLease]:
+        """작업 하나를 임대한다. 다른 워커와 경합하면 다음 후보를 시도"""
+        self.reap()
+        now = datetime.now()
+        candidates = [
+            lease_id
+            for (lease_id,) in self.session.query(CrawlLease.id)
+            .filter(self._claimable(now))
+            .order_by(CrawlLease.id)
+            .limit(20)
+        ]
+        for lease_id in candidates:
+            result = self.session.execute(
+                update(CrawlLease)
+                .where(CrawlLease.id == lease_id)
+                .where(self._claimable(now))
+                .values(
+                    status="LEASED",
+                    owner=self.owner,
+                    lease_expires_at=now + timedelta(seconds=self.lease_seconds),
+                    heartbeat_at=now,
+                    attempts=CrawlLease.attempts + 1,
+                )
+            )
+            self.session.commit()
+            if result.rowcount == 1:
+                self._set_waiting(False)
+                return self.session.get(CrawlLease, lease_id)
+        self._set_waiting(True)
+        return None
+
+    def _set_waiting(self, waiting: bool):
+        """임대 시도 결과를 워커 상태에 남긴다 (놀고 있는 워커가 있어야 작업을 나눠 준다)"""
+        now = datetime.now()
+        worker = self.session.get(CrawlWorker, self.owner)
+        if worker is None:
+            worker = CrawlWorker(owner=self.owner)
+            self.session.add(worker)
+        if not waiting:
+            worker.waiting_since = None
+        elif worker.waiting_since is None:
+            worker.waiting_since = now
+        worker.seen_at = now
+        self.session.commit()
+
+    def has_waiting(self) -> bool:
+        """최근에 임대를 시도했다가 빈손으로 돌아간 다른 워커가 있는지"""
+        # 대기 중인 워커는 LEASE_POLL_SECONDS 마다 다시 시도하므로, 임대 시간보다 오래
+        # 소식이 없는 워커는 종료된 것으로 본다
+        cutoff = datetime.now() - timedelta(seconds=self.lease_seconds)
+        return (
+            self.session.query(CrawlWorker.owner)
+            .filter(CrawlWorker.owner != self.owner)
+            .filter(CrawlWorker.waiting_since.isnot(None))
+            .filter(CrawlWorker.seen_at >= cutoff)
+            .first()
+            is not None
+        )
+
+    def _update_own(self, lease: CrawlLease, **values) -> bool:
+        """내가 보유한 임대만 갱신 (만료 후 다른 워커가 가져갔으면 False)"""
+        result = self.session.execute(
+            update(CrawlLease)
+            .where(CrawlLease.id == lease.id)
+            .where(CrawlLease.owner == self.owner)
+            .where(CrawlLease.status == "LEASED")
+            .values(**values)
+        )
+        self.session.commit()
+        return result.rowcount == 1
+
+    def heartbeat(self, lease: CrawlLease) -> bool:
+        now = datetime.now()
+        return self._update_own(
+            lease,
+            heartbeat_at=now,
+            lease_expires_at=now + timedelta(seconds=self.lease_seconds),
+        )
+
+    def record_donation(self, lease: CrawlLease, paths: List[List[Dict]]) -> bool:
+        """임대 작업에서 떼어 다른 워커용으로 등록한 하위 경로를 기록한다
+
+        작업이 fail/release 로 풀에 돌아가도 다음 워커는 이 경로들을 건너뛰고 나머지만 크롤링한다.
+        """
+        keys = sorted(self.donated_keys(lease) | {path_key(path) for path in paths})
+        return self._update_own(
+            lease, donated_json=json.dumps(keys, ensure_ascii=False)
+        )
+
+    def donated_keys(self, lease: CrawlLease) -> Set[str]:
+        self.session.refresh(lease)
+        return set(json.loads(lease.donated_json)) if lease.donated_json else set()
+
+    def complete(self, lease: CrawlLease) -> bool:
+        return self._update_own(lease, status="DONE", finished_at=datetime.now())
+
+    def fail(self, lease: CrawlLease, error: str) -> bool:
+        """실패한 작업은 재시도 한도 전까지 풀로 돌려보낸다"""
+        self.session.refresh(lease)
+        retry = (lease.attempts or 0) < self.max_attempts
+        return self._update_own(
+            lease,
+            status="PENDING" if retry else "FAILED",
+            owner=None if retry else self.owner,
+            lease_expires_at=None,
+            finished_at=None if retry else datetime.now(),
+            error_message=error[:2000],
+        )
+
+    def release(self, lease: CrawlLease) -> bool:
+        """끝내지 못한 작업을 실패로 세지 않고 풀로 돌려보낸다 (임대 때 늘린 시도 횟수를 되돌린다)"""
+        return self._update_own(
+            lease,
+            status="PENDING",
+            owner=None,
+            lease_expires_at=None,
+            attempts=CrawlLease.attempts - 1,
+        )
+
+    def counts(self) -> Dict[str, int]:
+        rows = self.session.query(
+            CrawlLease.status, func.count(CrawlLease.id)
+        ).group_by(CrawlLease.status)
+        return {status: count for status, count in rows}
+
+    def has_active(self) -> bool:
+        """아직 끝나지 않은 작업(대기 또는 다른 워커가 임대 중)이 있는지"""
+        counts = self.counts()
+        return counts.get("PENDING", 0) + counts.get("LEASED", 0) > 0
+
+    @staticmethod
+    def path_of(lease: CrawlLease) -> List[Dict]:
+        return json.loads(lease.path_json)
+
+    def close(self):
+        try:
+            self.session.query(CrawlWorker).filter(
+                CrawlWorker.owner == self.owner
+            ).delete()
+            self.session.commit()
+        finally:
+            self.session.close()
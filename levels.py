@@ -0,0 +1,41 @@
+"""
+옵션 레벨 정의 - 크롤러의 레벨 순회는 이 목록만 보고 동작한다
+
+레벨을 추가/변경하거나 레벨별 동작(플레이스홀더 제외, 시세 미제공 건너뛰기)을 바꿀 때는
+크롤러 메서드를 고치지 않고 LEVELS 항목만 수정한다.
+"""
+
+from typing import Callable, Dict, List
+
+# (상위 경로, 옵션 목록) -> 방문할 옵션 목록
+LevelPolicy = Callable[[List[Dict], List[Dict]], List[Dict]]
+
+
+class LevelSpec:
+    def __init__(
+        self,
+        dep_class: str,
+        label: str,
+        skip_placeholder: bool = False,
+        skip_unpriced: bool = True,
+        leaf: bool = False,
+    ):
+        self.dep_class = dep_class
+        self.label = label  # 로그에 쓰는 이름 (제조사, 모델, ...)
+        self.skip_placeholder = skip_placeholder  # 첫 항목이 "제조사" 같은 안내 문구
+        self.skip_unpriced = skip_unpriced  # .rt 에 시세 미제공 표시된 옵션은 방문 안 함
+        self.leaf = leaf  # 가격을 읽는 마지막 레벨 (리프 선택 정책 적용)
+
+    def __repr__(self):
+        return f"<LevelSpec({self.dep_class} {self.label})>"
+
+
+LEVELS: List[LevelSpec] = [
+    LevelSpec("op_dep1", "제조사", skip_placeholder=True),
+    LevelSpec("op_dep2", "모델"),
+    LevelSpec("op_dep3", "세부모델"),
+    LevelSpec("op_dep4", "연식"),
+    LevelSpec("fuel", "연료", skip_unpriced=False),
+    LevelSpec("op_dep5", "등급"),
+    LevelSpec("op_dep6", "세부등급", leaf=True),
+]
@@ -0,0 +1,101 @@
+"""
+로깅 설정 - 크롤러 로그는 QueueHandler 로 넘기고 별도 스레드(QueueListener)가 출력한다
+
+핫 루프에서는 레코드를 큐에 넣기만 하므로 rich 렌더링/파일 쓰기 비용이 크롤링 루프에 걸리지 않는다.
+    rich - 콘솔에 RichHandler 로 출력 (기본)
+    json - 콘솔에 한 줄 JSON 으로 출력 (로그 수집기용)
+LOG_FILE 이 설정되어 있으면 형식과 관계없이 JSON 줄로 파일에도 남긴다.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+from datetime import datetime
+from typing import Optional
+
+from rich.logging import RichHandler
+
+import config
+
+LOG_FORMATS = ("rich", "json")
+
+# LogRecord 기본 속성 - 이 외의 속성은 extra 로 넘어온 구조화 필드로 본다
+_RECORD_ATTRS = set(logging.LogRecord("", 0, "", 0, "", None, None).__dict__) | {
+    "message",
+    "asctime",
+}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """레코드를 한 줄 JSON 으로 (ts, level, logger, msg + extra 필드)"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                data[key] = value
+        if record.exc_info:
+            data["exc"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+def setup_logging(
+    level: str = config.LOG_LEVEL,
+    log_format: str = "rich",
+    quiet: bool = False,
+    log_file: Optional[str] = config.LOG_FILE,
+):
+    """encar 로거에 큐 핸들러를 붙이고 출력 스레드를 시작 (여러 번 호출하면 다시 설정)
+
+    quiet 이면 경고 이상만 남겨, 핫 루프의 debug/info 호출은 레벨 검사만 하고 끝난다.
+    """
+    global _listener
+    if log_format not in LOG_FORMATS:
+        raise ValueError(f"잘못된 로그 형식: {log_format}")
+    shutdown_logging()
+
+    if log_format == "json":
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(JsonFormatter())
+    else:
+        console_handler = RichHandler(show_path=False, markup=False)
+    handlers = [console_handler]
+    if log_file:
+        file_handler = logging.FileHandler(log_file, encoding="utf-8")
+        file_handler.setFormatter(JsonFormatter())
+        handlers.append(file_handler)
+
+    log_queue = queue.SimpleQueue()
+    logger = logging.getLogger("encar")
+    logger.handlers = [logging.handlers.QueueHandler(log_queue)]
+    logger.setLevel(logging.WARNING if quiet else level.upper())
+    logger.propagate = False
+
+    _listener = logging.handlers.QueueListener(
+        log_queue, *handlers, respect_handler_level=True
+    )
+    _listener.start()
+
+
+def shutdown_logging():
+    """큐에 남은 레코드를 모두 출력하고 출력 스레드 종료"""
+    global _listener
+    if _listener:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
@@ -4,14 +4,42 @@
 
 import argparse
 import asyncio
+import time
+from datetime import date
+from typing import Optional
 
 from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
+from sqlalchemy import case, distinct, func, text
 
 import config
-from crawler import EncarCrawler
-from database import CarPrice, get_session, init_database
+from analytics import run_analytics
+from crawler import LEVEL_ORDER, EncarCrawler
+from database import (
+    COMPAT_VIEW,
+    CarPrice,
+    PriceAnalytics,
+    dedupe_car_prices,
+    get_session,
+    init_database,
+)
+from deeplink import DEEPLINK_MODES, known_leaves
+from export import EXPORT_FORMATS, export_prices
+from lease_queue import LeaseQueue
+from logging_setup import LOG_FORMATS, setup_logging
+from option_cache import OptionCache
+from price_diff import diff_runs, latest_runs, previous_run
+from sampling import SamplingPolicy
+from scheduler import parse_budget
+from sharding import SHARD_KEYS, CrawlFilter, parse_shard
+from storage import (
+    STORAGE_MODES,
+    backfill_history,
+    ensure_summary,
+    rebuild_summary,
+    summary_totals,
+)
 
 console = Console()
 
@@ -22,32 +50,53 @@ def setup_database():
         console.print("[cyan]데이터베이스 초기화 중...[/cyan]")
         init_database()
         console.print("[green]✓ 데이터베이스 초기화 완료[/green]")
-        return True
     except Exception as e:
         console.print(f"[red]✗ 데이터베이스 초기화 실패: {e}[/red]")
         console.print(
-            "[yellow]MySQL이 설치되어 있는지 확인하거나, database.py에서 SQLite로 전환하세요.[/yellow]"
+            "[yellow]MySQL이 실행 중인지 확인하거나, DB_BACKEND=sqlite 또는 DATABASE_URL 로 연결 대상을 바꾸세요.[/yellow]"
         )
         return False
 
+    # 요약 테이블 이전에 쌓인 car_prices 가 있으면 요약을 한 번 채운다
+    session = get_session(bulk_load=True)
+    try:
+        count = ensure_summary(session)
+        if count:
+            console.print(f"[green]✓ 기존 데이터로 요약 테이블 생성: {count}행[/green]")
+    except Exception as e:
+        console.print(f"[yellow]요약 테이블 생성 실패 (--rebuild-summary 로 재시도): {e}[/yellow]")
+    finally:
+        session.close()
+    return True
 
-def show_statistics():
-    """크롤링 통계 표시"""
+
+def show_statistics(storage_mode: str = config.STORAGE_MODE):
+    """크롤링 통계 표시 - crawl_summary 요약 행을 읽고, 요약이 없으면 car_prices 집계 쿼리 1회"""
     session = get_session()
 
     try:
-        total_count = session.query(CarPrice).count()
-        with_price = (
-            session.query(CarPrice).filter(CarPrice.is_price_available == True).count()
-        )
-        without_price = (
-            session.query(CarPrice).filter(CarPrice.is_price_available == False).count()
-        )
-
-        # 제조사별 통계
-        manufacturers = (
-            session.query(CarPrice.manufacturer, CarPrice.manufacturer).distinct().all()
-        )
+        started = time.perf_counter()
+        totals = summary_totals(session)
+        if totals:
+            source = f"요약 테이블 {totals['groups']:,}행"
+            total_count = totals["total"]
+            with_price = totals["available"]
+            without_price = totals["unavailable"]
+            manufacturer_count = totals["manufacturers"]
+        else:
+            source = "car_prices 집계 (요약 없음: --rebuild-summary)"
+            total_count, with_price, without_price, manufacturer_count = session.query(
+                func.count(CarPrice.id),
+                func.coalesce(
+                    func.sum(case((CarPrice.is_price_available == True, 1), else_=0)), 0
+                ),
+                func.coalesce(
+                    func.sum(case((CarPrice.is_price_available == False, 1), else_=0)),
+                    0,
+                ),
+                func.count(distinct(CarPrice.manufacturer)),
+            ).one()
+        elapsed = time.perf_counter() - started
 
         # 통계 테이블 생성
         table = Table(title="크롤링 데이터 통계")
@@ -57,14 +106,28 @@ def show_statistics():
         table.add_row("전체 데이터", str(total_count))
         table.add_row("시세 제공", str(with_price))
         table.add_row("시세 미제공", str(without_price))
-        table.add_row("제조사 수", str(len(manufacturers)))
+        table.add_row("제조사 수", str(manufacturer_count))
 
         console.print(table)
-
-        # 최근 크롤링 데이터 샘플
-        recent_data = (
-            session.query(CarPrice).order_by(CarPrice.crawled_at.desc()).limit(5).all()
-        )
+        console.print(f"[dim]{source}: {elapsed * 1000:,.1f}ms[/dim]")
+
+        # 최근 크롤링 데이터 샘플 (crawled_at 인덱스 사용, 정규화 저장은 호환 뷰에서)
+        started = time.perf_counter()
+        if storage_mode == "normalized":
+            recent_data = session.execute(
+                text(
+                    f"SELECT manufacturer, model, year, price FROM {COMPAT_VIEW} "
+                    "ORDER BY crawled_at DESC LIMIT 5"
+                )
+            ).all()
+        else:
+            recent_data = (
+                session.query(CarPrice)
+                .order_by(CarPrice.crawled_at.desc())
+                .limit(5)
+                .all()
+            )
+        elapsed = time.perf_counter() - started
 
         if recent_data:
             console.print("\n[bold cyan]최근 크롤링 데이터 (5개):[/bold cyan]")
@@ -73,6 +136,7 @@ def show_statistics():
                 console.print(
                     f"  • {car.manufacturer} {car.model} {car.year} - {price_text}"
                 )
+            console.print(f"[dim]최근 데이터 조회: {elapsed * 1000:,.1f}ms[/dim]")
 
     except Exception as e:
         console.print(f"[red]통계 조회 실패: {e}[/red]")
@@ -80,7 +144,234 @@ def show_statistics():
         session.close()
 
 
-async def run_crawler(test_mode: bool = False):
+def rebuild_crawl_summary():
+    """car_prices 전체로 crawl_summary 재계산 (SQLite 대량 적재 설정)"""
+    session = get_session(bulk_load=True)
+    try:
+        started = time.perf_counter()
+        count = rebuild_summary(session)
+        console.print(
+            f"[green]✓ 요약 테이블 재계산 완료: {count}행 ({time.perf_counter() - started:,.1f}초)[/green]"
+        )
+    finally:
+        session.close()
+
+
+def dedupe_prices():
+    """car_prices 를 조합/날짜별 한 행으로 정리하고 요약 테이블 재계산"""
+    session = get_session(bulk_load=True)
+    try:
+        started = time.perf_counter()
+        deleted, updated = dedupe_car_prices(session)
+        console.print(
+            f"[green]✓ 중복 정리 완료: {deleted}행 삭제, {updated}행 날짜 기록 ({time.perf_counter() - started:,.1f}초)[/green]"
+        )
+        if deleted:
+            rebuild_summary(session)
+            console.print("[green]✓ 요약 테이블 재계산 완료[/green]")
+    finally:
+        session.close()
+
+
+def rebuild_price_history():
+    """car_prices 스냅샷으로 price_history 재구성"""
+    session = get_session(bulk_load=True)
+    try:
+        started = time.perf_counter()
+        count = backfill_history(session)
+        console.print(
+            f"[green]✓ 시세 이력 재구성 완료: 구간 {count}개 ({time.perf_counter() - started:,.1f}초)[/green]"
+        )
+    finally:
+        session.close()
+
+
+def export_data(path: str, fmt: Optional[str], compress: Optional[bool], **filters):
+    """car_prices 를 파일로 내보내기 (스트리밍)"""
+    session = get_session()
+    try:
+        started = time.perf_counter()
+        count = export_prices(session, path, fmt, compress, **filters)
+        console.print(
+            f"[green]✓ 내보내기 완료: {count:,}행 → {path} ({time.perf_counter() - started:,.1f}초)[/green]"
+        )
+    except Exception as e:
+        console.print(f"[red]✗ 내보내기 실패: {e}[/red]")
+    finally:
+        session.close()
+
+
+def show_analytics(**filters):
+    """시세 분석 실행 후 요약과 전주 대비 변동이 큰 셀 표시"""
+    session = get_session(bulk_load=True)
+    try:
+        summary = run_analytics(session, **filters)
+        if not summary["cells"]:
+            console.print(f"[yellow]분석할 시세가 없습니다 ({summary['rows']:,}행)[/yellow]")
+            return
+        console.print(
+            f"[green]✓ 시세 분석 완료: {summary['rows']:,}행, 그룹 {summary['groups']:,}개, "
+            f"셀 {summary['cells']:,}개, 이상치 {summary['outliers']:,}행[/green]"
+        )
+        console.print(
+            f"[dim]읽기 {summary['load_seconds']:,.1f}초 / 계산 {summary['compute_seconds']:,.2f}초 / "
+            f"저장 {summary['save_seconds']:,.1f}초[/dim]"
+        )
+
+        movers = (
+            session.query(PriceAnalytics)
+            .filter(PriceAnalytics.week_over_week_pct.isnot(None))
+            .order_by(func.abs(PriceAnalytics.week_over_week_pct).desc())
+            .limit(10)
+            .all()
+        )
+        if movers:
+            table = Table(title="전주 대비 변동 (상위 10)")
+            table.add_column("모델/세부등급", style="cyan")
+            table.add_column("연식")
+            table.add_column("중앙값", style="magenta")
+            table.add_column("전주 대비")
+            table.add_column("연식 1년당 감가")
+            for row in movers:
+                depreciation = (
+                    f"{row.depreciation_per_year:,.0f}만원 ({row.depreciation_pct:.1f}%)"
+                    if row.depreciation_per_year is not None
+                    else "-"
+                )
+                table.add_row(
+                    f"{row.model} {row.detailed_grade}",
+                    str(row.year),
+                    f"{row.median_price:,.0f}만원",
+                    f"{row.week_over_week_pct:+.1f}%",
+                    depreciation,
+                )
+            console.print(table)
+    finally:
+        session.close()
+
+
+def show_price_diff(from_log_id: Optional[int] = None, to_log_id: Optional[int] = None):
+    """두 실행의 시세 변화를 계산해 종류별 수와 변동률 상위 조합 표시 (생략하면 최근 두 성공 실행)"""
+    session = get_session()
+    try:
+        if from_log_id is None:
+            runs = latest_runs(session)
+            if runs is None:
+                console.print("[yellow]비교할 성공 실행이 두 개 이상 없습니다.[/yellow]")
+                return
+            from_log_id, to_log_id = runs
+
+        started = time.perf_counter()
+        result = diff_runs(session, from_log_id, to_log_id)
+        elapsed = time.perf_counter() - started
+
+        table = Table(title=f"시세 변화 (실행 {from_log_id} → {to_log_id})")
+        table.add_column("변화", style="cyan")
+        table.add_column("조합 수", style="magenta")
+        for change, count in result["counts"].items():
+            table.add_row(change, f"{count:,}")
+        console.print(table)
+        console.print(f"[dim]비교 {elapsed:,.1f}초 (price_changes 에 저장)[/dim]")
+
+        if result["top_movers"]:
+            table = Table(title="변동률 상위 조합")
+            table.add_column("조합", style="cyan")
+            table.add_column("이전", style="magenta")
+            table.add_column("현재", style="magenta")
+            table.add_column("변화")
+            for row in result["top_movers"]:
+                color = "red" if row["delta"] > 0 else "green"
+                table.add_row(
+                    f"{row['manufacturer']} {row['model']} {row['year']} {row['detailed_grade']}",
+                    f"{row['old_price']:,.0f}만원",
+                    f"{row['new_price']:,.0f}만원",
+                    f"[{color}]{row['delta']:+,.0f}만원 ({row['delta_pct']:+.1f}%)[/{color}]",
+                )
+            console.print(table)
+    finally:
+        session.close()
+
+
+def manage_option_cache(action: str):
+    """옵션 트리 캐시 조회/삭제 (warm 은 브라우저가 필요해 run_crawler 에서 처리)"""
+    cache = OptionCache()
+    if action == "invalidate":
+        removed = cache.invalidate()
+        console.print(
+            "[green]✓ 옵션 캐시 삭제 완료[/green]"
+            if removed
+            else "[yellow]삭제할 옵션 캐시가 없습니다[/yellow]"
+        )
+        return
+
+    cache.load()
+    summary = cache.summary()
+    table = Table(title=f"옵션 트리 캐시 ({summary['path']})")
+    table.add_column("레벨", style="cyan")
+    table.add_column("상위 경로 수", style="magenta")
+    table.add_column("옵션 수", style="magenta")
+    for dep_class in LEVEL_ORDER:
+        level = summary["levels"].get(dep_class, {"entries": 0, "options": 0})
+        table.add_row(dep_class, str(level["entries"]), str(level["options"]))
+    console.print(table)
+
+    age = summary["oldest_age_seconds"]
+    console.print(f"파일 크기: {summary['size_bytes']:,} bytes")
+    console.print(
+        f"가장 오래된 항목: {age / 3600:.1f}시간 전 (TTL {config.OPTION_CACHE_TTL_HOURS}시간)"
+        if age is not None
+        else "캐시 항목 없음"
+    )
+
+
+def show_lease_status():
+    """분산 작업 임대 현황 표시"""
+    queue = LeaseQueue()
+    try:
+        counts = queue.counts()
+        table = Table(title="작업 임대 현황")
+        table.add_column("상태", style="cyan")
+        table.add_column("작업 수", style="magenta")
+        for status in ("PENDING", "LEASED", "DONE", "FAILED"):
+            table.add_row(status, str(counts.get(status, 0)))
+        console.print(table)
+    finally:
+        queue.close()
+
+
+def show_recheck_results(results):
+    """재확인한 리프의 저장 시세와 현재 시세 비교"""
+    table = Table(title="리프 시세 재확인")
+    table.add_column("조합", style="cyan")
+    table.add_column("저장 시세", style="magenta")
+    table.add_column("현재 시세", style="magenta")
+    table.add_column("이동 방식")
+    for result in results:
+        expected, price = result["expected"], result["price"]
+        current = f"{price:,.0f}만원" if price else "시세 미제공"
+        if result["mode"] is None:
+            current = "[red]이동 실패[/red]"
+        elif price != expected:
+            current = f"[yellow]{current}[/yellow]"
+        table.add_row(
+            result["label"],
+            f"{expected:,.0f}만원" if expected else "시세 미제공",
+            current,
+            result["mode"] or "-",
+        )
+    console.print(table)
+
+
+async def run_crawler(
+    test_mode: bool = False,
+    warm_cache: bool = False,
+    lease_mode: Optional[str] = None,
+    lease_depth: int = 1,
+    worker_id: Optional[str] = None,
+    recheck: int = 0,
+    deeplink_mode: str = "auto",
+    **crawler_options,
+):
     """크롤러 실행"""
     crawler = None
 
@@ -94,14 +385,50 @@ async def run_crawler(test_mode: bool = False):
             )
         )
 
-        crawler = EncarCrawler(headless=config.HEADLESS)
+        crawler = EncarCrawler(headless=config.HEADLESS, **crawler_options)
         await crawler.initialize()
 
-        if test_mode:
+        if lease_mode == "coordinator":
+            paths = await crawler.plan_lease_tasks(lease_depth)
+            queue = LeaseQueue()
+            try:
+                added = queue.seed(paths)
+                console.print(
+                    f"[green]작업 {len(paths)}개 중 {added}개 신규 등록[/green] {queue.counts()}"
+                )
+            finally:
+                queue.close()
+        elif lease_mode == "worker":
+            queue = LeaseQueue(owner=worker_id)
+            try:
+                await crawler.crawl_leased_tasks(queue)
+            finally:
+                queue.close()
+        elif recheck:
+            leaves = known_leaves(crawler.session, recheck, crawler.crawl_filter)
+            console.print(f"[yellow]저장된 리프 {len(leaves)}개를 다시 확인합니다.[/yellow]")
+            show_recheck_results(await crawler.recheck_leaves(leaves, deeplink_mode))
+        elif warm_cache:
+            console.print("[yellow]옵션 트리 캐시를 채웁니다.[/yellow]")
+            await crawler.warm_option_cache()
+        elif test_mode:
             console.print("[yellow]테스트 모드로 실행합니다.[/yellow]")
             await crawler.test_single_combination()
         else:
             await crawler.crawl_all_combinations()
+            crawl_log = crawler.crawling_log
+            # 필터/샘플링/증분 실행은 방문하지 않은 조합이 모두 삭제로 보이므로 자동 비교하지 않는다
+            # (비교는 car_prices 를 읽으므로 wide 저장 실행만)
+            if (
+                config.DIFF_AFTER_CRAWL
+                and crawl_log
+                and crawl_log.status == "SUCCESS"
+                and crawl_log.scope is None
+                and crawler.storage_mode == "wide"
+            ):
+                previous = previous_run(crawler.session, crawl_log)
+                if previous:
+                    show_price_diff(previous.id, crawl_log.id)
 
     except KeyboardInterrupt:
         console.print("\n[yellow]사용자에 의해 중단되었습니다.[/yellow]")
@@ -120,15 +447,244 @@ def main():
     parser = argparse.ArgumentParser(description="엔카 시세 크롤러")
     parser.add_argument("--test", action="store_true", help="테스트 모드 실행")
     parser.add_argument("--stats", action="store_true", help="크롤링 통계 표시")
+    parser.add_argument(
+        "--rebuild-summary",
+        action="store_true",
+        help="car_prices 로 실행별 제조사/모델 요약(crawl_summary) 재계산",
+    )
     parser.add_argument("--init-db", action="store_true", help="데이터베이스 초기화")
     parser.add_argument("--headless", action="store_true", help="Headless 모드로 실행")
+    parser.add_argument(
+        "--prioritize",
+        action="store_true",
+        help="오래됨/변동성/시세 제공 여부 점수 순으로 서브트리 방문",
+    )
+    parser.add_argument("--budget", help="크롤링 시간 예산 (예: 2h, 90m, 1h30m) - 우선순위 정렬 포함")
+
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="이전 옵션 트리와 비교해 신규/변경 노드만 방문",
+    )
+    parser.add_argument(
+        "--sample-unchanged",
+        type=float,
+        default=config.INCREMENTAL_SAMPLE_RATE,
+        help="증분 모드에서 변경 없는 노드를 재방문할 비율 (0~1)",
+    )
+
+    parser.add_argument(
+        "--cache",
+        choices=["inspect", "invalidate", "warm"],
+        help="옵션 트리 캐시 조회/삭제/채우기",
+    )
+    parser.add_argument(
+        "--option-cache",
+        action="store_true",
+        help="옵션 트리 캐시 사용 (기본: OPTION_CACHE_ENABLED, 증분 모드에서는 무시)",
+    )
+    parser.add_argument(
+        "--no-option-cache", action="store_true", help="옵션 트리 캐시 사용 안 함"
+    )
+
+    parser.add_argument(
+        "--sampling",
+        default=config.LEAF_SAMPLING,
+        help="세부등급 선택 정책: all, first:N, stratified:N, random:N[:SEED]",
+    )
+    parser.add_argument(
+        "--sampling-for",
+        action="append",
+        default=[],
+        metavar="제조사=정책",
+        help="제조사별 세부등급 선택 정책 (반복 지정 가능)",
+    )
+
+    parser.add_argument(
+        "--manufacturer",
+        action="append",
+        default=[],
+        help="크롤링할 제조사 (이름/코드, 반복 지정 가능)",
+    )
+    parser.add_argument(
+        "--model",
+        action="append",
+        default=[],
+        help="크롤링할 모델 (이름/코드, 반복 지정 가능)",
+    )
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        default=[],
+        help="제외할 제조사/모델 (이름/코드, 반복 지정 가능)",
+    )
+    parser.add_argument("--shard", help="샤드 지정 i/n (0 <= i < n)")
+    parser.add_argument(
+        "--shard-key",
+        choices=SHARD_KEYS,
+        default="manufacturer",
+        help="샤드 분할 기준 (제조사 코드 또는 제조사/모델 코드)",
+    )
+
+    lease_group = parser.add_mutually_exclusive_group()
+    lease_group.add_argument(
+        "--coordinator",
+        action="store_true",
+        help="제조사/모델 경로 작업을 공유 DB 임대 큐에 등록",
+    )
+    lease_group.add_argument("--worker", action="store_true", help="임대 큐에서 작업을 가져와 크롤링")
+    lease_group.add_argument("--lease-status", action="store_true", help="작업 임대 현황 표시")
+    parser.add_argument(
+        "--lease-depth",
+        type=int,
+        choices=[1, 2],
+        default=1,
+        help="작업 단위 (1=제조사, 2=제조사/모델)",
+    )
+    parser.add_argument("--worker-id", help="워커 ID (기본: 호스트명:PID)")
+
+    parser.add_argument(
+        "--parse-mode",
+        choices=["browser", "pool"],
+        default=config.PARSE_MODE,
+        help="옵션/가격 추출 방식 (pool=HTML 스냅샷을 프로세스 풀에서 파싱)",
+    )
+
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="두 번째 탭으로 세부등급을 번갈아 처리하고 다음 레벨이 렌더되는 즉시 진행",
+    )
+
+    parser.add_argument(
+        "--recheck",
+        type=int,
+        default=0,
+        metavar="N",
+        help="최근 저장된 리프 N개로 바로 이동해 시세 재확인 (--manufacturer/--model 적용)",
+    )
+    parser.add_argument(
+        "--deeplink",
+        choices=DEEPLINK_MODES,
+        default="auto",
+        help="재확인 시 경로 이동 방식 (auto=url→form→click)",
+    )
+
+    parser.add_argument(
+        "--storage",
+        choices=STORAGE_MODES,
+        default=config.STORAGE_MODE,
+        help="시세 저장 방식 (normalized=차원 테이블+팩트, 조회는 v_car_prices 뷰, history=바뀐 시세만 구간으로)",
+    )
+    parser.add_argument(
+        "--dedupe",
+        action="store_true",
+        help="car_prices 를 조합(options_hash)/날짜별 한 행으로 정리 (기존 데이터 마이그레이션)",
+    )
+    parser.add_argument("--export", metavar="PATH", help="car_prices 를 파일로 내보내기")
+    parser.add_argument(
+        "--export-format",
+        choices=EXPORT_FORMATS,
+        help="내보내기 형식 (생략하면 확장자로 판단, parquet 은 pyarrow 필요)",
+    )
+    parser.add_argument(
+        "--gzip",
+        action="store_true",
+        default=None,
+        help="gzip 압축 (생략하면 .gz 확장자일 때만)",
+    )
+    parser.add_argument(
+        "--since", type=date.fromisoformat, help="내보낼 시작 날짜 (YYYY-MM-DD)"
+    )
+    parser.add_argument(
+        "--until", type=date.fromisoformat, help="내보낼 마지막 날짜 (YYYY-MM-DD, 포함)"
+    )
+    parser.add_argument(
+        "--analytics",
+        action="store_true",
+        help="연식별 중앙값/감가/전주 대비 변화/이상치 계산 (--since/--until/--manufacturer 적용)",
+    )
+    parser.add_argument(
+        "--diff",
+        nargs="*",
+        type=int,
+        metavar="LOG_ID",
+        help="두 실행의 시세 변화 비교 (이전 ID, 현재 ID - 생략하면 최근 두 성공 실행)",
+    )
+    parser.add_argument(
+        "--backfill-history",
+        action="store_true",
+        help="car_prices 의 기존 데이터로 price_history 재구성",
+    )
+
+    parser.add_argument("--quiet", action="store_true", help="경고/오류만 출력 (크롤링 루프 로그 생략)")
+    parser.add_argument(
+        "--log-format",
+        choices=LOG_FORMATS,
+        default=config.LOG_FORMAT,
+        help="크롤러 로그 형식 (json=한 줄 JSON)",
+    )
+    parser.add_argument("--log-level", default=config.LOG_LEVEL, help="크롤러 로그 레벨")
 
     args = parser.parse_args()
+    setup_logging(args.log_level, args.log_format, quiet=args.quiet)
+
+    budget_seconds = None
+    if args.budget:
+        try:
+            budget_seconds = parse_budget(args.budget)
+        except ValueError as e:
+            parser.error(str(e))
+
+    try:
+        sampling = SamplingPolicy.from_assignments(
+            args.sampling, config.LEAF_SAMPLING_BY_MANUFACTURER + args.sampling_for
+        )
+    except ValueError as e:
+        parser.error(str(e))
+
+    crawl_filter = None
+    if args.manufacturer or args.model or args.exclude or args.shard:
+        try:
+            crawl_filter = CrawlFilter(
+                manufacturers=args.manufacturer,
+                models=args.model,
+                exclude=args.exclude,
+                shard=parse_shard(args.shard) if args.shard else None,
+                shard_key=args.shard_key,
+            )
+        except ValueError as e:
+            parser.error(str(e))
+
+    # car_prices 를 직접 읽는 기능은 아직 wide 저장 방식에서만 동작한다
+    if args.storage != "wide":
+        wide_only = [
+            flag
+            for flag, used in (
+                ("--prioritize", args.prioritize),
+                ("--budget", args.budget),
+                ("--diff", args.diff is not None),
+                ("--export", args.export),
+                ("--analytics", args.analytics),
+                ("--recheck", args.recheck),
+            )
+            if used
+        ]
+        if wide_only:
+            parser.error(
+                f"--storage {args.storage} 에서는 {', '.join(wide_only)} 를 쓸 수 없습니다 "
+                "(car_prices 를 읽는 기능 - wide 저장 방식에서만 지원)"
+            )
 
     # Headless 모드 설정
     if args.headless:
         config.HEADLESS = True
 
+    # 옵션 트리 캐시 관리
+    if args.cache in ("inspect", "invalidate"):
+        manage_option_cache(args.cache)
+        return
+
     # 데이터베이스 초기화
     if args.init_db:
         setup_database()
@@ -136,7 +692,52 @@ def main():
 
     # 통계 표시
     if args.stats:
-        show_statistics()
+        show_statistics(args.storage)
+        return
+
+    if args.lease_status:
+        show_lease_status()
+        return
+
+    if args.rebuild_summary:
+        if setup_database():
+            rebuild_crawl_summary()
+        return
+
+    if args.export:
+        if setup_database():
+            export_data(
+                args.export,
+                args.export_format,
+                args.gzip,
+                since=args.since,
+                until=args.until,
+                manufacturers=args.manufacturer,
+            )
+        return
+
+    if args.diff is not None:
+        if len(args.diff) not in (0, 2):
+            parser.error("--diff 는 실행 ID 두 개를 주거나 생략합니다")
+        if setup_database():
+            show_price_diff(*args.diff)
+        return
+
+    if args.analytics:
+        if setup_database():
+            show_analytics(
+                since=args.since, until=args.until, manufacturers=args.manufacturer
+            )
+        return
+
+    if args.dedupe:
+        if setup_database():
+            dedupe_prices()
+        return
+
+    if args.backfill_history:
+        if setup_database():
+            rebuild_price_history()
         return
 
     # 데이터베이스 확인
@@ -144,8 +745,35 @@ def main():
         console.print("[red]데이터베이스 설정을 확인하세요.[/red]")
         return
 
+    lease_mode = None
+    if args.coordinator:
+        lease_mode = "coordinator"
+    elif args.worker:
+        lease_mode = "worker"
+
     # 크롤러 실행
-    asyncio.run(run_crawler(test_mode=args.test))
+    asyncio.run(
+        run_crawler(
+            test_mode=args.test,
+            warm_cache=args.cache == "warm",
+            lease_mode=lease_mode,
+            lease_depth=args.lease_depth,
+            worker_id=args.worker_id,
+            recheck=args.recheck,
+            deeplink_mode=args.deeplink,
+            prioritize=args.prioritize,
+            budget_seconds=budget_seconds,
+            incremental=args.incremental,
+            sample_unchanged=args.sample_unchanged,
+            use_option_cache=(config.OPTION_CACHE_ENABLED or args.option_cache)
+            and not args.no_option_cache,
+            sampling=sampling,
+            crawl_filter=crawl_filter,
+            parse_mode=args.parse_mode,
+            pipeline=args.pipeline,
+            storage_mode=args.storage,
+        )
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,135 @@
+"""
+옵션 트리 스냅샷 캐시 - 드롭다운을 열지 않고 옵션 목록을 재사용한다
+
+제조사 → … → 세부등급 옵션(code/value/text/price_text)을 상위 경로별로 묶어
+zlib 압축 pickle 파일 하나에 저장한다. 항목마다 저장 시각을 두고 TTL 이 지나면 무시한다.
+"""
+
+import os
+import pickle
+import time
+import zlib
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import config
+from option_tree import path_key
+
+CACHE_VERSION = 1
+_FIELDS = ("code", "value", "text", "price_text")
+
+
+class OptionCache:
+    """(dep_class, 상위 경로 키) → 옵션 목록 캐시"""
+
+    def __init__(
+        self,
+        path: str = config.OPTION_CACHE_PATH,
+        ttl_seconds: float = config.OPTION_CACHE_TTL_HOURS * 3600,
+    ):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        # (dep_class, parent_key) → (저장 시각, ((code, value, text, price_text), ...))
+        self.entries: Dict[Tuple[str, str], Tuple[float, tuple]] = {}
+        self.refresh = False  # True 면 조회는 항상 miss, 저장만 한다 (warm 용)
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+
+    def load(self) -> int:
+        """캐시 파일을 읽는다. 버전이 다르거나 손상되었으면 빈 캐시로 시작"""
+        self.entries = {}
+        if not os.path.exists(self.path):
+            return 0
+        try:
+            with open(self.path, "rb") as f:
+                payload = pickle.loads(zlib.decompress(f.read()))
+            if payload.get("version") == CACHE_VERSION:
+                self.entries = payload["entries"]
+        except Exception:
+            self.entries = {}
+        self._drop_expired()
+        return len(self.entries)
+
+    def save(self) -> bool:
+        """변경이 있을 때만 임시 파일에 쓴 뒤 교체한다"""
+        if not self._dirty:
+            return False
+        self._drop_expired()
+        payload = {"version": CACHE_VERSION, "entries": self.entries}
+        data = zlib.compress(pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL))
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+        return True
+
+    def invalidate(self) -> bool:
+        """캐시 파일과 메모리 항목을 모두 삭제"""
+        self.entries = {}
+        self._dirty = False
+        if os.path.exists(self.path):
+            os.remove(self.path)
+            return True
+        return False
+
+    def _expired(self, stored_at: float) -> bool:
+        return self.ttl_seconds > 0 and time.time() - stored_at > self.ttl_seconds
+
+    def _drop_expired(self):
+        for key in [k for k, (ts, _) in self.entries.items() if self._expired(ts)]:
+            del self.entries[key]
+
+    def get(self, dep_class: str, parent_path: List[Dict]) -> Optional[List[Dict]]:
+        """캐시된 옵션 목록 (없거나 만료되면 None)"""
+        entry = (
+            None
+            if self.refresh
+            else self.entries.get((dep_class, path_key(parent_path)))
+        )
+        if entry is None or self._expired(entry[0]):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return [dict(zip(_FIELDS, option)) for option in entry[1]]
+
+    def put(self, dep_class: str, parent_path: List[Dict], options: List[Dict]):
+        if not options:
+            return
+        self.entries[(dep_class, path_key(parent_path))] = (
+            time.time(),
+            tuple(tuple(opt.get(f, "") or "" for f in _FIELDS) for opt in options),
+        )
+        self._dirty = True
+
+    def walk(
+        self, levels: List[str], parent_path: Optional[List[Dict]] = None
+    ) -> Iterator[List[Dict]]:
+        """캐시만으로 리프 경로를 순회 (브라우저 없이 작업 계획용)"""
+        parent_path = parent_path or []
+        depth = len(parent_path)
+        if depth >= len(levels):
+            yield parent_path
+            return
+        children = self.get(levels[depth], parent_path)
+        for option in children or []:
+            yield from self.walk(levels, parent_path + [option])
+
+    def summary(self) -> Dict:
+        """dep_class 별 항목/옵션 수와 파일 정보"""
+        by_level: Dict[str, Dict[str, int]] = {}
+        oldest = None
+        for (dep_class, _), (stored_at, options) in self.entries.items():
+            level = by_level.setdefault(dep_class, {"entries": 0, "options": 0})
+            level["entries"] += 1
+            level["options"] += len(options)
+            oldest = stored_at if oldest is None else min(oldest, stored_at)
+        return {
+            "path": self.path,
+            "size_bytes": os.path.getsize(self.path)
+            if os.path.exists(self.path)
+            else 0,
+            "entries": len(self.entries),
+            "oldest_age_seconds": time.time() - oldest if oldest else None,
+            "levels": by_level,
+        }
@@ -0,0 +1,146 @@
+"""
+옵션 트리 스냅샷 기록 및 이전 실행과의 비교 (증분 크롤링)
+"""
+
+import random
+from typing import Dict, List, Optional
+
+from sqlalchemy import func
+
+from database import OptionTreeNode
+
+
+def node_key(option: Dict) -> str:
+    """옵션 식별 키 - value, code, text 순으로 사용"""
+    return option.get("value") or option.get("code") or option.get("text", "")
+
+
+def path_key(path: List[Dict]) -> str:
+    """상위 경로를 하나의 문자열 키로 만든다"""
+    return "/".join(node_key(item) for item in path)
+
+
+class OptionTreeRecorder:
+    """실행 중 열거한 옵션 목록을 모아 두었다가 한 번에 저장한다"""
+
+    def __init__(self, session, crawl_log_id: Optional[int]):
+        self.session = session
+        self.crawl_log_id = crawl_log_id
+        self.rows: List[Dict] = []
+
+    def record(self, dep_class: str, parent_path: List[Dict], options: List[Dict]):
+        parent = path_key(parent_path)
+        for option in options:
+            self.rows.append(
+                {
+                    "crawl_log_id": self.crawl_log_id,
+                    "level": len(parent_path),
+                    "dep_class": dep_class,
+                    "parent_key": parent,
+                    "code": option.get("code", ""),
+                    "value": option.get("value", ""),
+                    "text": option.get("text", ""),
+                    "price_text": option.get("price_text", ""),
+                }
+            )
+
+    def flush(self) -> int:
+        """버퍼의 노드를 일괄 저장"""
+        count = len(self.rows)
+        if self.rows:
+            self.session.bulk_insert_mappings(OptionTreeNode, self.rows)
+            self.session.commit()
+            self.rows = []
+        return count
+
+
+class OptionTreeDiff:
+    """이전 실행들의 옵션 트리와 현재 옵션 목록을 비교해 내려갈 노드를 고른다.
+
+    상위 경로마다 가장 최근에 기록된 스냅샷을 기준으로 삼으므로,
+    이전 실행에서 건너뛴 서브트리도 그 이전 기록과 비교된다.
+    """
+
+    def __init__(
+        self,
+        session,
+        sample_rate: float = 0.0,
+        seed: Optional[int] = None,
+        exclude_crawl_log_id: Optional[int] = None,
+    ):
+        self.session = session
+        self.sample_rate = sample_rate
+        self.random = random.Random(seed)
+        self.exclude_crawl_log_id = exclude_crawl_log_id
+        # parent_key → {node_key: (text, price_text)}
+        self.baseline: Dict[str, Dict[str, tuple]] = {}
+        self.stats = {
+            "new": 0,
+            "changed": 0,
+            "removed": 0,
+            "unchanged": 0,
+            "sampled": 0,
+        }
+
+    def load(self) -> int:
+        """상위 경로별 최신 스냅샷을 메모리로 읽어온다"""
+        latest = self.session.query(
+            OptionTreeNode.parent_key,
+            func.max(OptionTreeNode.crawl_log_id).label("crawl_log_id"),
+        )
+        if self.exclude_crawl_log_id is not None:
+            latest = latest.filter(
+                OptionTreeNode.crawl_log_id != self.exclude_crawl_log_id
+            )
+        latest = latest.group_by(OptionTreeNode.parent_key).subquery()
+
+        query = (
+            self.session.query(
+                OptionTreeNode.parent_key,
+                OptionTreeNode.code,
+                OptionTreeNode.value,
+                OptionTreeNode.text,
+                OptionTreeNode.price_text,
+            )
+            .join(
+                latest,
+                (OptionTreeNode.parent_key == latest.c.parent_key)
+                & (OptionTreeNode.crawl_log_id == latest.c.crawl_log_id),
+            )
+            .yield_per(5000)
+        )
+        count = 0
+        for parent, code, value, text, price_text in query:
+            key = node_key({"code": code, "value": value, "text": text})
+            self.baseline.setdefault(parent, {})[key] = (text or "", price_text or "")
+            count += 1
+        return count
+
+    def select(self, parent_path: List[Dict], options: List[Dict]) -> List[Dict]:
+        """신규/변경 노드와 미변경 노드 일부(샘플)만 반환한다"""
+        previous = self.baseline.get(path_key(parent_path))
+        if previous is None:
+            # 처음 보는 서브트리는 전부 내려간다
+            self.stats["new"] += len(options)
+            return options
+
+        current_keys = set()
+        selected = []
+        for option in options:
+            key = node_key(option)
+            current_keys.add(key)
+            before = previous.get(key)
+            if before is None:
+                self.stats["new"] += 1
+                selected.append(option)
+            elif before != (option.get("text", ""), option.get("price_text", "")):
+                self.stats["changed"] += 1
+                selected.append(option)
+            else:
+                self.stats["unchanged"] += 1
+                if self.sample_rate > 0 and self.random.random() < self.sample_rate:
+                    self.stats["sampled"] += 1
+                    selected.append(option)
+
+        self.stats["removed"] += len(set(previous) - current_keys)
+        return selected
@@ -0,0 +1,207 @@
+"""
+실행 간 시세 비교 - 두 CrawlingLog 실행의 car_prices 를 options_hash 순으로 동시에 읽어 정렬 병합한다
+
+행마다 조회하지 않고 두 실행을 (crawl_log_id, options_hash) 인덱스 순서로 한 번씩 스트리밍하므로
+메모리는 저장 배치와 상위 변동 목록만큼만 쓴다. 결과는 price_changes 에 실행 쌍 단위로 다시 쓴다.
+    new         - 이번 실행에만 있는 조합
+    removed     - 이전 실행에만 있는 조합
+    up / down   - 두 실행 모두 시세가 있고 가격이 오르거나 내린 조합
+    unavailable - 이전에는 시세가 있었는데 이번에는 미제공
+    available   - 이전에는 미제공이었는데 이번에는 시세 제공
+같은 날 다시 크롤링하면 car_prices 행이 upsert 로 새 실행에 넘어가므로, 비교는 날짜가 다른 실행끼리,
+그리고 범위(샤드, 필터/샘플링/증분)가 같은 실행끼리 한다.
+"""
+
+import heapq
+import itertools
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import insert, select
+
+import config
+from database import CarPrice, CrawlingLog, PriceChange
+
+CHANGE_TYPES = ("new", "removed", "up", "down", "unavailable", "available")
+
+_COLUMNS = (
+    CarPrice.options_hash,
+    CarPrice.price,
+    CarPrice.is_price_available,
+    CarPrice.manufacturer,
+    CarPrice.model,
+    CarPrice.detailed_model,
+    CarPrice.year,
+    CarPrice.detailed_grade,
+)
+
+
+def _same(column, value):
+    return column.is_(None) if value is None else column == value
+
+
+def previous_run(session, crawl_log: CrawlingLog) -> Optional[CrawlingLog]:
+    """crawl_log 보다 앞선 날짜의, 같은 범위(shard/scope)의 마지막 성공 실행
+
+    같은 날 실행은 upsert 로 행이 crawl_log 쪽으로 넘어와 있어 모두 신규로 보이므로 제외한다.
+    """
+    day_start = datetime.combine(crawl_log.started_at.date(), datetime.min.time())
+    return (
+        session.query(CrawlingLog)
+        .filter(
+            CrawlingLog.id < crawl_log.id,
+            CrawlingLog.status == "SUCCESS",
+            CrawlingLog.started_at < day_start,
+            _same(CrawlingLog.shard, crawl_log.shard),
+            _same(CrawlingLog.scope, crawl_log.scope),
+        )
+        .order_by(CrawlingLog.id.desc())
+        .first()
+    )
+
+
+def latest_runs(session) -> Optional[Tuple[int, int]]:
+    """마지막 성공 실행과 그 이전 실행의 ID (비교할 실행이 없으면 None)"""
+    latest = (
+        session.query(CrawlingLog)
+        .filter(CrawlingLog.status == "SUCCESS")
+        .order_by(CrawlingLog.id.desc())
+        .first()
+    )
+    previous = previous_run(session, latest) if latest else None
+    return (previous.id, latest.id) if previous else None
+
+
+def _stream(connection, crawl_log_id: int, batch_size: int) -> Iterator:
+    """실행 하나의 행을 options_hash 순으로 (같은 조합이 여러 행이면 마지막 행만)
+
+    options_hash 는 md5 16진수 문자열이라 DB 정렬 순서와 파이썬 문자열 비교 순서가 같다.
+    """
+    query = (
+        select(*_COLUMNS)
+        .where(CarPrice.crawl_log_id == crawl_log_id, CarPrice.options_hash.isnot(None))
+        .order_by(CarPrice.options_hash, CarPrice.crawled_at, CarPrice.id)
+        .execution_options(yield_per=batch_size)
+    )
+    previous = None
+    for row in connection.execute(query):
+        if previous is not None and previous.options_hash != row.options_hash:
+            yield previous
+        previous = row
+    if previous is not None:
+        yield previous
+
+
+def _merge(old_rows: Iterator, new_rows: Iterator) -> Iterator[Tuple]:
+    """정렬된 두 스트림을 options_hash 로 맞춰 (이전 행, 현재 행) 쌍으로 (없는 쪽은 None)"""
+    old = next(old_rows, None)
+    new = next(new_rows, None)
+    while old is not None or new is not None:
+        if new is None or (old is not None and old.options_hash < new.options_hash):
+            yield old, None
+            old = next(old_rows, None)
+        elif old is None or new.options_hash < old.options_hash:
+            yield None, new
+            new = next(new_rows, None)
+        else:
+            yield old, new
+            old = next(old_rows, None)
+            new = next(new_rows, None)
+
+
+def _price(row) -> Optional[float]:
+    return row.price if row is not None and row.is_price_available else None
+
+
+def classify(old, new) -> Optional[str]:
+    """변화 종류 (변화가 없으면 None)"""
+    if old is None:
+        return "new"
+    if new is None:
+        return "removed"
+    old_price, new_price = _price(old), _price(new)
+    if old_price is None and new_price is None:
+        return None
+    if new_price is None:
+        return "unavailable"
+    if old_price is None:
+        return "available"
+    if new_price > old_price:
+        return "up"
+    if new_price < old_price:
+        return "down"
+    return None
+
+
+def diff_runs(
+    session,
+    from_log_id: int,
+    to_log_id: int,
+    top: int = 10,
+    batch_size: int = config.WRITE_BATCH_SIZE,
+) -> Dict:
+    """두 실행을 비교해 price_changes 를 다시 쓰고 변화 종류별 수와 변동률 상위 목록 반환"""
+    session.query(PriceChange).filter(
+        PriceChange.from_log_id == from_log_id, PriceChange.to_log_id == to_log_id
+    ).delete(synchronize_session=False)
+    session.commit()
+
+    counts = Counter()
+    movers: List[Tuple[float, int, Dict]] = []  # |변화율| 최소 힙
+    sequence = itertools.count()
+    pending: List[Dict] = []
+    engine = session.get_bind()
+    # 읽기 스트림마다 연결을 따로 쓴다 (MySQL 서버 측 커서는 연결당 하나)
+    with engine.connect() as old_conn, engine.connect() as new_conn:
+        pairs = _merge(
+            _stream(old_conn, from_log_id, batch_size),
+            _stream(new_conn, to_log_id, batch_size),
+        )
+        for old, new in pairs:
+            change = classify(old, new)
+            if change is None:
+                counts["unchanged"] += 1
+                continue
+            counts[change] += 1
+            row = new if new is not None else old
+            old_price, new_price = _price(old), _price(new)
+            record = {
+                "from_log_id": from_log_id,
+                "to_log_id": to_log_id,
+                "options_hash": row.options_hash,
+                "change": change,
+                "manufacturer": row.manufacturer,
+                "model": row.model,
+                "detailed_model": row.detailed_model,
+                "year": row.year,
+                "detailed_grade": row.detailed_grade,
+                "old_price": old_price,
+                "new_price": new_price,
+                "delta": None,
+                "delta_pct": None,
+            }
+            if change in ("up", "down"):
+                record["delta"] = new_price - old_price
+                if old_price:
+                    record["delta_pct"] = record["delta"] / old_price * 100
+                    item = (abs(record["delta_pct"]), next(sequence), record)
+                    if len(movers) < top:
+                        heapq.heappush(movers, item)
+                    elif top:
+                        heapq.heappushpop(movers, item)
+            pending.append(record)
+            if len(pending) >= batch_size:
+                session.connection().execute(insert(PriceChange), pending)
+                session.commit()
+                pending = []
+    if pending:
+        session.connection().execute(insert(PriceChange), pending)
+        session.commit()
+
+    return {
+        "from_log_id": from_log_id,
+        "to_log_id": to_log_id,
+        "counts": {name: counts[name] for name in CHANGE_TYPES + ("unchanged",)},
+        "top_movers": [item[2] for item in sorted(movers, reverse=True)],
+    }
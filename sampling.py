@@ -0,0 +1,165 @@
+"""
+세부등급(op_dep6) 리프 선택 정책
+
+정책 문자열 형식:
+    all              - 전부
+    first:N          - 페이지 순서 앞에서 N개
+    stratified:N     - .rt 시세 구간을 N개로 나눠 구간마다 1개
+    random:N[:SEED]  - 시드 고정 무작위 N개 (같은 경로면 실행마다 같은 결과)
+"""
+
+import random
+import re
+from typing import Dict, List, Optional
+
+import config
+from option_tree import path_key
+
+_PRICE_PATTERN = re.compile(r"([0-9][0-9,]*)")
+
+
+def parse_price_text(price_text: str) -> Optional[float]:
+    """'1,234만원', '212 ~ 1,298만원' 같은 .rt 텍스트에서 첫 금액을 추출"""
+    match = _PRICE_PATTERN.search(price_text or "")
+    if not match:
+        return None
+    try:
+        return float(match.group(1).replace(",", ""))
+    except ValueError:
+        return None
+
+
+class LeafSampler:
+    """리프 선택 정책 기본 클래스 - 선택 결과는 항상 페이지 순서를 유지한다"""
+
+    spec = "all"
+
+    def select(self, options: List[Dict], parent_path: List[Dict]) -> List[Dict]:
+        return options
+
+
+class FirstNSampler(LeafSampler):
+    def __init__(self, n: int):
+        self.n = n
+        self.spec = f"first:{n}"
+
+    def select(self, options: List[Dict], parent_path: List[Dict]) -> List[Dict]:
+        return options[: self.n]
+
+
+class PriceBandSampler(LeafSampler):
+    """시세 텍스트 기준 분위 구간마다 중앙값에 가까운 리프 1개씩 선택"""
+
+    def __init__(self, bands: int):
+        self.bands = bands
+        self.spec = f"stratified:{bands}"
+
+    def select(self, options: List[Dict], parent_path: List[Dict]) -> List[Dict]:
+        if len(options) <= self.bands:
+            return options
+        priced = []
+        unpriced = []
+        for index, option in enumerate(options):
+            price = parse_price_text(option.get("price_text", ""))
+            if price is None:
+                unpriced.append(index)
+            else:
+                priced.append((price, index))
+        priced.sort()
+
+        chosen = set()
+        band_count = min(self.bands, len(priced))
+        for band in range(band_count):
+            start = band * len(priced) // band_count
+            end = (band + 1) * len(priced) // band_count
+            chosen.add(priced[(start + end - 1) // 2][1])
+        # 시세 구간이 정책 수보다 적으면 시세 텍스트가 없는 리프로 남은 자리를 채운다
+        for index in unpriced:
+            if len(chosen) >= self.bands:
+                break
+            chosen.add(index)
+        return [options[i] for i in sorted(chosen)]
+
+
+class RandomSampler(LeafSampler):
+    def __init__(self, n: int, seed: int = 0):
+        self.n = n
+        self.seed = seed
+        self.spec = f"random:{n}:{seed}"
+
+    def select(self, options: List[Dict], parent_path: List[Dict]) -> List[Dict]:
+        if len(options) <= self.n:
+            return options
+        rng = random.Random(f"{self.seed}:{path_key(parent_path)}")
+        chosen = sorted(rng.sample(range(len(options)), self.n))
+        return [options[i] for i in chosen]
+
+
+def parse_sampler(spec: str) -> LeafSampler:
+    """정책 문자열을 LeafSampler 로 변환"""
+    parts = (spec or "").strip().lower().split(":")
+    name, args = parts[0], parts[1:]
+    if name in ("first", "stratified", "random") and args:
+        try:
+            count = int(args[0])
+        except ValueError:
+            count = None
+        if count is not None and count < 1:
+            raise ValueError(f"잘못된 샘플링 정책: {spec} (N 은 1 이상)")
+    try:
+        if name == "all" and not args:
+            return LeafSampler()
+        if name == "first" and len(args) == 1:
+            return FirstNSampler(int(args[0]))
+        if name == "stratified" and len(args) == 1:
+            return PriceBandSampler(int(args[0]))
+        if name == "random" and len(args) in (1, 2):
+            return RandomSampler(int(args[0]), int(args[1]) if len(args) == 2 else 0)
+    except ValueError:
+        pass
+    raise ValueError(f"잘못된 샘플링 정책: {spec}")
+
+
+class SamplingPolicy:
+    """실행 기본 정책 + 제조사별 정책"""
+
+    def __init__(
+        self,
+        default: str = config.LEAF_SAMPLING,
+        by_manufacturer: Optional[Dict[str, str]] = None,
+    ):
+        self.default = parse_sampler(default)
+        self.by_manufacturer = {
+            name: parse_sampler(spec) for name, spec in (by_manufacturer or {}).items()
+        }
+
+    @classmethod
+    def from_assignments(cls, default: str, assignments: List[str]) -> "SamplingPolicy":
+        """'현대=all' 형식 목록(config + CLI)으로 정책 생성 - 뒤의 값이 우선"""
+        by_manufacturer = {}
+        for item in assignments:
+            name, sep, spec = item.partition("=")
+            if not sep or not name.strip():
+                raise ValueError(f"잘못된 제조사별 샘플링 지정: {item}")
+            by_manufacturer[name.strip()] = spec.strip()
+        return cls(default, by_manufacturer)
+
+    def for_path(self, path: List[Dict]) -> LeafSampler:
+        """경로의 제조사(text/value/code 중 하나 일치)에 맞는 정책"""
+        if path and self.by_manufacturer:
+            manufacturer = path[0]
+            for key in ("text", "value", "code"):
+                sampler = self.by_manufacturer.get(manufacturer.get(key, ""))
+                if sampler:
+                    return sampler
+        return self.default
+
+    def describe(self) -> Optional[str]:
+        """모든 리프를 방문하는 정책이면 None, 아니면 'first:2;현대=all' 형식 문자열"""
+        samplers = {"": self.default, **self.by_manufacturer}
+        if all(sampler.spec == "all" for sampler in samplers.values()):
+            return None
+        return ";".join(
+            f"{name}={sampler.spec}" if name else sampler.spec
+            for name, sampler in samplers.items()
+        )
@@ -0,0 +1,147 @@
+"""
+크롤링 프론티어 스케줄러 - 서브트리 우선순위 및 시간 예산 관리
+"""
+
+import re
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import config
+from database import CarPrice
+
+# 옵션 경로의 코드 컬럼 (op_dep1 → op_dep6 순서)
+CODE_COLUMNS = (
+    CarPrice.manufacturer_code,
+    CarPrice.model_code,
+    CarPrice.detailed_model_code,
+    CarPrice.year_code,
+    CarPrice.fuel_code,
+    CarPrice.grade_code,
+    CarPrice.detailed_grade_code,
+)
+
+_BUDGET_UNITS = {"h": 3600, "m": 60, "s": 1, "": 1}
+_BUDGET_PATTERN = re.compile(r"(\d+(?:\.\d+)?)([hms]?)")
+
+
+def parse_budget(text: str) -> float:
+    """'2h', '90m', '1h30m', '3600' 형식의 시간 예산을 초 단위로 변환"""
+    value = (text or "").strip().lower().replace(" ", "")
+    if not value or _BUDGET_PATTERN.sub("", value):
+        raise ValueError(f"잘못된 시간 예산 형식: {text}")
+    return sum(
+        float(num) * _BUDGET_UNITS[unit] for num, unit in _BUDGET_PATTERN.findall(value)
+    )
+
+
+class CrawlBudget:
+    """시간 예산 - 만료되면 남은 서브트리 방문을 중단한다"""
+
+    def __init__(self, seconds: Optional[float] = None):
+        self.seconds = seconds
+        self.started = time.monotonic()
+
+    @property
+    def remaining(self) -> Optional[float]:
+        if self.seconds is None:
+            return None
+        return self.seconds - (time.monotonic() - self.started)
+
+    def exhausted(self) -> bool:
+        remaining = self.remaining
+        return remaining is not None and remaining <= 0
+
+
+class FrontierScheduler:
+    """저장된 크롤링 이력으로 서브트리 점수를 계산해 방문 순서를 정한다.
+
+    점수 = 오래됨(crawled_at) + 가격 변동성 + 직전 시세 제공 여부 의 가중합
+    """
+
+    def __init__(self, session, now: Optional[datetime] = None):
+        self.session = session
+        self.now = now or datetime.now()
+        # 코드 prefix 튜플 → 집계값
+        self.stats: Dict[Tuple[str, ...], Dict] = {}
+
+    def load(self) -> int:
+        """car_prices 를 한 번 스트리밍하여 리프/서브트리 통계를 만든다"""
+        leaves: Dict[str, Dict] = {}
+        query = (
+            self.session.query(
+                CarPrice.options_hash,
+                CarPrice.crawled_at,
+                CarPrice.price,
+                CarPrice.is_price_available,
+                *CODE_COLUMNS,
+            )
+            .order_by(CarPrice.crawled_at)
+            .yield_per(5000)
+        )
+        for row in query:
+            options_hash, crawled_at, price, available = row[:4]
+            leaf = leaves.setdefault(
+                options_hash,
+                {"codes": tuple(c or "" for c in row[4:]), "n": 0, "s": 0.0, "ss": 0.0},
+            )
+            # 시간순 정렬이므로 마지막 값이 최신 상태다
+            leaf["last_crawled"] = crawled_at
+            leaf["available"] = bool(available)
+            if price:
+                leaf["n"] += 1
+                leaf["s"] += price
+                leaf["ss"] += price * price
+
+        self.stats = {}
+        for leaf in leaves.values():
+            volatility = self._coefficient_of_variation(leaf)
+            codes = leaf["codes"]
+            for depth in range(1, len(codes) + 1):
+                agg = self.stats.setdefault(
+                    codes[:depth],
+                    {"oldest": leaf["last_crawled"], "vol": 0.0, "avail": 0, "n": 0},
+                )
+                if leaf["last_crawled"] and (
+                    agg["oldest"] is None or leaf["last_crawled"] < agg["oldest"]
+                ):
+                    agg["oldest"] = leaf["last_crawled"]
+                agg["vol"] += volatility
+                agg["avail"] += 1 if leaf["available"] else 0
+                agg["n"] += 1
+        return len(leaves)
+
+    @staticmethod
+    def _coefficient_of_variation(leaf: Dict) -> float:
+        if leaf["n"] < 2 or leaf["s"] <= 0:
+            return 0.0
+        mean = leaf["s"] / leaf["n"]
+        variance = max(leaf["ss"] / leaf["n"] - mean * mean, 0.0)
+        return variance**0.5 / mean
+
+    def score(self, codes: Tuple[str, ...]) -> float:
+        """서브트리 점수 - 한 번도 크롤링되지 않은 서브트리는 가장 오래된 것으로 본다"""
+        agg = self.stats.get(codes)
+        if not agg:
+            staleness, volatility, availability = 1.0, 0.0, 1.0
+        else:
+            horizon = config.FRONTIER_STALENESS_HORIZON_DAYS * 86400
+            age = (
+                (self.now - agg["oldest"]).total_seconds() if agg["oldest"] else horizon
+            )
+            staleness = min(max(age / horizon, 0.0), 1.0)
+            volatility = min(agg["vol"] / agg["n"], 1.0)
+            availability = agg["avail"] / agg["n"]
+        return (
+            config.FRONTIER_WEIGHT_STALENESS * staleness
+            + config.FRONTIER_WEIGHT_VOLATILITY * volatility
+            + config.FRONTIER_WEIGHT_AVAILABILITY * availability
+        )
+
+    def order(self, parent_path: List[Dict], options: List[Dict]) -> List[Dict]:
+        """같은 부모 아래 옵션들을 점수 내림차순으로 정렬 (동점이면 페이지 순서 유지)"""
+        prefix = tuple(item.get("value", "") for item in parent_path)
+        return sorted(
+            options,
+            key=lambda opt: -self.score(prefix + (opt.get("value", ""),)),
+        )
@@ -0,0 +1,96 @@
+"""
+제조사/모델 필터 및 샤딩 - 여러 노드가 조율 없이 카탈로그를 나눠 크롤링한다
+"""
+
+import hashlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from option_tree import path_key
+
+SHARD_KEYS = ("manufacturer", "model")
+
+
+def parse_shard(text: str) -> Tuple[int, int]:
+    """'i/n' 형식 (0 <= i < n) 을 (i, n) 으로 변환"""
+    index, sep, count = (text or "").partition("/")
+    try:
+        index, count = int(index), int(count)
+    except ValueError:
+        raise ValueError(f"잘못된 샤드 형식: {text} (예: 0/4)")
+    if not sep or count < 1 or not 0 <= index < count:
+        raise ValueError(f"잘못된 샤드 범위: {text} (0 <= i < n)")
+    return index, count
+
+
+def shard_of(key: str, count: int) -> int:
+    """실행/머신과 무관하게 항상 같은 값을 주는 해시 파티션"""
+    digest = hashlib.md5(key.encode("utf-8")).hexdigest()
+    return int(digest[:8], 16) % count
+
+
+def _matches(option: Dict, names: Iterable[str]) -> bool:
+    values = {option.get("text", ""), option.get("value", ""), option.get("code", "")}
+    return any(name in values for name in names)
+
+
+class CrawlFilter:
+    """제조사(op_dep1)/모델(op_dep2) 레벨에서 방문할 옵션을 거른다"""
+
+    def __init__(
+        self,
+        manufacturers: Optional[List[str]] = None,
+        models: Optional[List[str]] = None,
+        exclude: Optional[List[str]] = None,
+        shard: Optional[Tuple[int, int]] = None,
+        shard_key: str = "manufacturer",
+    ):
+        if shard_key not in SHARD_KEYS:
+            raise ValueError(f"잘못된 샤드 기준: {shard_key}")
+        self.manufacturers = manufacturers or []
+        self.models = models or []
+        self.exclude = exclude or []
+        self.shard = shard
+        self.shard_key = shard_key
+
+    @property
+    def shard_id(self) -> Optional[str]:
+        if not self.shard:
+            return None
+        return f"{self.shard[0]}/{self.shard[1]}:{self.shard_key}"
+
+    def describe(self) -> Optional[str]:
+        """제조사/모델/제외 조건 문자열 (조건이 없으면 None, 샤드는 shard_id 로 따로 기록)"""
+        parts = [
+            f"{name}={','.join(values)}"
+            for name, values in (
+                ("manufacturer", self.manufacturers),
+                ("model", self.models),
+                ("exclude", self.exclude),
+            )
+            if values
+        ]
+        return ";".join(parts) or None
+
+    def allows(self, dep_class: str, parent_path: List[Dict], option: Dict) -> bool:
+        if dep_class not in ("op_dep1", "op_dep2"):
+            return True
+        if _matches(option, self.exclude):
+            return False
+        if dep_class == "op_dep1":
+            if self.manufacturers and not _matches(option, self.manufacturers):
+                return False
+            return self._in_shard("manufacturer", [option])
+        if self.models and not _matches(option, self.models):
+            return False
+        return self._in_shard("model", parent_path + [option])
+
+    def _in_shard(self, level: str, path: List[Dict]) -> bool:
+        if not self.shard or level != self.shard_key:
+            return True
+        index, count = self.shard
+        return shard_of(path_key(path), count) == index
+
+    def apply(
+        self, dep_class: str, parent_path: List[Dict], options: List[Dict]
+    ) -> List[Dict]:
+        return [opt for opt in options if self.allows(dep_class, parent_path, opt)]
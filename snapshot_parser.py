@@ -0,0 +1,90 @@
+"""
+페이지 HTML 스냅샷 파서 - 옵션/가격 추출을 브라우저 밖(프로세스 풀)에서 수행
+
+브라우저 evaluate 스크립트(_get_options, _get_price_info)와 같은 규칙으로 파싱한다.
+프로세스 풀에서 호출되므로 모든 함수는 모듈 최상위 함수로 둔다.
+"""
+
+import re
+from typing import Dict, List
+
+from bs4 import BeautifulSoup
+
+OPTION_SELECTOR = 'ul.list_option a.select_opt.ui_opt:not([data-init="true"])'
+NO_PRICE_MARKERS = ("시세 미제공", "거래량이 적어")
+
+# _get_price_info 의 가격 패턴과 동일한 순서
+PRICE_PATTERNS = [
+    re.compile(r"금주 시세[\s\S]*?([0-9,]+)\s*~\s*([0-9,]+)\s*만원"),
+    re.compile(r"([0-9,]+)\s*~\s*([0-9,]+)\s*만원"),
+    re.compile(r"([0-9,]+)\s*만원"),
+]
+PRICE_SELECTORS = [
+    ".price_result .price",
+    ".result_price .price",
+    ".price_result",
+    ".result_price",
+    '[class*="price"]',
+    '[id*="price"]',
+    ".wrp_price .price",
+    ".price_info .price",
+    ".price_text",
+    ".price_value",
+]
+_UNIT_PRICE = re.compile(r"([0-9,]+)\s*만원")
+
+
+def _to_price(text: str):
+    try:
+        price = float(text.replace(",", ""))
+    except ValueError:
+        return None
+    return price if price > 0 else None
+
+
+def parse_option_html(html: str) -> List[Dict]:
+    """li.op_dep* (또는 연료 li) outerHTML 에서 옵션 목록 추출"""
+    soup = BeautifulSoup(html, "lxml")
+    options = []
+    for a in soup.select(OPTION_SELECTOR):
+        text_el = a.select_one(".lt, .ui_opt_txt")
+        price_el = a.select_one(".rt")
+        options.append(
+            {
+                "code": a.get("data-code") or "",
+                "value": a.get("data-value") or "",
+                "text": (text_el or a).get_text().strip(),
+                "price_text": price_el.get_text().strip() if price_el else "",
+            }
+        )
+    return options
+
+
+def parse_price_html(html: str) -> Dict:
+    """페이지 HTML 에서 가격 정보 추출 (price/available/message)"""
+    soup = BeautifulSoup(html, "lxml")
+    body = soup.body or soup
+    all_text = body.get_text()
+
+    if any(marker in all_text for marker in NO_PRICE_MARKERS):
+        return {"price": None, "available": False, "message": "시세 미제공"}
+
+    for pattern in PRICE_PATTERNS:
+        match = pattern.search(all_text)
+        if match:
+            price = _to_price(match.group(1))
+            if price:
+                return {"price": price, "available": True, "message": match.group(0)}
+
+    for selector in PRICE_SELECTORS:
+        for elem in body.select(selector):
+            text = elem.get_text().strip()
+            if any(marker in text for marker in NO_PRICE_MARKERS):
+                return {"price": None, "available": False, "message": text}
+            match = _UNIT_PRICE.search(text)
+            if match:
+                price = _to_price(match.group(1))
+                if price:
+                    return {"price": price, "available": True, "message": text}
+
+    return {"price": None, "available": False, "message": "가격 정보를 찾을 수 없습니다"}
@@ -0,0 +1,642 @@
+"""
+시세 행 저장 - 모아서 한 번에 쓰고, 같은 트랜잭션에서 요약 테이블 같은 파생 데이터를 갱신한다
+
+BatchWriter 는 행을 batch_size 만큼 모아 bulk insert 하고, 성공한 행을 sink 들에 넘긴다.
+sink 는 on_rows(session, rows) 를 구현하며 커밋은 BatchWriter 가 한다. car_prices 에 쓰기 전에는
+before_upsert(session, rows) 가 있는 sink 에, 커밋/롤백 뒤에는 commit()/rollback() 이 있는 sink 에
+알려 준다.
+
+저장 방식 (STORAGE_MODES):
+    wide       - car_prices 에 이름/코드를 모두 담은 행 저장 (기본, 조합별 하루 한 행으로 upsert)
+    normalized - option_dims 차원 + price_facts 팩트로 저장 (조회는 v_car_prices 뷰)
+    history    - option_dims 차원 + price_history 구간으로 저장 (값이 바뀔 때만 새 행)
+"""
+
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import case, func, insert, or_, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+import config
+from database import (
+    CarPrice,
+    CrawlSummary,
+    OptionDim,
+    PriceFact,
+    PriceHistory,
+    upsert_car_prices,
+)
+
+log = logging.getLogger("encar.storage")
+
+STORAGE_MODES = ("wide", "normalized", "history")
+
+# IN (...) 한 번에 넣는 해시 수
+_HASH_CHUNK = 500
+
+# car_prices 행의 (코드 컬럼, 이름 컬럼) - 제조사부터 세부등급까지
+_PATH_COLUMNS = (
+    ("manufacturer_code", "manufacturer"),
+    ("model_code", "model"),
+    ("detailed_model_code", "detailed_model"),
+    ("year_code", "year"),
+    ("fuel_code", "fuel_type"),
+    ("grade_code", "grade"),
+    ("detailed_grade_code", "detailed_grade"),
+)
+
+
+class BatchWriter:
+    def __init__(
+        self,
+        session,
+        sinks: Optional[List] = None,
+        batch_size: int = config.WRITE_BATCH_SIZE,
+        wide: bool = True,
+    ):
+        self.session = session
+        self.sinks = sinks or []
+        self.wide = wide  # False 면 car_prices 없이 sink 만 (정규화 저장)
+        self.batch_size = batch_size
+        self.rows: List[Dict] = []
+        self.success_count = 0
+        self.failed_count = 0
+
+    def add(self, row: Dict):
+        self.rows.append(row)
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def write(self, rows: List[Dict]) -> Tuple[int, int]:
+        """rows 를 모두 저장하고 (성공, 실패) 수 반환"""
+        for row in rows:
+            self.add(row)
+        self.flush()
+        return self.success_count, self.failed_count
+
+    def flush(self):
+        rows, self.rows = self.rows, []
+        if not rows:
+            return
+        try:
+            self._write(rows)
+            self.success_count += len(rows)
+            return
+        except Exception as e:
+            self._rollback()
+            log.warning(f"일괄 저장 실패, 행 단위로 재시도: {e}")
+
+        # 문제 행만 버리도록 한 행씩 저장
+        for row in rows:
+            try:
+                self._write([row])
+                self.success_count += 1
+            except Exception as e:
+                self.failed_count += 1
+                log.error(f"DB 저장 실패: {e}")
+                self._rollback()
+
+    def _write(self, rows: List[Dict]):
+        if self.wide:
+            for sink in self.sinks:
+                if hasattr(sink, "before_upsert"):
+                    sink.before_upsert(self.session, rows)
+            upsert_car_prices(self.session, rows)
+        for sink in self.sinks:
+            sink.on_rows(self.session, rows)
+        self.session.commit()
+        for sink in self.sinks:
+            if hasattr(sink, "commit"):
+                sink.commit()
+
+    def _rollback(self):
+        self.session.rollback()
+        for sink in self.sinks:
+            if hasattr(sink, "rollback"):
+                sink.rollback()
+
+
+def _aggregate(rows: List[Dict]) -> Dict[Tuple[str, str], Dict]:
+    groups: Dict[Tuple[str, str], Dict] = {}
+    for row in rows:
+        group = groups.setdefault(
+            (row["manufacturer"], row["model"]),
+            {"rows": 0, "available": 0, "n": 0, "sum": 0.0, "min": None, "max": None},
+        )
+        group["rows"] += 1
+        if row.get("is_price_available"):
+            group["available"] += 1
+        price = row.get("price")
+        if price is not None:
+            group["n"] += 1
+            group["sum"] += price
+            group["min"] = price if group["min"] is None else min(group["min"], price)
+            group["max"] = price if group["max"] is None else max(group["max"], price)
+    return groups
+
+
+class SummarySink:
+    """저장된 행으로 crawl_summary (실행 x 제조사/모델) 를 누적 갱신"""
+
+    def __init__(self, crawl_log_id: Optional[int]):
+        self.crawl_log_id = crawl_log_id
+        # upsert 로 덮어쓸 기존 행의 (실행, 제조사, 모델) - 누적 대신 저장 후 다시 집계한다
+        self.replaced: Set[Tuple[Optional[int], str, str]] = set()
+
+    def before_upsert(self, session, rows: List[Dict]):
+        """같은 날 이미 저장된 조합 (재크롤링) 을 찾아 둔다"""
+        self.replaced = set()
+        today = datetime.now().date()
+        days: Dict = {}
+        for row in rows:
+            crawled_at = row.get("crawled_at")
+            day = crawled_at.date() if crawled_at else today
+            hashes = days.setdefault(day, {})
+            if row.get("options_hash") in hashes:  # 같은 배치 안의 중복
+                self.replaced.add(
+                    (self.crawl_log_id, row["manufacturer"], row["model"])
+                )
+            hashes[row.get("options_hash")] = True
+        for day, hashes in days.items():
+            for chunk in _chunks(list(hashes), _HASH_CHUNK):
+                self.replaced.update(
+                    session.query(
+                        CarPrice.crawl_log_id, CarPrice.manufacturer, CarPrice.model
+                    )
+                    .filter(
+                        CarPrice.crawl_date == day, CarPrice.options_hash.in_(chunk)
+                    )
+                    .distinct()
+                )
+
+    def on_rows(self, session, rows: List[Dict]):
+        groups = _aggregate(rows)
+        replaced, self.replaced = self.replaced, set()
+        for run, manufacturer, model in replaced:
+            if run == self.crawl_log_id:
+                groups.pop((manufacturer, model), None)
+        self._accumulate(session, groups)
+        # 행이 다른 실행에서 넘어왔거나 같은 실행 안에서 덮어써졌으면 누적값이 맞지 않으므로
+        # 영향받은 (실행, 제조사, 모델) 요약을 car_prices 에서 다시 계산한다
+        runs: Dict = {}
+        for run, manufacturer, model in replaced:
+            runs.setdefault(run, []).append((manufacturer, model))
+        for run, keys in runs.items():
+            _replace_summary(session, [run], keys)
+
+    def _accumulate(self, session, groups: Dict[Tuple[str, str], Dict]):
+        if not groups:
+            return
+        existing = {
+            (summary.manufacturer, summary.model): summary
+            for summary in session.query(CrawlSummary).filter(
+                CrawlSummary.crawl_log_id == self.crawl_log_id,
+                CrawlSummary.manufacturer.in_({key[0] for key in groups}),
+                CrawlSummary.model.in_({key[1] for key in groups}),
+            )
+        }
+        for (manufacturer, model), group in groups.items():
+            summary = existing.get((manufacturer, model))
+            if summary is None:
+                summary = CrawlSummary(
+                    crawl_log_id=self.crawl_log_id,
+                    manufacturer=manufacturer,
+                    model=model,
+                    row_count=0,
+                    available_count=0,
+                    price_count=0,
+                    price_sum=0.0,
+                )
+                session.add(summary)
+            summary.row_count += group["rows"]
+            summary.available_count += group["available"]
+            summary.price_count += group["n"]
+            summary.price_sum += group["sum"]
+            if group["min"] is not None:
+                summary.price_min = (
+                    group["min"]
+                    if summary.price_min is None
+                    else min(summary.price_min, group["min"])
+                )
+                summary.price_max = (
+                    group["max"]
+                    if summary.price_max is None
+                    else max(summary.price_max, group["max"])
+                )
+
+
+class DimensionCache:
+    """option_dims 노드 ID 를 메모리에 두고, 없는 노드만 추가한다 (경로 interning)"""
+
+    def __init__(self, session):
+        self.session = session
+        self.ids: Dict[Tuple, int] = {}  # (parent_id, level, code, text) -> id
+        self.pending: List[Tuple] = []  # 아직 커밋되지 않은 새 노드
+        self.loaded = False
+
+    def load(self):
+        query = self.session.query(
+            OptionDim.id,
+            OptionDim.parent_id,
+            OptionDim.level,
+            OptionDim.code,
+            OptionDim.text,
+        ).yield_per(5000)
+        for dim_id, parent_id, level, code, text in query:
+            self.ids[(parent_id, level, code, text)] = dim_id
+        self.loaded = True
+
+    def intern(self, nodes: List[Tuple[str, str]]) -> int:
+        """(code, text) 경로의 마지막 노드 ID (중간 노드까지 필요하면 만든다)"""
+        if not self.loaded:
+            self.load()
+        parent_id = None
+        for level, (code, text) in enumerate(nodes):
+            key = (parent_id, level, code or "", text or "")
+            dim_id = self.ids.get(key)
+            if dim_id is None:
+                dim_id = self.ids[key] = self._insert(key)
+                self.pending.append(key)
+            parent_id = dim_id
+        return parent_id
+
+    def _insert(self, key: Tuple) -> int:
+        """노드를 추가하고 ID 반환 - 다른 작성자가 이미 추가했으면 그 노드의 ID
+
+        load() 이후 다른 워커/샤드가 같은 노드를 만들었을 수 있으므로 유일 키 충돌은 무시하고
+        다시 조회한다 (잠금 읽기라 MySQL 에서도 커밋된 최신 행을 본다).
+        """
+        parent_id, level, code, text = key
+        values = {"parent_id": parent_id, "level": level, "code": code, "text": text}
+        dialect = self.session.get_bind().dialect.name
+        if dialect == "sqlite":
+            stmt = sqlite_insert(OptionDim).values(values).on_conflict_do_nothing()
+        elif dialect == "mysql":
+            stmt = insert(OptionDim).values(values).prefix_with("IGNORE")
+        else:
+            stmt = insert(OptionDim).values(values)
+        self.session.execute(stmt)
+        return self.session.execute(
+            select(OptionDim.id)
+            .where(
+                func.coalesce(OptionDim.parent_id, 0) == (parent_id or 0),
+                OptionDim.level == level,
+                OptionDim.code == code,
+                OptionDim.text == text,
+            )
+            .with_for_update(read=True)
+        ).scalar_one()
+
+    def commit(self):
+        self.pending = []
+
+    def rollback(self):
+        # 롤백된 노드 ID 는 더 이상 유효하지 않다
+        for key in self.pending:
+            self.ids.pop(key, None)
+        self.pending = []
+
+
+class NormalizedSink:
+    """행을 차원 노드 + price_facts 로 저장 (정규화 저장 모드)"""
+
+    def __init__(self, crawl_log_id: Optional[int], dims: DimensionCache):
+        self.crawl_log_id = crawl_log_id
+        self.dims = dims
+
+    def on_rows(self, session, rows: List[Dict]):
+        facts = []
+        for row in rows:
+            leaf_id = self.dims.intern(
+                [(row.get(code), row.get(name)) for code, name in _PATH_COLUMNS]
+            )
+            facts.append(
+                {
+                    "crawl_log_id": row.get("crawl_log_id", self.crawl_log_id),
+                    "leaf_id": leaf_id,
+                    "price": row.get("price"),
+                    "is_price_available": row.get("is_price_available"),
+                    "price_message": row.get("price_message"),
+                    "options_hash": row.get("options_hash"),
+                    "crawled_at": row.get("crawled_at") or datetime.now(),
+                }
+            )
+        session.bulk_insert_mappings(PriceFact, facts)
+
+    def commit(self):
+        self.dims.commit()
+
+    def rollback(self):
+        self.dims.rollback()
+
+
+def _same_price(price, available, new_price, new_available) -> bool:
+    return price == new_price and bool(available) == bool(new_available)
+
+
+def _chunks(items: List, size: int) -> Iterable[List]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+class HistorySink:
+    """price_history 를 갱신 - 가격/제공 여부가 바뀐 조합만 새 구간을 추가한다
+
+    배치의 해시로 열린 구간(valid_to IS NULL)을 한 번에 읽고, 값이 같으면 last_seen_at 만
+    옮긴다. 바뀌었으면 열린 구간을 관측 시간으로 닫고 새 구간을 연다.
+    """
+
+    def __init__(self, crawl_log_id: Optional[int], dims: DimensionCache):
+        self.crawl_log_id = crawl_log_id
+        self.dims = dims
+        self.changed_count = 0
+        self.unchanged_count = 0
+
+    def on_rows(self, session, rows: List[Dict]):
+        hashes = list({row["options_hash"] for row in rows if row.get("options_hash")})
+        current: Dict[str, PriceHistory] = {}
+        for chunk in _chunks(hashes, _HASH_CHUNK):
+            for interval in session.query(PriceHistory).filter(
+                PriceHistory.options_hash.in_(chunk), PriceHistory.valid_to.is_(None)
+            ):
+                current[interval.options_hash] = interval
+
+        now = datetime.now()
+        for row in rows:
+            options_hash = row.get("options_hash")
+            if not options_hash:
+                continue
+            seen_at = row.get("crawled_at") or now
+            crawl_log_id = row.get("crawl_log_id", self.crawl_log_id)
+            interval = current.get(options_hash)
+            if interval is not None and _same_price(
+                interval.price,
+                interval.is_price_available,
+                row.get("price"),
+                row.get("is_price_available"),
+            ):
+                interval.last_seen_at = max(interval.last_seen_at, seen_at)
+                interval.last_crawl_log_id = crawl_log_id
+                self.unchanged_count += 1
+                continue
+            if interval is not None:
+                interval.valid_to = seen_at
+            interval = PriceHistory(
+                options_hash=options_hash,
+                leaf_id=self.dims.intern(
+                    [(row.get(code), row.get(name)) for code, name in _PATH_COLUMNS]
+                ),
+                price=row.get("price"),
+                is_price_available=row.get("is_price_available"),
+                price_message=row.get("price_message"),
+                valid_from=seen_at,
+                last_seen_at=seen_at,
+                first_crawl_log_id=crawl_log_id,
+                last_crawl_log_id=crawl_log_id,
+            )
+            session.add(interval)
+            current[options_hash] = interval
+            self.changed_count += 1
+
+    def commit(self):
+        self.dims.commit()
+
+    def rollback(self):
+        self.dims.rollback()
+
+
+def make_writer(
+    session, crawl_log_id: Optional[int], mode: str = config.STORAGE_MODE
+) -> BatchWriter:
+    """저장 방식에 맞는 BatchWriter (요약 테이블 갱신 포함)"""
+    if mode not in STORAGE_MODES:
+        raise ValueError(f"잘못된 저장 방식: {mode}")
+    if mode == "normalized":
+        normalized = NormalizedSink(crawl_log_id, DimensionCache(session))
+        return BatchWriter(
+            session, sinks=[normalized, SummarySink(crawl_log_id)], wide=False
+        )
+    if mode == "history":
+        history = HistorySink(crawl_log_id, DimensionCache(session))
+        return BatchWriter(
+            session, sinks=[history, SummarySink(crawl_log_id)], wide=False
+        )
+    return BatchWriter(session, sinks=[SummarySink(crawl_log_id)])
+
+
+def rebuild_summary(session, crawl_log_id: Optional[int] = None) -> int:
+    """car_prices 에서 crawl_summary 를 다시 계산 (crawl_log_id 를 주면 그 실행만)
+
+    car_prices 행이 있는 실행만 다시 계산한다. normalized/history 저장 실행의 요약은
+    car_prices 로 만들 수 없으므로 지우지 않고 그대로 둔다.
+    """
+    query = session.query(CarPrice.crawl_log_id).distinct()
+    if crawl_log_id is not None:
+        query = query.filter(CarPrice.crawl_log_id == crawl_log_id)
+    runs = [run for (run,) in query]
+    if not runs:
+        return 0
+    count = _replace_summary(session, runs)
+    session.commit()
+    return count
+
+
+def _run_filter(column, runs: List[Optional[int]]):
+    ids = [run for run in runs if run is not None]
+    condition = column.in_(ids)
+    return or_(condition, column.is_(None)) if None in runs else condition
+
+
+def _replace_summary(
+    session,
+    runs: Optional[List[Optional[int]]] = None,
+    keys: Optional[List[Tuple[str, str]]] = None,
+) -> int:
+    """crawl_summary 행을 지우고 car_prices 집계로 다시 채운다 (커밋은 호출한 쪽에서)
+
+    runs 를 주면 그 실행들만, keys 를 주면 그 (제조사, 모델) 들만 다시 계산한다.
+    """
+    delete = session.query(CrawlSummary)
+    source = select(
+        CarPrice.crawl_log_id,
+        CarPrice.manufacturer,
+        CarPrice.model,
+        func.count(CarPrice.id),
+        func.coalesce(
+            func.sum(case((CarPrice.is_price_available == True, 1), else_=0)), 0
+        ),
+        func.count(CarPrice.price),
+        func.coalesce(func.sum(CarPrice.price), 0.0),
+        func.min(CarPrice.price),
+        func.max(CarPrice.price),
+    ).group_by(CarPrice.crawl_log_id, CarPrice.manufacturer, CarPrice.model)
+    if runs is not None:
+        delete = delete.filter(_run_filter(CrawlSummary.crawl_log_id, runs))
+        source = source.where(_run_filter(CarPrice.crawl_log_id, runs))
+    if keys is not None:
+        manufacturers = {key[0] for key in keys}
+        models = {key[1] for key in keys}
+        delete = delete.filter(
+            CrawlSummary.manufacturer.in_(manufacturers),
+            CrawlSummary.model.in_(models),
+        )
+        source = source.where(
+            CarPrice.manufacturer.in_(manufacturers), CarPrice.model.in_(models)
+        )
+    delete.delete(synchronize_session=False)
+    result = session.execute(
+        insert(CrawlSummary).from_select(
+            [
+                "crawl_log_id",
+                "manufacturer",
+                "model",
+                "row_count",
+                "available_count",
+                "price_count",
+                "price_sum",
+                "price_min",
+                "price_max",
+            ],
+            source,
+        )
+    )
+    return result.rowcount
+
+
+def ensure_summary(session) -> int:
+    """crawl_summary 가 비어 있는데 car_prices 에 행이 있으면 (요약 테이블 이전 데이터) 다시 계산
+
+    요약이 한 행이라도 생기면 --stats 는 요약만 읽으므로, 첫 크롤링이 요약을 쓰기 전에 채워 둔다.
+    """
+    if session.query(CrawlSummary.id).first() is not None:
+        return 0
+    if session.query(CarPrice.id).first() is None:
+        return 0
+    return rebuild_summary(session)
+
+
+def summary_totals(session) -> Optional[Dict]:
+    """crawl_summary 합계 (전체/시세 제공/미제공/제조사 수) - 요약이 비어 있으면 None"""
+    total, available, manufacturers, groups = session.query(
+        func.sum(CrawlSummary.row_count),
+        func.sum(CrawlSummary.available_count),
+        func.count(func.distinct(CrawlSummary.manufacturer)),
+        func.count(CrawlSummary.id),
+    ).one()
+    if not groups:
+        return None
+    return {
+        "total": int(total or 0),
+        "available": int(available or 0),
+        "unavailable": int((total or 0) - (available or 0)),
+        "manufacturers": manufacturers,
+        "groups": groups,
+    }
+
+
+def price_at(session, options_hash: str, when: datetime) -> Optional[PriceHistory]:
+    """when 시점에 유효했던 시세 구간 (그 전에 관측된 적이 없으면 None)"""
+    return (
+        session.query(PriceHistory)
+        .filter(
+            PriceHistory.options_hash == options_hash,
+            PriceHistory.valid_from <= when,
+            (PriceHistory.valid_to.is_(None)) | (PriceHistory.valid_to > when),
+        )
+        .order_by(PriceHistory.valid_from.desc())
+        .first()
+    )
+
+
+def prices_at(session, when: datetime) -> Iterable[PriceHistory]:
+    """when 시점에 유효했던 모든 조합의 시세 구간을 스트리밍으로 반환"""
+    return (
+        session.query(PriceHistory)
+        .filter(
+            PriceHistory.valid_from <= when,
+            (PriceHistory.valid_to.is_(None)) | (PriceHistory.valid_to > when),
+        )
+        .yield_per(5000)
+    )
+
+
+def price_timeline(session, options_hash: str) -> List[PriceHistory]:
+    """조합 하나의 시세 구간 목록 (오래된 순)"""
+    return (
+        session.query(PriceHistory)
+        .filter(PriceHistory.options_hash == options_hash)
+        .order_by(PriceHistory.valid_from)
+        .all()
+    )
+
+
+def backfill_history(session) -> int:
+    """car_prices 의 기존 스냅샷으로 price_history 를 다시 만든다 - 만든 구간 수 반환
+
+    행을 options_hash, crawled_at 순으로 한 번 훑으며 값이 바뀌는 지점마다 구간을 나누므로
+    열린 구간 하나만 메모리에 두고, 닫힌 구간은 모아서 bulk insert 한다. 스트리밍 읽기는
+    별도 연결에서 하고 구간/차원 노드 쓰기는 세션 연결에서 한다 (커서가 열린 연결에 쓰지 않는다).
+    """
+    session.query(PriceHistory).delete(synchronize_session=False)
+    dims = DimensionCache(session)
+    query = (
+        select(
+            CarPrice.options_hash,
+            CarPrice.price,
+            CarPrice.is_price_available,
+            CarPrice.price_message,
+            CarPrice.crawled_at,
+            CarPrice.crawl_log_id,
+            *(CarPrice.__table__.c[name] for pair in _PATH_COLUMNS for name in pair),
+        )
+        .where(CarPrice.options_hash.isnot(None))
+        .order_by(CarPrice.options_hash, CarPrice.crawled_at, CarPrice.id)
+        .execution_options(yield_per=config.WRITE_BATCH_SIZE)
+    )
+    current: Optional[Dict] = None
+    pending: List[Dict] = []
+    count = 0
+    with session.get_bind().connect() as reader:
+        for row in reader.execute(query):
+            if current is not None and current["options_hash"] == row.options_hash:
+                if _same_price(
+                    current["price"],
+                    current["is_price_available"],
+                    row.price,
+                    row.is_price_available,
+                ):
+                    current["last_seen_at"] = row.crawled_at
+                    current["last_crawl_log_id"] = row.crawl_log_id
+                    continue
+                current["valid_to"] = row.crawled_at
+            if current is not None:
+                pending.append(current)
+            if len(pending) >= config.WRITE_BATCH_SIZE:
+                session.bulk_insert_mappings(PriceHistory, pending)
+                count += len(pending)
+                pending = []
+            current = {
+                "options_hash": row.options_hash,
+                "leaf_id": dims.intern(
+                    [
+                        (getattr(row, code), getattr(row, name))
+                        for code, name in _PATH_COLUMNS
+                    ]
+                ),
+                "price": row.price,
+                "is_price_available": row.is_price_available,
+                "price_message": row.price_message,
+                "valid_from": row.crawled_at,
+                "valid_to": None,
+                "last_seen_at": row.crawled_at,
+                "first_crawl_log_id": row.crawl_log_id,
+                "last_crawl_log_id": row.crawl_log_id,
+            }
+    if current is not None:
+        pending.append(current)
+    session.bulk_insert_mappings(PriceHistory, pending)
+    count += len(pending)
+    session.commit()
+    return count
@@ -0,0 +1,156 @@
+"""
+네트워크 텔레메트리 - 응답마다 태스크/로그를 만들지 않고 URL 패턴별로 메모리에 집계한다
+
+페이지 이벤트 핸들러(on_response/on_finished/on_failed)는 동기 함수라 태스크를 만들지 않는다.
+레벨 선택이 끝날 때마다 mark(dep_class) 로 그때까지 쌓인 요청을 해당 레벨 몫으로 넘기고,
+실행이 끝나면 flush() 로 레벨별/URL 패턴별 요약을 남긴다.
+"""
+
+import logging
+import random
+import re
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+import config
+
+log = logging.getLogger("encar.network")
+
+_NUMBER = re.compile(r"\d+")
+
+
+def url_pattern(url: str) -> str:
+    """호스트 + 숫자를 뭉갠 경로 (쿼리 제외) - 같은 종류의 요청을 한 묶음으로"""
+    parts = urlsplit(url)
+    return f"{parts.netloc}{_NUMBER.sub('N', parts.path)}"
+
+
+class _Stats:
+    __slots__ = ("count", "bytes", "ms", "max_ms", "failed", "status")
+
+    def __init__(self):
+        self.count = 0
+        self.bytes = 0
+        self.ms = 0.0
+        self.max_ms = 0.0
+        self.failed = 0
+        self.status = Counter()
+
+    def merge(self, other: "_Stats"):
+        self.count += other.count
+        self.bytes += other.bytes
+        self.ms += other.ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+        self.failed += other.failed
+        self.status.update(other.status)
+
+    def as_dict(self) -> Dict:
+        return {
+            "count": self.count,
+            "bytes": self.bytes,
+            "ms": round(self.ms, 1),
+            "max_ms": round(self.max_ms, 1),
+            "failed": self.failed,
+            "status": dict(self.status),
+        }
+
+
+class NetworkTelemetry:
+    def __init__(self, top: int = 10):
+        self.top = top
+        self.window: Dict[str, _Stats] = defaultdict(_Stats)  # 마지막 mark 이후
+        self.by_level: Dict[str, _Stats] = defaultdict(_Stats)
+        self.by_pattern: Dict[str, _Stats] = defaultdict(_Stats)
+
+    def attach(self, page):
+        page.on("response", self.on_response)
+        page.on("requestfinished", self.on_finished)
+        page.on("requestfailed", self.on_failed)
+
+    def on_response(self, resp):
+        try:
+            stats = self.window[url_pattern(resp.url)]
+            stats.status[f"{resp.status // 100}xx"] += 1
+            stats.bytes += int(resp.headers.get("content-length") or 0)
+            if resp.status >= 400:
+                log.warning(
+                    "%s %s",
+                    resp.status,
+                    resp.url,
+                    extra={"status": resp.status, "url": resp.url},
+                )
+            elif (
+                log.isEnabledFor(logging.DEBUG)
+                and random.random() < config.RESPONSE_LOG_SAMPLE_RATE
+            ):
+                log.debug("%s %s", resp.status, resp.url)
+        except Exception:
+            pass
+
+    def on_finished(self, request):
+        try:
+            stats = self.window[url_pattern(request.url)]
+            stats.count += 1
+            # timing 값은 startTime 기준 ms, 응답을 못 받았으면 -1
+            elapsed = request.timing.get("responseEnd", -1)
+            if elapsed >= 0:
+                stats.ms += elapsed
+                stats.max_ms = max(stats.max_ms, elapsed)
+        except Exception:
+            pass
+
+    def on_failed(self, request):
+        try:
+            stats = self.window[url_pattern(request.url)]
+            stats.count += 1
+            stats.failed += 1
+        except Exception:
+            pass
+
+    def mark(self, dep_class: str):
+        """마지막 mark 이후 요청을 dep_class 레벨 몫으로 집계"""
+        if not self.window:
+            return
+        level = self.by_level[dep_class]
+        for pattern, stats in self.window.items():
+            level.merge(stats)
+            self.by_pattern[pattern].merge(stats)
+        self.window = defaultdict(_Stats)
+
+    def summary(self) -> Dict:
+        top = sorted(self.by_pattern.items(), key=lambda item: item[1].ms, reverse=True)
+        return {
+            "levels": {
+                dep_class: stats.as_dict() for dep_class, stats in self.by_level.items()
+            },
+            "top_patterns": [
+                dict(pattern=pattern, **stats.as_dict())
+                for pattern, stats in top[: self.top]
+            ],
+        }
+
+    def flush(self, scope: str = "run", level_order: Optional[List[str]] = None):
+        """레벨별/상위 URL 패턴별 요약을 로그로 남기고 집계를 비운다"""
+        self.mark("other")
+        if not self.by_pattern:
+            return
+        summary = self.summary()
+        order = level_order + ["other"] if level_order else list(summary["levels"])
+        for dep_class in order:
+            stats = summary["levels"].get(dep_class)
+            if stats:
+                log.info(
+                    f"[{scope}] {dep_class}: 요청 {stats['count']}개, "
+                    f"{stats['bytes'] / 1024:,.0f}KB, 누적 {stats['ms'] / 1000:,.1f}초, "
+                    f"실패 {stats['failed']}",
+                    extra={"scope": scope, "level": dep_class, **stats},
+                )
+        for item in summary["top_patterns"]:
+            log.info(
+                f"[{scope}] {item['pattern']}: 요청 {item['count']}개, "
+                f"누적 {item['ms'] / 1000:,.1f}초 (최대 {item['max_ms']:,.0f}ms)",
+                extra={"scope": scope, **item},
+            )
+        self.by_level = defaultdict(_Stats)
+        self.by_pattern = defaultdict(_Stats)